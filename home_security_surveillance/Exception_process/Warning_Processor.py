@@ -113,7 +113,8 @@ class Warning_Processor(object):
         pygame.mixer.init()
 
     # 根据错误码解析出现的错误并调用对应函数
-    def warning_process(self, warning_code: int, warning_time: str, level_list: List[float], sensitivity: int = 0):
+    def warning_process(self, warning_code: int, warning_time: str, level_list: List[float], sensitivity: int = 0,
+                        warning_source: str = ""):
         """
         错误处理的核心函数
 
@@ -127,6 +128,8 @@ class Warning_Processor(object):
             置信度列表，每个元素为对应错误的置信度
         sensitivity : int
             置信度转换为危险等级时使用的不同敏感度，0为低敏感度，1为高敏感度
+        warning_source : str
+            发生警告的视频源的描述，多个视频设备同时监控时用于区分警告来自哪个设备，默认为空，即不显示
         """
 
         # 利用与操作解析错误码，如有对应错误，进行相应报警
@@ -134,7 +137,7 @@ class Warning_Processor(object):
         index = 0
         for key, value in self.warning_code_dict.items():
             if key & warning_code:
-                self.trigger_warning(value, warning_time, level_list[index], sensitivity)
+                self.trigger_warning(value, warning_time, level_list[index], sensitivity, warning_source)
             index += 1
 
     @staticmethod
@@ -189,7 +192,8 @@ class Warning_Processor(object):
             else:
                 return 0
 
-    def trigger_warning(self, warning_type: str, warning_time: str, level: float, sensitivity: int):
+    def trigger_warning(self, warning_type: str, warning_time: str, level: float, sensitivity: int,
+                        warning_source: str = ""):
         """
         触发警报的核心处理函数
 
@@ -204,12 +208,16 @@ class Warning_Processor(object):
             当危险等级高于等于3级时，会向户主发送邮件，通知相关情况
         sensitivity : int
             置信度转换为危险等级时使用的不同敏感度，0为低敏感度，1为高敏感度
+        warning_source : str
+            发生警告的视频源的描述，默认为空，即不显示
 
         """
         # 置信度转危险等级
         level_description = self.get_level_description(level, sensitivity)
         # 日志记录有警告
         log_message = f"{warning_type} at {warning_time} with risk level:({level_description})"
+        if warning_source:
+            log_message += f" from {warning_source}"
         self.warning_logger.log_write(log_message, Log_Processor.CRITICAL)
 
         # 警告播放
@@ -218,12 +226,12 @@ class Warning_Processor(object):
         # 危险等级超过3，或是火焰的危险等级2就发送邮件
         if level_description >= 3 or (warning_type == "Fire" and level_description == 2):
             if self.email_senter_data and self.email_receiver_data:
-                self.send_email_notification(warning_type, warning_time, level_description)
+                self.send_email_notification(warning_type, warning_time, level_description, warning_source)
                 log_message += " Start to sent Message!"
                 self.warning_logger.log_write(log_message, Log_Processor.INFO)
 
         # 桌面跳出警报窗口
-        self.show_custom_warning_dialog(warning_type, warning_time, level_description)
+        self.show_custom_warning_dialog(warning_type, warning_time, level_description, warning_source)
 
     def _play_audio(self, level_description: int):
         """
@@ -243,7 +251,8 @@ class Warning_Processor(object):
         self.warning_logger.log_write(f"Successfully played mixer music file "
                                       f"{music_file}", Log_Processor.INFO)
 
-    def show_custom_warning_dialog(self, warning_type: str, warning_time: str, level_description: int):
+    def show_custom_warning_dialog(self, warning_type: str, warning_time: str, level_description: int,
+                                   warning_source: str = ""):
         """
         桌面跳出警报窗口函数
 
@@ -255,6 +264,8 @@ class Warning_Processor(object):
             警告时间文本
         level_description : int
             置信度危险等级
+        warning_source : str
+            发生警告的视频源的描述，默认为空，即不显示
         """
         root = tk.Tk()
         root.title("Warning")
@@ -277,6 +288,8 @@ class Warning_Processor(object):
         # 警告文本
         label_text = f"{warning_type} detected at {warning_time}\n" \
                      f"Risk level: {level_description}"
+        if warning_source:
+            label_text += f"\nSource: {warning_source}"
         label = ttk.Label(root, text=label_text, padding=(20, 10), font=font_style)
         # 在父容器中自动排列和管理文本的位置和大小
         label.pack()
@@ -596,7 +609,8 @@ class Warning_Processor(object):
             parts['tld'] = match.group(3)
         return parts
 
-    def send_email_notification(self, warning_type: str, warning_time: str, level_description: int):
+    def send_email_notification(self, warning_type: str, warning_time: str, level_description: int,
+                                warning_source: str = ""):
         """
         发送邮件通知用户发生了相应的紧急事故函数
 
@@ -608,6 +622,8 @@ class Warning_Processor(object):
             警告时间文本
         level_description : int
             置信度危险等级
+        warning_source : str
+            发生警告的视频源的描述，默认为空，即不显示
         """
 
         # 邮件标题
@@ -618,6 +634,9 @@ class Warning_Processor(object):
         发生时间: {warning_time}
         危险等级: {level_description}级
         """
+        if warning_source:
+            body += f"""监控设备: {warning_source}
+        """
         # 本来还想可以加一个 查看视频：url    这里不知道怎么传参了
 
         # email结构设置
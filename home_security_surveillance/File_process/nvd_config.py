@@ -39,6 +39,8 @@ class Nvd_Processor(object):
     nvd_config_data : List[Dict[str, str]]
         网络摄像头配置文件中解析所得数据，包含了网络视频设备(IP摄像头)的url、ip等信息
         是一个json列表，每个元素对应一个存储网络摄像头相关信息的字典对象
+        可选的roi键保存该设备的感兴趣区域，为多边形的列表，每个多边形为[x, y]顶点的列表
+        顶点坐标是相对于视频帧宽度和高度的比例，在0 ~ 1之间，与视频流的分辨率无关
     video_trans_protocol_dict: Dict[int, str]
         网络摄像头传输视频使用的协议，是类变量
         包括大部分网络摄像头使用的传输协议，key为索引，value为对应的协议字符串
@@ -258,6 +260,56 @@ class Nvd_Processor(object):
                     break
         self._write_nvd_config()
 
+    def get_roi(self, nvd_url: str) -> List[List[List[float]]]:
+        """
+        获得网络视频设备的感兴趣区域
+
+        Parameters
+        ----------
+        nvd_url : str
+            网络视频设备的url地址
+
+        Returns
+        -------
+        roi_list : List[List[List[float]]]
+            感兴趣区域的多边形列表，设备不存在或未设置时返回空列表，即识别整个视频帧
+        """
+        for i in self.nvd_config_data:
+            if i["url"] == nvd_url:
+                return i.get("roi", [])
+        return []
+
+    def set_roi(self, information: Union[str, int], roi_list: List[List[List[float]]]):
+        """
+        设置网络视频设备的感兴趣区域，并写入配置文件
+
+        Parameters
+        ----------
+        information : Union[str, int]
+            要设置的设备的url或者索引
+        roi_list : List[List[List[float]]]
+            感兴趣区域的多边形列表，每个多边形至少有3个顶点，顶点坐标在0 ~ 1之间，为空列表时清除感兴趣区域
+        """
+        # 检验多边形的格式
+        for polygon in roi_list:
+            if len(polygon) < 3:
+                raise ValueError("The polygon of region of interest must have at least 3 points!")
+            for point in polygon:
+                if len(point) != 2 or not all(0 <= value <= 1 for value in point):
+                    raise ValueError("The point of region of interest must be [x, y] between 0 and 1!")
+
+        # 根据类型确定是url或者是索引，找到对应的设备并设置
+        for i in self.nvd_config_data:
+            if (isinstance(information, str) and i["url"] == information) or \
+                    (not isinstance(information, str) and i["index"] == information):
+                if roi_list:
+                    i["roi"] = [[[float(value) for value in point] for point in polygon]
+                                for polygon in roi_list]
+                else:
+                    i.pop("roi", None)
+                break
+        self._write_nvd_config()
+
     @staticmethod
     def vaild_ip(ip: str) -> int:
         """
@@ -53,6 +53,9 @@ class VideoMonitorApp:
         根据不为-10的返回值可以确定错误情况
     shared_event : multiprocessing.Event
         进程事件通信对象，用于通知执行任务进程是否停止，每次创建执行任务进程时刷新
+    detector_service : Detector_Service
+        常驻识别服务，在创建窗口时启动，退出时结束，执行任务的进程连接到该服务进行识别
+        多次开始和停止监控时不需要重新创建识别进程和加载模型
 
     Notes
     -----
@@ -69,6 +72,11 @@ class VideoMonitorApp:
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         # 类内的默认处理器对象，用于在Video_Processor中的获得相关信息
         self.video_processor = Video_Processor()
+        # 启动常驻识别服务，在后台加载和预热模型
+        self.detector_service = Detector_Service(self.video_processor.video_detector,
+                                                 frame_buffer_size=self.video_processor.frame_buffer_size,
+                                                 frame_buffer_policy=self.video_processor.frame_buffer_policy)
+        self.detector_service.start()
         # 进程类型和进程对象
         self.process_type = 0
         self.processes = None
@@ -220,6 +228,32 @@ class VideoMonitorApp:
         else:
             self.start_button.config(state=tk.NORMAL)  # 将"开始"按钮设为可用
 
+    def health_description(self, url: str) -> str:
+        """
+        获得网络视频设备健康状态的描述，用于在选择已有地址时展示
+        Parameters
+        ----------
+        url : str
+            网络视频设备的url地址
+        Returns
+        -------
+        description : str
+            健康状态的描述字符串，没有有效期内的记录时为"状态: 未知"
+        """
+        if not url:
+            return ""
+        health = self.video_processor.nvd_health_prober.get_health(url)
+        if health is None:
+            return "状态: 未知"
+        if health["online"]:
+            description = f"状态: 在线 {health['width']}x{health['height']} {health['fps']}fps"
+            if health["latency"] is not None:
+                description += f" 延迟{health['latency']:.0f}ms"
+            return description
+        if health["last_seen"] is not None:
+            return f"状态: 离线 最后在线于{health['last_seen']}"
+        return "状态: 离线"
+
     def confirm_source(self, value: str):
         """
         确定资源信息函数，用于选择视频设备类型时的处理，与主窗口选择视频类型的操作列表绑定
@@ -255,9 +289,14 @@ class VideoMonitorApp:
         input_window.protocol('WM_DELETE_WINDOW', lambda: cancel())  # 将关闭按钮与取消函数关联
         input_var = tk.StringVar()
 
-        # 子函数，用于选择url地址
+        # 网络视频设备健康状态的标签，选择网络摄像设备时创建
+        address_status_label = None
+
+        # 子函数，用于选择url地址，并展示该地址的健康状态
         def choose_address(sub_value):
             input_var.set(sub_value)
+            if address_status_label is not None:
+                address_status_label.config(text=self.health_description(sub_value))
 
         input_entry = ttk.Entry(input_window, font=self.label_font, textvariable=input_var, width=30)
         if value == "本地历史视频":
@@ -280,12 +319,15 @@ class VideoMonitorApp:
         elif value == "网络摄像设备":
             self.save_check.grid()
             input_window.title("输入摄像头地址")
-            self.center_window(input_window, 410, 170)
+            self.center_window(input_window, 410, 210)
             ttk.Label(input_window, text="输入设备地址:").grid(row=0, column=0, padx=5, pady=20)
             address_label = ttk.Label(input_window, text="选择已有地址:")
             address_label.grid(row=1, column=0, padx=5, pady=10)
+            health_prober = self.video_processor.nvd_health_prober
             if self.video_processor.nvd_processor.nvd_config_data:
                 url_list = [list(d.values())[0] for d in self.video_processor.nvd_processor.nvd_config_data]
+                # 根据健康状态缓存排序，在线的地址在前
+                url_list = health_prober.sort_by_health(url_list)
             else:
                 url_list = [""]
             address_var = tk.StringVar()
@@ -294,6 +336,22 @@ class VideoMonitorApp:
             address_menu = ttk.OptionMenu(input_window, address_var, *address_options, command=choose_address)
             address_menu.grid(row=1, column=1, pady=10, sticky='W')
             address_menu['menu'].config(font=self.label_font)
+            address_status_label = ttk.Label(input_window, text=self.health_description(url_list[0]))
+            address_status_label.grid(row=2, column=0, columnspan=2, padx=5)
+
+            # 在后台线程中并发探测超过有效期的地址，完成后更新状态标签
+            probe_thread = threading.Thread(target=health_prober.probe_all, args=(url_list,), daemon=True)
+            probe_thread.start()
+
+            def check_probe():
+                if not input_window.winfo_exists():
+                    return
+                if probe_thread.is_alive():
+                    input_window.after(200, check_probe)
+                else:
+                    address_status_label.config(text=self.health_description(address_var.get()))
+
+            input_window.after(200, check_probe)
             self.video_device_label.destroy()
             self.video_device_label = ttk.Label(self.root, text="选择可用设备:")
             self.video_device_label.grid(row=1, column=0, pady=10)
@@ -362,7 +420,7 @@ class VideoMonitorApp:
 
         # 创建子窗口时使用
         self.bottom = tk.Frame(input_window)
-        self.bottom.grid(row=2, column=0, columnspan=2)
+        self.bottom.grid(row=3, column=0, columnspan=2)
         c = tk.Frame(self.bottom)
         c.pack(fill="x")
         c.columnconfigure(0, weight=1)
@@ -415,6 +473,7 @@ class VideoMonitorApp:
                 kwargs={
                     "shared_value": self.shared_value,
                     "shared_event": self.shared_event,
+                    "detector_service": self.detector_service,
                     "video_sourse": int(device_dict[self.video_device_var.get()]),
                     "flag_visibility": self.visibility_var.get(),
                     "flag_save": self.save_var.get(),
@@ -432,6 +491,7 @@ class VideoMonitorApp:
                 kwargs={
                     "shared_value": self.shared_value,
                     "shared_event": self.shared_event,
+                    "detector_service": self.detector_service,
                     "video_sourse": self.date_url,
                     "flag_visibility": self.visibility_var.get(),
                     "flag_save": self.save_var.get(),
@@ -490,6 +550,8 @@ class VideoMonitorApp:
             self.video_processor.logger.log_write(f"Exit the home security surveillance system. "
                                                   f"Thanks for your using!",
                                                   Log_Processor.INFO)
+        # 结束常驻识别服务，释放其共享内存
+        self.detector_service.stop()
         # 确保退出程序
         sys.exit(0)
 
@@ -700,14 +762,16 @@ class VideoMonitorApp:
 
     @staticmethod
     def local_process_workder(shared_value, shared_event, video_sourse, flag_visibility,
-                              flag_save, flag_detect, video_detect_sensitivity, video_detect_type):
+                              flag_save, flag_detect, video_detect_sensitivity, video_detect_type,
+                              detector_service=None):
         """
-        处理本地视频设备进程的工作函数，除共享内存对象和进程事件通信对象外
+        处理本地视频设备进程的工作函数，除共享内存对象、进程事件通信对象和常驻识别服务外
         其他传入参数类型和意义与视频流处理器的对应处理函数相同
         是一个静态方法，只通过传递的共享内存对象和进程事件通信对象进行进程间的交互
         """
         vp = Video_Processor(url_capture_time_out=10,
-                             event=shared_event, return_value=shared_value)
+                             event=shared_event, return_value=shared_value,
+                             detector_service=detector_service)
         vp.load_local_video_device(video_sourse=video_sourse,
                                    flag_visibility=flag_visibility,
                                    flag_save=flag_save,
@@ -717,14 +781,16 @@ class VideoMonitorApp:
 
     @staticmethod
     def device_process_workder(shared_value, shared_event, video_sourse, flag_visibility,
-                               flag_save, flag_detect, video_detect_sensitivity, video_detect_type):
+                               flag_save, flag_detect, video_detect_sensitivity, video_detect_type,
+                               detector_service=None):
         """
-        处理网络视频设备进程的工作函数，除共享内存对象和进程事件通信对象外
+        处理网络视频设备进程的工作函数，除共享内存对象、进程事件通信对象和常驻识别服务外
         其他传入参数类型和意义与视频流处理器的对应处理函数相同
         是一个静态方法，只通过传递的共享内存对象和进程事件通信对象进行进程间的交互
         """
         vp = Video_Processor(url_capture_time_out=10,
-                             event=shared_event, return_value=shared_value)
+                             event=shared_event, return_value=shared_value,
+                             detector_service=detector_service)
         vp.load_network_video_device(video_sourse=video_sourse,
                                      flag_visibility=flag_visibility,
                                      flag_save=flag_save,
@@ -1,3 +1,4 @@
 ## 根据各模块的__all__变量导入对应函数和变量
 from .video_processor import *
 from .video_detect import *
+from .detector_service import *
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+File Name: box_tracker.py
+Author: 07xiaohei
+Date: 2026-10-16
+Version: 1.0
+Description: 基于Lucas-Kanade光流的轻量级识别框跟踪器，在两次模型识别之间传播识别框
+"""
+
+# 引入常用库
+from home_security_surveillance.Common import *
+
+__all__ = ["Box_Tracker"]
+
+class Box_Tracker(object):
+    """
+    Box_Tracker(detect_interval, scale_width)
+
+    识别框跟踪器，每detect_interval帧进行一次完整的模型识别，其余视频帧使用光流跟踪上一次识别到的识别框
+    在每个识别框内选取角点，用金字塔Lucas-Kanade光流计算其在新视频帧中的位置，按位移的中位数平移识别框
+    某个识别框可跟踪的角点过少时认为跟踪丢失，需要立即重新进行模型识别
+
+    Parameters
+    ----------
+    detect_interval : int
+        两次模型识别之间的视频帧间隔，默认为5，即每5帧识别1帧，其余4帧跟踪
+    scale_width : int
+        计算光流时缩放到的宽度，高度按比例缩放，默认为640
+
+    Attributes
+    ----------
+    detect_interval : int
+        两次模型识别之间的视频帧间隔
+    scale_width : int
+        计算光流时缩放到的宽度
+    detect_count : int
+        进行模型识别的视频帧数量
+    track_count : int
+        使用光流跟踪的视频帧数量
+    lost_count : int
+        因跟踪丢失而强制重新识别的次数
+    _box_dict : Dict[int, np.ndarray]
+        上一次识别或跟踪得到的识别框，key为模型的模式，value为(N, 6)的数组
+        每行为x1, y1, x2, y2, 置信度, 类别，坐标是视频帧中的像素坐标
+    _point_list : List[np.ndarray]
+        按_box_dict中模式和识别框的顺序保存的每个识别框内的角点，坐标是缩放后的像素坐标
+    _gray : Optional[np.ndarray]
+        上一个视频帧缩放后的灰度图像，为None时说明需要进行模型识别
+    _scale : float
+        缩放后的宽度与视频帧宽度的比例
+    _tracked_frame : int
+        上一次模型识别后已经跟踪的视频帧数量
+    _max_points : int
+        每个识别框内最多选取的角点数量，是类变量
+    _min_points : int
+        每个识别框跟踪成功所需的最少角点数量，是类变量
+    """
+
+    # 每个识别框内最多选取的角点数量
+    _max_points = 20
+    # 每个识别框跟踪成功所需的最少角点数量
+    _min_points = 3
+
+    def __init__(self, detect_interval: int = 5, scale_width: int = 640):
+        """初始化识别框跟踪器"""
+        # 记录变量
+        self.detect_interval = detect_interval
+        self.scale_width = scale_width
+        self.detect_count = 0
+        self.track_count = 0
+        self.lost_count = 0
+        self._box_dict = {}
+        self._point_list = []
+        self._gray = None
+        self._scale = 1.0
+        self._tracked_frame = 0
+
+    def _to_gray(self, frame: np.ndarray) -> np.ndarray:
+        """将视频帧缩放并转为灰度图像，视为内部函数，不提供外部接口"""
+        height, width = frame.shape[:2]
+        self._scale = self.scale_width / width
+        scale_height = max(1, round(height * self._scale))
+        gray = cv.resize(frame, (self.scale_width, scale_height), interpolation=cv.INTER_AREA)
+        return cv.cvtColor(gray, cv.COLOR_BGR2GRAY)
+
+    def _select_points(self, gray: np.ndarray, box: np.ndarray) -> np.ndarray:
+        """
+        在识别框内选取用于跟踪的角点，角点不足时使用识别框内的均匀网格点，视为内部函数，不提供外部接口
+
+        Parameters
+        ----------
+        gray : np.ndarray
+            缩放后的灰度图像
+        box : np.ndarray
+            识别框的x1, y1, x2, y2，是视频帧中的像素坐标
+
+        Returns
+        -------
+        points : np.ndarray
+            (N, 1, 2)的float32数组，是缩放后的像素坐标
+        """
+        height, width = gray.shape
+        x1, y1, x2, y2 = np.clip(np.round(box[:4] * self._scale).astype(int),
+                                 0, [width - 1, height - 1, width - 1, height - 1])
+        mask = np.zeros_like(gray)
+        mask[y1:y2 + 1, x1:x2 + 1] = 255
+        points = cv.goodFeaturesToTrack(gray, self._max_points, 0.01, 3, mask=mask)
+        if points is None or len(points) < self._min_points:
+            grid_x, grid_y = np.meshgrid(np.linspace(x1, x2, 4), np.linspace(y1, y2, 4))
+            points = np.stack([grid_x.ravel(), grid_y.ravel()], axis=1).reshape(-1, 1, 2)
+        return points.astype(np.float32)
+
+    def need_detect(self) -> bool:
+        """当前视频帧是否需要进行模型识别，包括还没有识别过、已经跟踪了足够的帧数和跟踪丢失三种情况"""
+        return self._gray is None or self._tracked_frame >= self.detect_interval - 1
+
+    def update(self, frame: np.ndarray, box_dict: Dict[int, np.ndarray]):
+        """
+        使用模型识别的结果更新跟踪器，重新选取每个识别框内的角点
+
+        Parameters
+        ----------
+        frame : np.ndarray
+            进行模型识别的视频帧
+        box_dict : Dict[int, np.ndarray]
+            模型识别得到的识别框，key为模型的模式，value为(N, 6)的数组，含义与_box_dict相同
+        """
+        self.detect_count += 1
+        self._gray = self._to_gray(frame)
+        self._box_dict = {model: np.array(box_data, dtype=np.float32).reshape(-1, 6)
+                          for model, box_data in box_dict.items()}
+        self._point_list = [self._select_points(self._gray, box)
+                            for box_data in self._box_dict.values() for box in box_data]
+        self._tracked_frame = 0
+
+    def track(self, frame: np.ndarray) -> Optional[Dict[int, np.ndarray]]:
+        """
+        使用光流将上一次的识别框传播到当前视频帧
+
+        Parameters
+        ----------
+        frame : np.ndarray
+            要跟踪的视频帧
+
+        Returns
+        -------
+        box_dict : Optional[Dict[int, np.ndarray]]
+            当前视频帧的识别框，含义与_box_dict相同，跟踪丢失时返回None，此时需要进行模型识别
+        """
+        gray = self._to_gray(frame)
+        # 所有识别框的角点一起计算光流
+        if self._point_list:
+            old_points = np.concatenate(self._point_list)
+            new_points, status, _ = cv.calcOpticalFlowPyrLK(self._gray, gray, old_points, None,
+                                                            winSize=(15, 15), maxLevel=2)
+            status = status.ravel().astype(bool)
+
+            # 按识别框拆分角点，计算每个识别框的位移，识别框是_box_dict中数组的行视图，直接原地平移
+            height, width = frame.shape[:2]
+            box_list = [box for box_data in self._box_dict.values() for box in box_data]
+            point_list = []
+            start = 0
+            for box, points in zip(box_list, self._point_list):
+                end = start + len(points)
+                good = status[start:end]
+                good_old = old_points[start:end][good]
+                good_new = new_points[start:end][good]
+                start = end
+                # 可跟踪的角点过少，认为跟踪丢失
+                if len(good_new) < self._min_points:
+                    self.lost_count += 1
+                    self._gray = None
+                    return None
+                dx, dy = np.median(good_new - good_old, axis=0).ravel() / self._scale
+                box[:4] += [dx, dy, dx, dy]
+                box[:4] = np.clip(box[:4], 0, [width - 1, height - 1, width - 1, height - 1])
+                point_list.append(good_new.reshape(-1, 1, 2))
+            self._point_list = point_list
+
+        self.track_count += 1
+        self._gray = gray
+        self._tracked_frame += 1
+        return {model: box_data.copy() for model, box_data in self._box_dict.items()}
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获得识别框跟踪器的统计信息
+
+        Returns
+        -------
+        stats : Dict[str, int]
+            包括detected(识别数)、tracked(跟踪数)和lost(跟踪丢失数)
+        """
+        return {"detected": self.detect_count, "tracked": self.track_count, "lost": self.lost_count}
+
+
+## 作为嵌入类，需要直接在video_detect中进行集成测试 ##
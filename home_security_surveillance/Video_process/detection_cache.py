@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+File Name: detection_cache.py
+Author: 07xiaohei
+Date: 2026-10-16
+Version: 1.0
+Description: 单个模型对单个视频的逐帧识别结果缓存，以紧凑的数组格式保存，改变置信度阈值时只需过滤而不必重新识别
+"""
+
+# 引入常用库
+from home_security_surveillance.Common import *
+# 用zipfile.BadZipFile判断缓存文件损坏
+import zipfile
+
+__all__ = ["Detection_Cache"]
+
+class Detection_Cache(object):
+    """
+    Detection_Cache(cache_path)
+
+    单个模型对单个视频的逐帧识别结果缓存，保存以最低置信度阈值识别得到的全部识别框
+    缓存文件是.npz格式，所有视频帧的识别框拼接为一个(M, 6)的float32数组，按帧索引和偏移量数组拆分
+    每行为x1, y1, x2, y2, 置信度, 类别，使用更高的置信度阈值时只需按置信度过滤
+    缓存文件的名称由调用者根据视频文件、模型权重的哈希值和识别参数确定，参数改变后使用新的缓存文件
+
+    Parameters
+    ----------
+    cache_path : str
+        缓存文件的绝对路径
+
+    Attributes
+    ----------
+    cache_path : str
+        缓存文件的绝对路径
+    names : Dict[int, str]
+        模型的类别名称，用于重建识别结果
+    frame_count : int
+        视频的总帧数，为0时说明还没有识别完整个视频，只缓存了部分视频帧
+    _frame_dict : Dict[int, np.ndarray]
+        已缓存的各视频帧的识别框，key为帧索引，value为(N, 6)的数组
+    _pending_dict : Dict[int, np.ndarray]
+        加载后新加入、还没有保存的各视频帧的识别框，可以传递给其他进程合并
+    """
+
+    def __init__(self, cache_path: str):
+        """初始化识别结果缓存，不读取缓存文件"""
+        # 记录变量
+        self.cache_path = cache_path
+        self.names = {}
+        self.frame_count = 0
+        self._frame_dict = {}
+        self._pending_dict = {}
+
+    def __len__(self) -> int:
+        """已缓存的视频帧数量"""
+        return len(self._frame_dict)
+
+    def is_complete(self) -> bool:
+        """是否已经缓存了整个视频的全部视频帧"""
+        return self.frame_count > 0 and len(self._frame_dict) >= self.frame_count
+
+    def load(self) -> bool:
+        """
+        读取缓存文件，缓存文件不存在或已损坏时保持为空
+
+        Returns
+        -------
+        flag : bool
+            是否成功读取了缓存文件
+        """
+        if not os.path.exists(self.cache_path):
+            return False
+        try:
+            with np.load(self.cache_path) as data:
+                frame_index = data["frame_index"]
+                offset = data["offset"]
+                box_data = data["box_data"]
+                names = data["names"]
+                frame_count = int(data["frame_count"])
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return False
+        self.names = dict(enumerate(names.tolist()))
+        self.frame_count = frame_count
+        self._frame_dict = dict(zip(frame_index.tolist(), np.split(box_data, offset[1:-1])))
+        return True
+
+    def get(self, frame_index: int, conf: float = 0.0) -> Optional[np.ndarray]:
+        """
+        获得视频帧缓存的识别框
+
+        Parameters
+        ----------
+        frame_index : int
+            视频帧的索引
+        conf : float
+            置信度阈值，只返回置信度不低于该阈值的识别框，默认为0.0，即返回全部识别框
+
+        Returns
+        -------
+        box_data : Optional[np.ndarray]
+            (N, 6)的数组，含义与_frame_dict相同，视频帧没有被缓存时返回None
+        """
+        box_data = self._frame_dict.get(frame_index)
+        if box_data is None:
+            return None
+        return box_data[box_data[:, 4] >= conf]
+
+    def put(self, frame_index: int, box_data: np.ndarray):
+        """
+        加入视频帧的识别框
+
+        Parameters
+        ----------
+        frame_index : int
+            视频帧的索引
+        box_data : np.ndarray
+            (N, 6)的数组，含义与_frame_dict相同
+        """
+        box_data = np.asarray(box_data, dtype=np.float32).reshape(-1, 6)
+        self._frame_dict[frame_index] = box_data
+        self._pending_dict[frame_index] = box_data
+
+    def pending(self) -> Dict[int, np.ndarray]:
+        """获得加载后新加入、还没有保存的各视频帧的识别框"""
+        return self._pending_dict
+
+    def update(self, frame_dict: Dict[int, np.ndarray]):
+        """合并其他进程中同一缓存新加入的各视频帧的识别框"""
+        for frame_index, box_data in frame_dict.items():
+            self.put(frame_index, box_data)
+
+    def save(self):
+        """将全部缓存写入缓存文件，先写入临时文件再替换，避免中断时损坏已有的缓存文件"""
+        if not self._pending_dict:
+            return
+        frame_index = np.array(sorted(self._frame_dict), dtype=np.int64)
+        box_list = [self._frame_dict[index] for index in frame_index.tolist()]
+        offset = np.zeros(len(box_list) + 1, dtype=np.int64)
+        offset[1:] = np.cumsum([len(box_data) for box_data in box_list])
+        box_data = np.concatenate(box_list) if box_list else np.zeros((0, 6), dtype=np.float32)
+        names = np.array([self.names[index] for index in sorted(self.names)], dtype=str)
+
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        temp_path = self.cache_path + ".tmp"
+        with open(temp_path, "wb") as file:
+            np.savez_compressed(file, frame_index=frame_index, offset=offset, box_data=box_data,
+                                names=names, frame_count=np.array(self.frame_count))
+        os.replace(temp_path, self.cache_path)
+        self._pending_dict = {}
+
+
+## 作为嵌入类，需要直接在video_detect中进行集成测试 ##
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+File Name: detector_service.py
+Author: 07xiaohei
+Date: 2026-10-16
+Version: 1.0
+Description: 常驻的识别服务进程，多次监控任务通过连接和解除连接使用同一份已加载的模型
+"""
+
+# 引入常用库
+from home_security_surveillance.Common import *
+# 引入frame_ring_buffer库
+from home_security_surveillance.Video_process.frame_ring_buffer import *
+# 引入video_detect库
+from home_security_surveillance.Video_process.video_detect import *
+# 用queue.Empty判断等待响应超时
+import queue
+
+__all__ = ["Detector_Service"]
+
+class Detector_Service(object):
+    """
+    Detector_Service(video_detector, slot_count, frame_buffer_size, frame_shape, frame_buffer_policy)
+
+    常驻识别服务的句柄，负责创建识别服务进程和与其通信所需的全部共享对象
+    识别服务进程通过run_video_detector运行Video_Detector.serve，模型只在服务启动或第一次使用某个模式时加载一次
+    每个监控任务通过attach占用一个槽位，获得该槽位的视频帧环形缓冲区和结果队列，结束时通过detach释放槽位
+    多进程共享的缓冲区、队列和条件变量只能在创建进程时传递，因此全部槽位在创建句柄时预先分配
+    句柄可以作为参数传递给监控任务的进程，但只有创建者可以启动和结束识别服务
+
+    Parameters
+    ----------
+    video_detector : Video_Detector
+        识别服务使用的视频检测处理器，只将其配置传递给服务进程
+    slot_count : int
+        可以同时连接的视频设备数量，默认为4
+    frame_buffer_size : int
+        每个槽位的视频帧环形缓冲区的槽位数量，默认为16
+    frame_shape : Tuple[int, int, int]
+        视频帧的最大形状，默认为720p的彩色图像，即(720, 1280, 3)
+    frame_buffer_policy : str
+        视频帧环形缓冲区已满时的处理策略，默认为"drop_oldest"
+
+    Attributes
+    ----------
+    slot_count : int
+        可以同时连接的视频设备数量
+    frame_queue_list : List[Frame_Ring_Buffer]
+        各槽位的视频帧环形缓冲区，使用同一个条件变量
+    result_queue_list : List[multiprocessing.Queue]
+        各槽位的结果队列
+    response_queue_list : List[multiprocessing.Queue]
+        各槽位的响应队列
+    request_queue : multiprocessing.Queue
+        向识别服务发送请求的队列
+    ready_event : synchronize.Event
+        识别服务完成默认模型的加载和预热后设置的事件
+    _slot_used : multiprocessing.Array
+        各槽位是否已被占用，通过其自带的锁在多个进程之间分配槽位
+    _detector_spec : Dict[str, Any]
+        识别服务使用的视频检测处理器的配置，由Video_Detector.to_spec获得
+    _process : Optional[multiprocessing.Process]
+        识别服务进程，只在创建者中有效
+    _response_time_out : float
+        等待识别服务响应的最长时间，单位为秒，连接时可能需要加载新的模型，是类变量
+    _stop_time_out : float
+        结束识别服务时等待其退出的最长时间，超时后强制终止，是类变量
+    """
+
+    # 等待识别服务响应的最长时间
+    _response_time_out = 120
+    # 结束识别服务时等待其退出的最长时间
+    _stop_time_out = 10
+
+    def __init__(self, video_detector: Video_Detector, slot_count: int = 4, frame_buffer_size: int = 16,
+                 frame_shape: Tuple[int, int, int] = (720, 1280, 3),
+                 frame_buffer_policy: str = "drop_oldest"):
+        """初始化识别服务的句柄，预先分配全部槽位"""
+        # 记录变量
+        self.slot_count = slot_count
+        condition = multiprocessing.Condition()
+        self.frame_queue_list = [Frame_Ring_Buffer(frame_buffer_size, frame_shape, frame_buffer_policy, condition)
+                                 for _ in range(slot_count)]
+        self.result_queue_list = [multiprocessing.Queue() for _ in range(slot_count)]
+        self.response_queue_list = [multiprocessing.Queue() for _ in range(slot_count)]
+        self.request_queue = multiprocessing.Queue()
+        self.ready_event = multiprocessing.Event()
+        self._slot_used = multiprocessing.Array("b", slot_count)
+        self._detector_spec = video_detector.to_spec()
+        self._process = None
+
+    def __getstate__(self) -> dict:
+        """传递给其他进程时不包括服务进程"""
+        state = self.__dict__.copy()
+        state["_process"] = None
+        return state
+
+    def start(self):
+        """启动识别服务进程，只有创建者可以调用"""
+        if self._process is not None and self._process.is_alive():
+            return
+        self.ready_event.clear()
+        self._process = multiprocessing.Process(
+            target=run_video_detector,
+            args=(self._detector_spec, "serve", self.frame_queue_list, self.result_queue_list,
+                  self.request_queue, self.response_queue_list),
+            kwargs={"ready_event": self.ready_event}, daemon=True)
+        self._process.start()
+
+    def is_ready(self) -> bool:
+        """识别服务是否已经完成默认模型的加载和预热"""
+        return self.ready_event.is_set()
+
+    def owns(self, frame_queue: Frame_Ring_Buffer) -> bool:
+        """视频帧环形缓冲区是否属于该识别服务的某个槽位"""
+        return any(frame_queue is slot_queue for slot_queue in self.frame_queue_list)
+
+    def attach(self, mode: int, sensitivity: int = 0, roi_list: List[List[List[float]]] = None,
+               timeout: float = None) -> Optional[Tuple[Frame_Ring_Buffer, multiprocessing.Queue]]:
+        """
+        占用一个空闲槽位并连接到识别服务，返回时识别服务已经准备好识别该槽位的视频帧
+
+        Parameters
+        ----------
+        mode : int
+            识别的模式，含义与Video_Detector.detect相同
+        sensitivity : int
+            对异常的敏感程度，含义与Video_Detector.detect相同
+        roi_list : List[List[List[float]]]
+            感兴趣区域的多边形列表，含义与Video_Detector.detect相同
+        timeout : float
+            等待识别服务响应的最长时间，单位为秒，默认为_response_time_out
+
+        Returns
+        -------
+        slot_queue : Optional[Tuple[Frame_Ring_Buffer, multiprocessing.Queue]]
+            该槽位的视频帧环形缓冲区和结果队列，没有空闲槽位、连接失败或超时时返回None
+        """
+        if timeout is None:
+            timeout = self._response_time_out
+        # 分配空闲槽位
+        with self._slot_used.get_lock():
+            free_list = [slot for slot in range(self.slot_count) if not self._slot_used[slot]]
+            if not free_list:
+                return None
+            slot = free_list[0]
+            self._slot_used[slot] = 1
+        # 清空上一次连接遗留的响应和结果
+        self._drain(self.response_queue_list[slot])
+        self._drain(self.result_queue_list[slot])
+
+        self.request_queue.put(("attach", slot, mode, sensitivity, roi_list))
+        if self._wait_response(slot, timeout) != "attached":
+            self._slot_used[slot] = 0
+            return None
+        return self.frame_queue_list[slot], self.result_queue_list[slot]
+
+    def detach(self, frame_queue: Frame_Ring_Buffer, timeout: float = None):
+        """
+        关闭槽位的缓冲区并解除与识别服务的连接，释放该槽位
+
+        Parameters
+        ----------
+        frame_queue : Frame_Ring_Buffer
+            attach返回的视频帧环形缓冲区
+        timeout : float
+            等待识别服务响应的最长时间，单位为秒，默认为_response_time_out
+        """
+        if timeout is None:
+            timeout = self._response_time_out
+        slot = [index for index, slot_queue in enumerate(self.frame_queue_list) if slot_queue is frame_queue][0]
+        frame_queue.shutdown()
+        self.request_queue.put(("detach", slot))
+        self._wait_response(slot, timeout)
+        self._drain(self.result_queue_list[slot])
+        self._slot_used[slot] = 0
+
+    def stop(self):
+        """结束识别服务进程并释放全部缓冲区，只有创建者可以调用"""
+        if self._process is not None:
+            self.request_queue.put(("stop",))
+            self._process.join(self._stop_time_out)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+            self._process = None
+        for frame_queue in self.frame_queue_list:
+            frame_queue.close()
+            frame_queue.unlink()
+
+    def _wait_response(self, slot: int, timeout: float) -> Optional[str]:
+        """等待槽位的响应，超时时返回None，视为内部函数，不提供外部接口"""
+        try:
+            return self.response_queue_list[slot].get(timeout=timeout)[0]
+        except queue.Empty:
+            return None
+
+    @staticmethod
+    def _drain(target_queue: multiprocessing.Queue):
+        """清空队列中剩余的元素，视为内部函数，不提供外部接口"""
+        while True:
+            try:
+                target_queue.get_nowait()
+            except queue.Empty:
+                return
+
+
+## 作为嵌入类，需要直接在video_processor中进行集成测试 ##
@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+"""
+File Name: frame_ring_buffer.py
+Author: 07xiaohei
+Date: 2026-10-16
+Version: 1.0
+Description: 基于共享内存的视频帧环形缓冲区，用于在视频流处理进程和识别进程之间无序列化地传递视频帧
+"""
+
+# 引入常用库
+from home_security_surveillance.Common import *
+# 引入shared_memory库，用于创建跨进程的共享内存块
+from multiprocessing import shared_memory
+# 引入queue库，使用其Empty和Full异常，与multiprocessing.Queue的接口保持一致
+import queue
+
+__all__ = ["Frame_Ring_Buffer"]
+
+class Frame_Ring_Buffer(object):
+    """
+    Frame_Ring_Buffer(slot_count, frame_shape, policy, condition)
+
+    基于multiprocessing.shared_memory的视频帧环形缓冲区，可以直接替换视频帧队列frame_queue使用
+    缓冲区在创建时预先分配slot_count个视频帧槽位，每个槽位记录写入时的序号、视频帧的形状和捕捉时间
+    视频帧直接拷贝到共享内存中，跨进程传递时不再需要pickle序列化、管道传输和反序列化
+    缓冲区是有界的，已满时按照policy指定的策略处理新的视频帧，并统计放入、取出和丢弃的视频帧数量
+
+    Parameters
+    ----------
+    slot_count : int
+        预分配的视频帧槽位数量，默认为16
+    frame_shape : Tuple[int, int, int]
+        单个槽位能够容纳的最大视频帧形状，默认为720p的彩色图像，即(720, 1280, 3)
+        形状不同但字节数不超过该大小的视频帧(如竖屏的(1280, 720, 3))同样可以放入
+    policy : str
+        缓冲区已满时的处理策略，默认为"drop_oldest"
+        "drop_oldest"丢弃最旧的视频帧，保证总能拿到最新的视频帧，即最新优先
+        "drop_newest"丢弃新放入的视频帧，保留已缓冲的视频帧
+        "block"阻塞放入者，直到有空闲槽位或等待超时，超时后丢弃新放入的视频帧
+    condition : multiprocessing.Condition
+        缓冲区使用的条件变量，默认为None，此时创建一个新的条件变量
+        多个缓冲区使用同一个条件变量时，读取者可以通过wait_any同时等待这些缓冲区
+
+    Attributes
+    ----------
+    slot_count : int
+        预分配的视频帧槽位数量
+    slot_nbytes : int
+        单个槽位的字节数
+    policy : str
+        缓冲区已满时的处理策略
+    policy_list : List[str]
+        可用的处理策略，是类变量
+    last_sequence : int
+        最后一次通过get获得的视频帧的序号，序号从1开始递增，未获得过视频帧时为0
+    last_timestamp : float
+        最后一次通过get获得的视频帧的捕捉时间，单位为秒，未获得过视频帧时为0.0
+    _shm : shared_memory.SharedMemory
+        保存控制信息和全部视频帧槽位的共享内存块
+    _condition : multiprocessing.Condition
+        保护共享内存中读写位置的条件变量，用于跨进程的互斥和唤醒
+    _owner : bool
+        是否为共享内存的创建者，只有创建者可以释放(unlink)共享内存
+    _info : np.ndarray
+        共享内存中控制信息部分的int64视图，包括读写序号和每个槽位的元信息
+    _slots : np.ndarray
+        共享内存中视频帧部分的uint8视图，每行对应一个槽位
+
+    Notes
+    -----
+    控制信息的布局为：[写入序号, 读取序号, 放入数, 取出数, 丢弃数, 关闭标志, 心跳时间, 保留] + 每个槽位的[序号, 高, 宽, 通道数, 捕捉时间]
+    写入序号和读取序号单调递增，二者之差为当前缓冲的视频帧数量，槽位位置为序号对槽位数量取模
+    放入None时写入一个高宽均为0的槽位，读取时还原为None，用作与multiprocessing.Queue相同的结束标志
+    结束标志不受处理策略影响，缓冲区已满时总是丢弃最旧的视频帧来放入结束标志，避免识别进程无法退出
+    统计数量不包括结束标志，始终满足：放入数 = 取出数 + 丢弃数 + 当前缓冲数
+    读取者和阻塞策略下的放入者都在条件变量上睡眠等待，而不是轮询empty()，空闲时几乎不占用CPU
+    调用shutdown()会设置共享的关闭标志并唤醒所有等待者，此后不再接受视频帧，缓冲的视频帧取完后get()返回None
+    放入者每次put和heartbeat()都会刷新心跳时间，读取者可以通过heartbeat_age()区分放入者暂时没有视频帧和已经停止
+
+    Examples
+    --------
+    """
+
+    # 可用的处理策略
+    #: :noindex:
+    policy_list = ["drop_oldest", "drop_newest", "block"]
+
+    # 控制信息中读写序号和统计数量的位置
+    _WRITE_SEQ = 0
+    _READ_SEQ = 1
+    _PRODUCED = 2
+    _CONSUMED = 3
+    _DROPPED = 4
+    _CLOSED = 5
+    _HEARTBEAT = 6
+    # 控制信息头部占用的int64数量
+    _HEADER_SIZE = 8
+    # 每个槽位元信息占用的int64数量，分别是序号、高、宽、通道数和以微秒为单位的捕捉时间
+    _SLOT_INFO_SIZE = 5
+
+    def __init__(self, slot_count: int = 16, frame_shape: Tuple[int, int, int] = (720, 1280, 3),
+                 policy: str = "drop_oldest", condition: multiprocessing.Condition = None):
+        """初始化环形缓冲区，创建共享内存"""
+
+        if slot_count <= 0:
+            raise ValueError("The slot count of the frame ring buffer must be positive!")
+        if policy not in self.policy_list:
+            raise ValueError(f"The {policy} policy is not in {self.policy_list}!")
+
+        # 记录槽位信息和处理策略
+        self.slot_count = slot_count
+        self.policy = policy
+        self.slot_nbytes = int(np.prod(frame_shape))
+        self.last_sequence = 0
+        self.last_timestamp = 0.0
+
+        # 创建共享内存，大小为控制信息和全部槽位之和
+        self._shm = shared_memory.SharedMemory(create=True, size=self._info_nbytes() +
+                                               self.slot_count * self.slot_nbytes)
+        self._condition = condition if condition is not None else multiprocessing.Condition()
+        self._owner = True
+        # 建立视图并清空控制信息
+        self._attach_views()
+        self._info[:] = 0
+        self._info[self._HEARTBEAT] = int(time.time() * 1000)
+
+    def _info_nbytes(self) -> int:
+        """控制信息部分占用的字节数"""
+        return (self._HEADER_SIZE + self.slot_count * self._SLOT_INFO_SIZE) * 8
+
+    def _attach_views(self):
+        """在共享内存上建立控制信息和视频帧槽位的numpy视图"""
+        self._info = np.ndarray((self._HEADER_SIZE + self.slot_count * self._SLOT_INFO_SIZE,),
+                                dtype=np.int64, buffer=self._shm.buf)
+        self._slots = np.ndarray((self.slot_count, self.slot_nbytes), dtype=np.uint8,
+                                 buffer=self._shm.buf, offset=self._info_nbytes())
+
+    def __getstate__(self) -> dict:
+        """传递给子进程时只传递共享内存的名称和同步对象，不传递视频帧数据"""
+        return {"name": self._shm.name, "slot_count": self.slot_count,
+                "slot_nbytes": self.slot_nbytes, "policy": self.policy, "condition": self._condition}
+
+    def __setstate__(self, state: dict):
+        """子进程中根据共享内存的名称重新连接到同一块共享内存"""
+        self.slot_count = state["slot_count"]
+        self.slot_nbytes = state["slot_nbytes"]
+        self.policy = state["policy"]
+        self.last_sequence = 0
+        self.last_timestamp = 0.0
+        self._condition = state["condition"]
+        self._shm = shared_memory.SharedMemory(name=state["name"])
+        self._owner = False
+        self._attach_views()
+
+    def _slot_info(self, sequence: int) -> np.ndarray:
+        """获得指定序号所在槽位的元信息视图"""
+        start = self._HEADER_SIZE + (sequence % self.slot_count) * self._SLOT_INFO_SIZE
+        return self._info[start: start + self._SLOT_INFO_SIZE]
+
+    def qsize(self) -> int:
+        """当前缓冲的视频帧数量"""
+        with self._condition:
+            return int(self._info[self._WRITE_SEQ] - self._info[self._READ_SEQ])
+
+    def empty(self) -> bool:
+        """缓冲区是否为空"""
+        return self.qsize() == 0
+
+    def full(self) -> bool:
+        """缓冲区是否已满"""
+        return self.qsize() >= self.slot_count
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获得缓冲区的统计数量
+
+        Returns
+        -------
+        stats : Dict[str, int]
+            包括放入数produced、取出数consumed、丢弃数dropped和当前缓冲数queued，不包括结束标志
+        """
+        with self._condition:
+            produced, consumed, dropped = (int(i) for i in
+                                           self._info[self._PRODUCED: self._DROPPED + 1])
+        return {"produced": produced, "consumed": consumed, "dropped": dropped,
+                "queued": produced - consumed - dropped}
+
+    def put(self, frame: Optional[np.ndarray], block: bool = True, timeout: float = None,
+            timestamp: float = None) -> bool:
+        """
+        放入一个视频帧，缓冲区已满时按照处理策略进行处理
+
+        Parameters
+        ----------
+        frame : Optional[np.ndarray]
+            要放入的uint8视频帧，为None时放入结束标志
+        block : bool
+            处理策略为"block"时，缓冲区已满是否等待，默认为True，其他策略下不会阻塞
+        timeout : float
+            处理策略为"block"时等待的最长时间，单位为秒，为None时一直等待
+        timestamp : float
+            视频帧的捕捉时间，单位为秒，默认为time.time()，读取者据此计算视频帧的实际间隔
+
+        Returns
+        -------
+        flag : bool
+            视频帧是否被放入，新放入的视频帧被丢弃时返回False
+        """
+
+        if timestamp is None:
+            timestamp = time.time()
+        # 结束标志的形状为全0
+        if frame is None:
+            shape = (0, 0, 0)
+        else:
+            if frame.dtype != np.uint8:
+                raise TypeError("The frame put into the frame ring buffer must be uint8!")
+            if frame.nbytes > self.slot_nbytes:
+                raise ValueError(f"The frame size {frame.nbytes} is larger than "
+                                 f"the slot size {self.slot_nbytes} of the frame ring buffer!")
+            # 灰度图像补全通道数
+            shape = frame.shape if frame.ndim == 3 else (frame.shape[0], frame.shape[1], 1)
+
+        with self._condition:
+            # 关闭后不再接受视频帧
+            if self._info[self._CLOSED]:
+                return False
+            if frame is not None:
+                self._info[self._PRODUCED] += 1
+                # 阻塞策略下等待空闲槽位，关闭时被唤醒
+                if self.policy == "block" and block:
+                    self._condition.wait_for(
+                        lambda: self._info[self._WRITE_SEQ] - self._info[self._READ_SEQ] < self.slot_count
+                        or self._info[self._CLOSED], timeout)
+                    if self._info[self._CLOSED]:
+                        self._info[self._DROPPED] += 1
+                        return False
+                # 仍然已满时，丢弃新放入的视频帧
+                if self.policy != "drop_oldest" and \
+                        self._info[self._WRITE_SEQ] - self._info[self._READ_SEQ] >= self.slot_count:
+                    self._info[self._DROPPED] += 1
+                    return False
+
+            write_seq = int(self._info[self._WRITE_SEQ])
+            # 已满时丢弃最旧的视频帧
+            if write_seq - self._info[self._READ_SEQ] >= self.slot_count:
+                # 最旧的是结束标志时不计入丢弃数
+                if self._slot_info(int(self._info[self._READ_SEQ]))[1] != 0:
+                    self._info[self._DROPPED] += 1
+                self._info[self._READ_SEQ] += 1
+            # 写入视频帧和槽位元信息
+            if frame is not None:
+                self._slots[write_seq % self.slot_count, :frame.nbytes] = \
+                    np.ascontiguousarray(frame).reshape(-1)
+            self._slot_info(write_seq)[:] = (write_seq + 1, *shape, int(timestamp * 1e6))
+            self._info[self._WRITE_SEQ] = write_seq + 1
+            self._info[self._HEARTBEAT] = int(time.time() * 1000)
+            # 唤醒等待视频帧的读取者
+            self._condition.notify_all()
+        return True
+
+    def put_nowait(self, frame: Optional[np.ndarray]) -> bool:
+        """与put(frame, False)相同"""
+        return self.put(frame, False)
+
+    def get(self, block: bool = True, timeout: float = None) -> Optional[np.ndarray]:
+        """
+        按先入先出的顺序取出一个视频帧
+
+        Parameters
+        ----------
+        block : bool
+            缓冲区为空时是否等待，默认为True
+        timeout : float
+            等待的最长时间，单位为秒，为None时一直等待
+
+        Returns
+        -------
+        frame : Optional[np.ndarray]
+            从共享内存中拷贝得到的视频帧，为结束标志或缓冲区已关闭且为空时返回None
+
+        Raises
+        ------
+        queue.Empty
+            缓冲区为空且不等待，或等待超时
+        """
+
+        with self._condition:
+            # 在条件变量上睡眠，直到有视频帧、缓冲区关闭或超时
+            if block:
+                self._condition.wait_for(
+                    lambda: self._info[self._WRITE_SEQ] > self._info[self._READ_SEQ]
+                    or self._info[self._CLOSED], timeout)
+            if self._info[self._WRITE_SEQ] == self._info[self._READ_SEQ]:
+                # 已关闭且没有剩余视频帧时，返回结束标志
+                if self._info[self._CLOSED]:
+                    return None
+                raise queue.Empty
+
+            read_seq = int(self._info[self._READ_SEQ])
+            sequence, height, width, channel, timestamp = (int(i) for i in self._slot_info(read_seq))
+            # 结束标志
+            if height == 0:
+                frame = None
+            # 拷贝出视频帧，槽位随后可能被覆盖
+            else:
+                self._info[self._CONSUMED] += 1
+                frame = self._slots[read_seq % self.slot_count, :height * width * channel] \
+                    .reshape(height, width, channel).copy()
+                if channel == 1:
+                    frame = frame.reshape(height, width)
+            self.last_sequence = sequence
+            self.last_timestamp = timestamp / 1e6
+            self._info[self._READ_SEQ] = read_seq + 1
+            self._condition.notify_all()
+        return frame
+
+    def get_nowait(self) -> Optional[np.ndarray]:
+        """与get(False)相同"""
+        return self.get(False)
+
+    def _readable(self) -> bool:
+        """是否有视频帧可以取出或已经关闭，调用者需要持有条件变量"""
+        return self._info[self._WRITE_SEQ] > self._info[self._READ_SEQ] or bool(self._info[self._CLOSED])
+
+    @staticmethod
+    def wait_any(buffer_list: List["Frame_Ring_Buffer"], timeout: float = None,
+                 count: int = 1) -> List["Frame_Ring_Buffer"]:
+        """
+        同时等待多个使用同一个条件变量的缓冲区，直到其中至少count个缓冲区有视频帧可以取出或已经关闭
+
+        Parameters
+        ----------
+        buffer_list : List[Frame_Ring_Buffer]
+            要等待的缓冲区列表，必须使用同一个条件变量
+        timeout : float
+            等待的最长时间，单位为秒，为None时一直等待
+        count : int
+            需要等到的缓冲区数量，默认为1，即任一缓冲区，超过缓冲区数量时按缓冲区数量计算
+
+        Returns
+        -------
+        ready_list : List[Frame_Ring_Buffer]
+            有视频帧可以取出或已经关闭的缓冲区，保持传入的顺序，等待超时时为此时已就绪的缓冲区(可能为空列表)
+        """
+        if not buffer_list:
+            return []
+        condition = buffer_list[0]._condition
+        if any(buffer._condition is not condition for buffer in buffer_list):
+            raise ValueError("The frame ring buffers waited together must share the same condition!")
+        count = min(count, len(buffer_list))
+        with condition:
+            condition.wait_for(lambda: sum(buffer._readable() for buffer in buffer_list) >= count, timeout)
+            return [buffer for buffer in buffer_list if buffer._readable()]
+
+    def heartbeat(self):
+        """刷新心跳时间但不放入视频帧，用于放入者暂时没有视频帧(如正在重连视频流)时告知读取者其仍在运行"""
+        with self._condition:
+            self._info[self._HEARTBEAT] = int(time.time() * 1000)
+
+    def heartbeat_age(self) -> float:
+        """距离上一次放入视频帧或刷新心跳的时间，单位为秒"""
+        with self._condition:
+            return time.time() - self._info[self._HEARTBEAT] / 1000
+
+    def shutdown(self):
+        """关闭缓冲区，唤醒所有等待的读取者和放入者，是显式的结束标志，不占用槽位也不会被丢弃"""
+        with self._condition:
+            self._info[self._CLOSED] = 1
+            self._condition.notify_all()
+
+    def is_shutdown(self) -> bool:
+        """缓冲区是否已经关闭"""
+        with self._condition:
+            return bool(self._info[self._CLOSED])
+
+    def reset(self):
+        """清空缓冲的视频帧、统计数量和关闭标志，并刷新心跳时间，使已关闭的缓冲区可以被新的放入者重新使用"""
+        with self._condition:
+            self._info[:] = 0
+            self._info[self._HEARTBEAT] = int(time.time() * 1000)
+            self.last_sequence = 0
+            self.last_timestamp = 0.0
+            self._condition.notify_all()
+
+    def close(self):
+        """关闭当前进程对共享内存的访问"""
+        # 先释放视图，否则共享内存无法关闭
+        self._info = None
+        self._slots = None
+        self._shm.close()
+
+    def unlink(self):
+        """释放共享内存，只有创建者调用时有效"""
+        if self._owner:
+            self._shm.unlink()
+
+
+## 作为嵌入类，需要直接在video_processor中进行集成测试 ##
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+File Name: frame_scheduler.py
+Author: 07xiaohei
+Date: 2026-10-16
+Version: 1.0
+Description: 根据识别进程的实际处理速度自适应调整送入识别的视频帧频率的调度器
+"""
+
+# 引入常用库
+from home_security_surveillance.Common import *
+# 引入frame_ring_buffer库
+from home_security_surveillance.Video_process.frame_ring_buffer import *
+
+__all__ = ["Frame_Scheduler"]
+
+class Frame_Scheduler(object):
+    """
+    Frame_Scheduler(frame_queue, max_rate, min_rate, target_depth)
+
+    视频帧抽帧调度器，替代固定的跳帧规则，只决定哪些视频帧送入识别进程
+    定期从视频帧环形缓冲区的统计信息中测量识别进程的取出速度和当前的缓冲深度
+    送入速度跟随取出速度，缓冲堆积时降低，缓冲为空时恢复为上限，使识别进程不会被送入超过其处理能力的视频帧
+    应在识别进程完成预热后创建，视频流中断重连后调用reset，避免把等待的时间计入取出速度
+
+    Parameters
+    ----------
+    frame_queue : Frame_Ring_Buffer
+        传给识别进程的视频帧环形缓冲区
+    max_rate : float
+        送入速度的上限，单位为帧/秒，一般为视频流的帧率
+    min_rate : float
+        送入速度的下限，单位为帧/秒，默认为1，保证识别进程在加载模型等情况下仍能定期收到视频帧
+    target_depth : int
+        期望的缓冲深度，默认为2，缓冲深度高于该值时降低送入速度，低于该值时提高送入速度
+
+    Attributes
+    ----------
+    frame_queue : Frame_Ring_Buffer
+        传给识别进程的视频帧环形缓冲区
+    max_rate : float
+        送入速度的上限
+    min_rate : float
+        送入速度的下限
+    target_depth : int
+        期望的缓冲深度
+    send_rate : float
+        当前的送入速度，单位为帧/秒，初始为送入速度的上限
+    consume_rate : float
+        平滑后的识别进程取出速度，单位为帧/秒
+    sent_count : int
+        已送入识别进程的视频帧数量
+    skipped_count : int
+        被调度器跳过、未送入识别进程的视频帧数量
+    _update_interval : float
+        重新测量并调整送入速度的时间间隔，单位为秒，是类变量
+    _smoothing : float
+        取出速度的指数平滑系数，越大越依赖最新的测量值，是类变量
+    """
+
+    # 重新测量并调整送入速度的时间间隔
+    _update_interval = 1.0
+    # 取出速度的指数平滑系数
+    _smoothing = 0.5
+
+    def __init__(self, frame_queue: Frame_Ring_Buffer, max_rate: float,
+                 min_rate: float = 1, target_depth: int = 2):
+        """初始化调度器"""
+        # 记录变量，帧率未知时不限制送入速度的上限
+        self.frame_queue = frame_queue
+        self.max_rate = max(max_rate, min_rate) if max_rate > 0 else float("inf")
+        self.min_rate = min_rate
+        self.target_depth = target_depth
+        self.sent_count = 0
+        self.skipped_count = 0
+        self.reset()
+
+    def reset(self, now: float = None):
+        """
+        重新开始测量取出速度，送入速度恢复为上限，在识别进程或视频流长时间没有视频帧交换后调用
+
+        Parameters
+        ----------
+        now : float
+            当前时间，默认为time.time()
+        """
+        if now is None:
+            now = time.time()
+        self.send_rate = self.max_rate
+        self.consume_rate = 0.0
+        # 上一次测量时的时间和取出数，以及下一次允许送入的时间
+        self._update_time = now
+        self._consumed = self.frame_queue.stats()["consumed"]
+        self._next_send_time = 0.0
+
+    def _update(self, now: float):
+        """测量取出速度和缓冲深度，并调整送入速度，视为内部函数，不提供外部接口"""
+        stats = self.frame_queue.stats()
+        rate = (stats["consumed"] - self._consumed) / (now - self._update_time)
+        self.consume_rate = self._smoothing * rate + (1 - self._smoothing) * self.consume_rate
+        self._update_time = now
+        self._consumed = stats["consumed"]
+        # 缓冲为空说明识别进程正在等待，取出速度受限于送入速度而不是识别能力，直接恢复为上限
+        if stats["queued"] == 0:
+            self.send_rate = self.max_rate
+            return
+        # 送入速度跟随取出速度，并按缓冲深度与期望深度的差值修正，缓冲堆积时降低
+        correction = 1 + 0.25 * (self.target_depth - stats["queued"]) / self.target_depth
+        self.send_rate = min(self.max_rate, max(self.min_rate, self.consume_rate * correction))
+
+    def should_send(self, now: float = None) -> bool:
+        """
+        判断当前视频帧是否送入识别进程，每个视频帧调用一次
+
+        Parameters
+        ----------
+        now : float
+            当前时间，默认为time.time()
+
+        Returns
+        -------
+        flag : bool
+            当前视频帧是否送入识别进程
+        """
+        if now is None:
+            now = time.time()
+        if now - self._update_time >= self._update_interval:
+            self._update(now)
+        if now < self._next_send_time:
+            self.skipped_count += 1
+            return False
+        # 按送入速度确定下一次允许送入的时间，落后较多时从当前时间重新计算，避免集中补发
+        interval = 1 / self.send_rate
+        self._next_send_time = max(self._next_send_time + interval, now + interval / 2)
+        self.sent_count += 1
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        """
+        获得调度器的统计信息
+
+        Returns
+        -------
+        stats : Dict[str, float]
+            包括send_rate(送入速度)、consume_rate(取出速度)、sent(已送入数)和skipped(已跳过数)
+        """
+        return {"send_rate": self.send_rate, "consume_rate": self.consume_rate,
+                "sent": self.sent_count, "skipped": self.skipped_count}
+
+
+## 作为嵌入类，需要直接在video_processor中进行集成测试 ##
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+File Name: motion_gate.py
+Author: 07xiaohei
+Date: 2026-10-16
+Version: 1.0
+Description: 基于低分辨率背景减除的运动检测门控，画面无明显变化时跳过模型识别
+"""
+
+# 引入常用库
+from home_security_surveillance.Common import *
+
+__all__ = ["Motion_Gate"]
+
+class Motion_Gate(object):
+    """
+    Motion_Gate(min_area_ratio, force_interval, var_threshold, scale_width)
+
+    运动检测门控，在调用识别模型之前使用MOG2背景减除判断画面是否有明显的变化
+    只有变化区域的比例达到阈值时才需要识别，画面长时间无变化时仍定期强制识别一次，避免漏掉缓慢发展的烟雾和火焰
+
+    Parameters
+    ----------
+    min_area_ratio : float
+        变化区域占画面的最小比例，达到该比例时认为画面有明显变化，默认为0.002
+    force_interval : float
+        强制识别的时间间隔，单位为秒，距离上一次识别超过该时间时无论画面是否变化都需要识别，默认为5s
+    var_threshold : float
+        MOG2背景减除的方差阈值，越大对像素变化越不敏感，默认为16
+    scale_width : int
+        进行背景减除时缩放到的宽度，高度按比例缩放，默认为160
+
+    Attributes
+    ----------
+    min_area_ratio : float
+        变化区域占画面的最小比例
+    force_interval : float
+        强制识别的时间间隔，单位为秒
+    scale_width : int
+        进行背景减除时缩放到的宽度
+    checked_count : int
+        已经检查的视频帧数量
+    motion_count : int
+        因画面有明显变化而需要识别的视频帧数量
+    forced_count : int
+        画面无明显变化但因超过强制识别间隔而需要识别的视频帧数量
+    skipped_count : int
+        画面无明显变化而跳过识别的视频帧数量
+    _subtractor : cv.BackgroundSubtractorMOG2
+        MOG2背景减除器，在低分辨率的灰度图像上持续学习背景
+    _last_infer_time : float
+        上一次需要识别的时间，初始为0.0，保证第一帧一定被识别
+    """
+
+    def __init__(self, min_area_ratio: float = 0.002, force_interval: float = 5,
+                 var_threshold: float = 16, scale_width: int = 160):
+        """初始化运动检测门控"""
+        # 记录变量
+        self.min_area_ratio = min_area_ratio
+        self.force_interval = force_interval
+        self.scale_width = scale_width
+        self.checked_count = 0
+        self.motion_count = 0
+        self.forced_count = 0
+        self.skipped_count = 0
+        # 不检测阴影，前景掩码只有0和255两个值
+        self._subtractor = cv.createBackgroundSubtractorMOG2(varThreshold=var_threshold,
+                                                             detectShadows=False)
+        self._last_infer_time = 0.0
+
+    def motion_ratio(self, frame: np.ndarray) -> float:
+        """
+        将视频帧缩放为低分辨率的灰度图像并更新背景模型，计算变化区域占画面的比例
+
+        Parameters
+        ----------
+        frame : np.ndarray
+            BGR格式的视频帧
+
+        Returns
+        -------
+        ratio : float
+            变化区域占画面的比例，在0 ~ 1之间
+        """
+        height, width = frame.shape[:2]
+        scale_height = max(1, round(height * self.scale_width / width))
+        small_frame = cv.resize(frame, (self.scale_width, scale_height), interpolation=cv.INTER_AREA)
+        # 转为灰度并模糊，减少传感器噪声造成的误判
+        small_frame = cv.cvtColor(small_frame, cv.COLOR_BGR2GRAY)
+        small_frame = cv.GaussianBlur(small_frame, (5, 5), 0)
+        foreground_mask = self._subtractor.apply(small_frame)
+        return cv.countNonZero(foreground_mask) / foreground_mask.size
+
+    def should_infer(self, frame: np.ndarray, now: float = None) -> bool:
+        """
+        判断视频帧是否需要送入模型识别，每个视频帧调用一次，无论结果如何都会更新背景模型
+
+        Parameters
+        ----------
+        frame : np.ndarray
+            BGR格式的视频帧
+        now : float
+            当前时间，默认为time.time()
+
+        Returns
+        -------
+        flag : bool
+            视频帧是否需要送入模型识别
+        """
+        if now is None:
+            now = time.time()
+        self.checked_count += 1
+        if self.motion_ratio(frame) >= self.min_area_ratio:
+            self.motion_count += 1
+        elif now - self._last_infer_time >= self.force_interval:
+            self.forced_count += 1
+        else:
+            self.skipped_count += 1
+            return False
+        self._last_infer_time = now
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获得运动检测门控的统计信息
+
+        Returns
+        -------
+        stats : Dict[str, int]
+            包括checked(已检查数)、motion(因变化识别数)、forced(强制识别数)和skipped(跳过识别数)
+        """
+        return {"checked": self.checked_count, "motion": self.motion_count,
+                "forced": self.forced_count, "skipped": self.skipped_count}
+
+
+## 作为嵌入类，需要直接在video_detect中进行集成测试 ##
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+File Name: nvd_health_prober.py
+Author: 07xiaohei
+Date: 2026-10-16
+Version: 1.0
+Description: 网络视频设备的并发健康探测和带有效期的健康状态缓存
+"""
+
+# 引入常用库
+from home_security_surveillance.Common import *
+# 引入Log_Processor，使用其时间格式记录最后在线时间
+from home_security_surveillance.File_process.log import Log_Processor
+# 引入各视频传输协议的默认端口
+from home_security_surveillance.Video_process.video_capture_process import _default_port_dict
+# 引入asyncio库，用于并发探测所有网络视频设备
+import asyncio
+# 引入urllib.parse库，用于从url中解析主机和端口
+from urllib.parse import urlsplit
+
+__all__ = ["Nvd_Health_Prober"]
+
+class Nvd_Health_Prober(object):
+    """
+    Nvd_Health_Prober(health_cache_file, ttl, probe_time_out)
+
+    网络视频设备健康探测器，基于asyncio并发探测所有已保存的网络视频设备
+    记录每个url的在线状态、连接延迟、分辨率、帧率和最后在线时间，保存为带有效期的json缓存文件
+    ui界面读取该缓存对设备排序并标注在线状态，用户明确启动设备时视频流处理器仍然实际尝试连接，并将结果写回缓存
+
+    Parameters
+    ----------
+    health_cache_file : str
+        健康状态缓存文件的路径，一般与网络摄像头配置文件放在同一目录下
+    ttl : float
+        健康状态的有效期，单位为秒，超过有效期的记录视为未知，默认为30s
+    probe_time_out : float
+        探测单个设备时建立连接和打开视频流的超时时间，单位为秒，默认为3s
+
+    Attributes
+    ----------
+    health_cache_file : str
+        健康状态缓存文件的路径
+    ttl : float
+        健康状态的有效期，单位为秒
+    probe_time_out : float
+        探测单个设备的超时时间，单位为秒
+    health_cache : Dict[str, Dict[str, Any]]
+        健康状态缓存，key为url，value为该url的健康状态字典，包括以下键值
+        online(是否在线)、latency(建立TCP连接的延迟，单位为ms，无法测量时为None)、
+        width、height、fps(视频流参数，离线时为0)、last_seen(最后在线时间，从未在线时为None)和
+        probe_time(探测时的时间戳)
+    _lock : threading.Lock
+        保护健康状态缓存的锁，探测可以在后台线程中进行
+    """
+
+    def __init__(self, health_cache_file: str, ttl: float = 30, probe_time_out: float = 3):
+        """初始化网络视频设备健康探测器"""
+        # 记录变量
+        self.health_cache_file = health_cache_file
+        self.ttl = ttl
+        self.probe_time_out = probe_time_out
+        self._lock = threading.Lock()
+        # 加载已有的健康状态缓存
+        self.health_cache = self.load_health_cache()
+
+    def load_health_cache(self) -> Dict[str, Dict[str, Any]]:
+        """
+        加载健康状态缓存文件，文件不存在或解析失败时返回空字典
+
+        Returns
+        -------
+        health_cache : Dict[str, Dict[str, Any]]
+            健康状态缓存，key为url，value为该url的健康状态字典
+        """
+        try:
+            with open(self.health_cache_file, 'r', encoding='utf-8') as file:
+                health_cache = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if not isinstance(health_cache, dict):
+            return {}
+        return health_cache
+
+    def _write_health_cache(self):
+        """将健康状态缓存写入文件，先写入临时文件再替换，避免并发写入或中断时损坏缓存文件，视为内部函数，不提供外部接口"""
+        with self._lock:
+            health_cache = copy.deepcopy(self.health_cache)
+        temp_file = f"{self.health_cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as file:
+                json.dump(health_cache, file,
+                          skipkeys=False, check_circular=True, allow_nan=True, sort_keys=False,
+                          ensure_ascii=False, separators=(',', ' : '), indent=2)
+            os.replace(temp_file, self.health_cache_file)
+        # 缓存写入失败不影响探测结果的使用
+        except OSError:
+            pass
+
+    def get_health(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        获得url在有效期内的健康状态
+
+        Parameters
+        ----------
+        url : str
+            网络视频设备的url地址
+
+        Returns
+        -------
+        health : Optional[Dict[str, Any]]
+            有效期内的健康状态字典，没有记录或已超过有效期时返回None
+        """
+        with self._lock:
+            health = self.health_cache.get(url)
+            if health is None or time.time() - health["probe_time"] > self.ttl:
+                return None
+            return dict(health)
+
+    def update_health(self, url: str, online: bool, latency: Optional[float] = None,
+                      width: int = 0, height: int = 0, fps: int = 0, write: bool = True):
+        """
+        更新url的健康状态，可用于记录实际打开视频流的结果
+
+        Parameters
+        ----------
+        url : str
+            网络视频设备的url地址
+        online : bool
+            是否在线，即能否打开视频流
+        latency : Optional[float]
+            建立TCP连接的延迟，单位为ms，无法测量时为None
+        width : int
+            视频流的宽度，离线时为0
+        height : int
+            视频流的高度，离线时为0
+        fps : int
+            视频流的帧率，离线时为0
+        write : bool
+            是否立即写入缓存文件，默认为True
+        """
+        with self._lock:
+            last_seen = self.health_cache.get(url, {}).get("last_seen")
+            if online:
+                last_seen = datetime.datetime.now().strftime(Log_Processor.strftime_all)
+            self.health_cache[url] = {"online": online, "latency": latency,
+                                      "width": width, "height": height, "fps": fps,
+                                      "last_seen": last_seen, "probe_time": time.time()}
+        if write:
+            self._write_health_cache()
+
+    def sort_by_health(self, url_list: List[str]) -> List[str]:
+        """
+        根据有效期内的健康状态对url排序，在线的在前，未知的居中，离线的在后，同类保持原有顺序
+
+        Parameters
+        ----------
+        url_list : List[str]
+            要排序的url列表
+
+        Returns
+        -------
+        url_list : List[str]
+            排序后的url列表
+        """
+        def health_order(url: str) -> int:
+            health = self.get_health(url)
+            if health is None:
+                return 1
+            return 0 if health["online"] else 2
+        return sorted(url_list, key=health_order)
+
+    def probe_all(self, url_list: List[str], force: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        并发探测所有url的健康状态，并写入缓存文件
+
+        Parameters
+        ----------
+        url_list : List[str]
+            要探测的url列表
+        force : bool
+            是否探测全部url，默认为False，此时只探测没有记录或已超过有效期的url
+
+        Returns
+        -------
+        health_dict : Dict[str, Dict[str, Any]]
+            每个url的健康状态字典
+        """
+        # 去除重复和空的url，确定需要探测的url
+        url_list = list(dict.fromkeys(url for url in url_list if url))
+        probe_url_list = [url for url in url_list if force or self.get_health(url) is None]
+        # 在新的事件循环中并发探测，可以在后台线程中调用
+        if probe_url_list:
+            asyncio.run(self._probe_all(probe_url_list))
+            self._write_health_cache()
+        with self._lock:
+            return {url: dict(self.health_cache[url]) for url in url_list if url in self.health_cache}
+
+    async def _probe_all(self, url_list: List[str]):
+        """并发探测所有url，视为内部函数，不提供外部接口"""
+        await asyncio.gather(*(self._probe_url(url) for url in url_list))
+
+    async def _probe_url(self, url: str):
+        """
+        探测单个url，先建立TCP连接测量延迟，可达时在线程池中打开视频流获得分辨率和帧率
+
+        Parameters
+        ----------
+        url : str
+            网络视频设备的url地址
+        """
+        # 解析url的主机和端口
+        try:
+            split_url = urlsplit(url)
+            host = split_url.hostname
+            port = split_url.port or _default_port_dict.get(split_url.scheme.lower())
+        except ValueError:
+            host, port = None, None
+
+        # 能够解析出主机和端口时，测量建立TCP连接的延迟，不可达时直接记录为离线
+        latency = None
+        if host and port:
+            start_time = time.perf_counter()
+            try:
+                _, writer = await asyncio.wait_for(asyncio.open_connection(host, port),
+                                                   self.probe_time_out)
+            except (OSError, asyncio.TimeoutError):
+                self.update_health(url, False, write=False)
+                return
+            latency = round((time.perf_counter() - start_time) * 1000, 3)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+        # opencv打开视频流是阻塞的，放入线程池中并发执行
+        loop = asyncio.get_running_loop()
+        online, width, height, fps = await loop.run_in_executor(None, self._probe_stream, url)
+        self.update_health(url, online, latency, width, height, fps, write=False)
+
+    def _probe_stream(self, url: str) -> Tuple[bool, int, int, int]:
+        """
+        打开视频流获得分辨率和帧率，视为内部函数，不提供外部接口
+
+        Parameters
+        ----------
+        url : str
+            网络视频设备的url地址
+
+        Returns
+        -------
+        online : bool
+            是否成功打开视频流
+        width : int
+            视频流的宽度，打开失败时为0
+        height : int
+            视频流的高度，打开失败时为0
+        fps : int
+            视频流的帧率，打开失败时为0
+        """
+        time_out_msec = int(self.probe_time_out * 1000)
+        video_stream = cv.VideoCapture(url, cv.CAP_FFMPEG,
+                                       [cv.CAP_PROP_OPEN_TIMEOUT_MSEC, time_out_msec,
+                                        cv.CAP_PROP_READ_TIMEOUT_MSEC, time_out_msec])
+        try:
+            if not video_stream.isOpened():
+                return False, 0, 0, 0
+            return (True, int(video_stream.get(cv.CAP_PROP_FRAME_WIDTH)),
+                    int(video_stream.get(cv.CAP_PROP_FRAME_HEIGHT)),
+                    int(video_stream.get(cv.CAP_PROP_FPS)))
+        finally:
+            video_stream.release()
+
+
+## 作为嵌入类，需要直接在video_processor中进行集成测试 ##
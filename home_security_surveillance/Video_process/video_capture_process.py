@@ -3,14 +3,87 @@
 File Name: video_capture_process.py
 Author: 07xiaohei
 Date: 2024-05-15
-Version: 1.1
-Description: 用于opencv在捕捉url信息减少超时时间的进程类
+Version: 1.2
+Description: 用于opencv在捕捉url信息减少超时时间的进程类，以及快速失败的网络视频流打开函数
 """
 
 # 引入常用库
 from home_security_surveillance.Common import *
+# 引入socket库，用于检查url的主机端口是否可达
+import socket
+# 引入urllib.parse库，用于从url中解析主机和端口
+from urllib.parse import urlsplit
 
-__all__ = ["Video_Capture_Process"]
+__all__ = ["Video_Capture_Process", "check_url_reachable", "open_network_video_stream"]
+
+# 各视频传输协议在url未指定端口时使用的默认端口
+_default_port_dict = {"http": 80, "https": 443, "rtsp": 554, "rtmp": 1935}
+
+def check_url_reachable(url: str, timeout: float = 1) -> bool:
+    """
+    通过建立TCP连接检查url的主机端口是否可达，用于在打开视频流之前快速排除无法连接的网络视频设备
+
+    Parameters
+    ----------
+    url : str
+        网络视频设备的url地址
+    timeout : float
+        建立TCP连接的超时时间，单位为秒，默认为1s
+
+    Returns
+    -------
+    res : bool
+        主机端口可达时返回True，否则返回False
+        无法从url中解析出主机，或协议未知且未指定端口时无法检查，此时返回True，交由opencv判断
+    """
+    # 解析url的协议、主机和端口
+    try:
+        split_url = urlsplit(url)
+        host = split_url.hostname
+        port = split_url.port or _default_port_dict.get(split_url.scheme.lower())
+    except ValueError:
+        return True
+    if not host or not port:
+        return True
+
+    # 尝试建立TCP连接，成功后立即关闭
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+def open_network_video_stream(url: str, timeout: float = 10) -> Optional[cv.VideoCapture]:
+    """
+    打开网络视频设备的视频流，先检查主机端口是否可达，可达时只建立一次连接
+
+    Parameters
+    ----------
+    url : str
+        网络视频设备的url地址
+    timeout : float
+        打开视频流和读取视频帧的超时时间，单位为秒，默认为10s
+        主机端口的可达性检查也使用该超时时间，但最长为1s
+
+    Returns
+    -------
+    video_stream : Optional[cv.VideoCapture]
+        主机端口不可达时返回None，否则返回创建的VideoCapture对象
+        返回的对象可能未打开，需要使用者通过isOpened判断，打开成功时应直接用于读取视频流
+
+    Notes
+    -----
+    opencv的FFmpeg后端通过CAP_PROP_OPEN_TIMEOUT_MSEC和CAP_PROP_READ_TIMEOUT_MSEC限制打开和读取的等待时间
+    因此无需再通过额外的进程测试url后重复连接
+    """
+    # 主机端口不可达时快速失败
+    if not check_url_reachable(url, min(timeout, 1)):
+        return None
+    # 只打开一次视频流，并设置打开和读取的超时时间
+    time_out_msec = int(timeout * 1000)
+    return cv.VideoCapture(url, cv.CAP_FFMPEG,
+                           [cv.CAP_PROP_OPEN_TIMEOUT_MSEC, time_out_msec,
+                            cv.CAP_PROP_READ_TIMEOUT_MSEC, time_out_msec])
 
 class Video_Capture_Process(multiprocessing.Process):
     """
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+File Name: video_capture_reader.py
+Author: 07xiaohei
+Date: 2026-10-16
+Version: 1.0
+Description: 在独立线程中持续读取视频流的低延迟读取器，总是向使用者提供最新的视频帧
+"""
+
+# 引入常用库
+from home_security_surveillance.Common import *
+
+__all__ = ["Video_Capture_Reader"]
+
+class Video_Capture_Reader(threading.Thread):
+    """
+    Video_Capture_Reader(video_stream, drop_frames)
+
+    多线程类，在独立的线程中持有opencv的VideoCapture对象，持续地抓取和解码视频帧
+    使用者通过read获得最新解码的视频帧和其捕捉时间，读取视频流不再和展示、识别、保存等处理串行执行
+    可用于本地视频设备、网络视频设备和视频文件
+
+    Parameters
+    ----------
+    video_stream : cv.VideoCapture
+        已经打开并设置好参数的视频捕捉对象，交由该线程持有，线程结束时释放
+    drop_frames : bool
+        使用者来不及读取时是否丢弃旧的视频帧，默认为True，适用于本地和网络视频设备
+        视频文件应设置为False，此时线程在使用者读取上一帧后才解码下一帧，不丢失任何视频帧
+
+    Attributes
+    ----------
+    video_stream : cv.VideoCapture
+        该线程持有的视频捕捉对象
+    drop_frames : bool
+        使用者来不及读取时是否丢弃旧的视频帧
+    finished : bool
+        视频流是否已经结束，包括读取失败、视频文件读取完毕和调用了stop
+    grab_count : int
+        已经成功抓取的视频帧数量
+    drop_count : int
+        未被使用者读取就被新的视频帧覆盖的视频帧数量
+    _frame : Optional[np.ndarray]
+        最新解码且未被读取的视频帧，没有时为None
+    _frame_time : float
+        最新视频帧的捕捉时间，为抓取成功时的time.time()
+    _condition : threading.Condition
+        保护最新视频帧的条件变量，用于唤醒等待视频帧的使用者和等待读取的线程
+    _stop_event : threading.Event
+        通知线程停止读取的事件
+
+    Notes
+    -----
+    opencv的VideoCapture对象不是线程安全的，线程启动后只能由该线程访问视频捕捉对象
+    因此视频流的参数(宽度、高度、帧率等)需要在启动线程之前获得和设置
+    网络视频设备的视频流持续被读取，不会在FFmpeg的缓冲区中堆积，从而使识别结果接近实时
+    """
+
+    def __init__(self, video_stream: cv.VideoCapture, drop_frames: bool = True):
+        """初始化读取线程"""
+        super().__init__(daemon=True)
+        # 记录变量
+        self.video_stream = video_stream
+        self.drop_frames = drop_frames
+        self.finished = False
+        self.grab_count = 0
+        self.drop_count = 0
+        self._frame = None
+        self._frame_time = 0.0
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._run_flag = False
+
+    def start(self):
+        """启动线程，此后只能由线程访问视频捕捉对象"""
+        self._run_flag = True
+        super().start()
+
+    def run(self):
+        """线程处理的部分，持续抓取和解码视频帧，结束时释放视频捕捉对象"""
+        try:
+            while not self._stop_event.is_set():
+                # 不丢帧时，等待使用者读取上一帧
+                if not self.drop_frames:
+                    with self._condition:
+                        self._condition.wait_for(
+                            lambda: self._frame is None or self._stop_event.is_set())
+                    if self._stop_event.is_set():
+                        break
+
+                # 抓取视频帧并记录捕捉时间
+                success = self.video_stream.grab()
+                frame_time = time.time()
+                if success:
+                    success, frame = self.video_stream.retrieve()
+                # 读取失败或视频文件读取完毕，结束运行
+                if not success:
+                    break
+
+                # 更新最新的视频帧，唤醒等待的使用者
+                with self._condition:
+                    if self._frame is not None:
+                        self.drop_count += 1
+                    self._frame = frame
+                    self._frame_time = frame_time
+                    self.grab_count += 1
+                    self._condition.notify_all()
+        finally:
+            self.video_stream.release()
+            with self._condition:
+                self.finished = True
+                self._condition.notify_all()
+
+    def read(self, timeout: float = None) -> Tuple[bool, Optional[np.ndarray], float]:
+        """
+        读取最新的且未被读取过的视频帧，没有时等待新的视频帧
+
+        Parameters
+        ----------
+        timeout : float
+            等待新的视频帧的最长时间，单位为秒，为None时一直等待
+
+        Returns
+        -------
+        success : bool
+            是否获得了视频帧，视频流结束或等待超时时为False，可以通过finished区分二者
+        frame : Optional[np.ndarray]
+            最新的视频帧，未获得时为None
+        frame_time : float
+            视频帧的捕捉时间，未获得时为0.0
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._frame is not None or self.finished, timeout)
+            # 视频流结束前缓冲的最后一帧仍然可以被读取
+            if self._frame is None:
+                return False, None, 0.0
+            frame, frame_time = self._frame, self._frame_time
+            self._frame = None
+            # 唤醒等待读取的线程
+            self._condition.notify_all()
+        return True, frame, frame_time
+
+    def stop(self, timeout: float = None):
+        """
+        停止读取视频流，并释放视频捕捉对象
+
+        Parameters
+        ----------
+        timeout : float
+            等待线程结束的最长时间，单位为秒，为None时一直等待
+            网络视频流的抓取可能阻塞较长时间，超时后线程会在抓取返回后自行释放视频捕捉对象
+        """
+        # 线程未启动时直接释放
+        if not self._run_flag:
+            self.video_stream.release()
+            self.finished = True
+            return
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        self.join(timeout)
+
+
+## 作为嵌入类，需要直接在video_processor中进行集成测试 ##
@@ -15,9 +15,19 @@ from home_security_surveillance.File_process.log import *
 from home_security_surveillance.File_process.config import config_defaluts, trans_config_abspath
 # 用Warning_Processor模块
 from home_security_surveillance.Exception_process import *
+# 用共享内存的视频帧环形缓冲区
+from home_security_surveillance.Video_process.frame_ring_buffer import Frame_Ring_Buffer
+# 引入motion_gate库，识别前跳过画面无明显变化的视频帧
+from home_security_surveillance.Video_process.motion_gate import Motion_Gate
+# 引入box_tracker库，在两次识别之间跟踪识别框
+from home_security_surveillance.Video_process.box_tracker import Box_Tracker
+# 引入detection_cache库的识别结果缓存
+from home_security_surveillance.Video_process.detection_cache import Detection_Cache
 from home_security_surveillance.frozen_dir import project_dir
 # 用torch
 import torch
+# 引入torchvision的批量非极大值抑制和IoU计算，合并多个感兴趣区域的识别结果并评估量化模型
+from torchvision.ops import batched_nms, box_iou
 # 用yolo类
 from ultralytics import YOLO
 # 用Results类
@@ -28,9 +38,24 @@ import csv
 import matplotlib.pyplot as plt
 # 双端队列做缓冲
 from collections import deque
+# 用queue.Empty判断等待视频帧超时
+import queue
+# 引入synchronize库的Event对象，通知视频流处理器模型已经预热完成
+from multiprocessing import synchronize
+# 用于计算模型权重文件的哈希值和移动导出的模型
+import hashlib
+import shutil
+# 在导出缓存目录中为每个进程创建独立的临时导出目录
+import tempfile
+# 卸载模型后回收内存
+import gc
+# 用进程池并行重新识别历史视频的各个分块
+from concurrent.futures import ProcessPoolExecutor
+# 计算视频分块的数量和长度
+import math
 import IPython
 
-__all__ = ["Video_Detector"]
+__all__ = ["Video_Detector", "run_video_detector"]
 
 # 训练和预测配置文件的默认路径
 defalut_train_config_path = os.path.normpath(
@@ -39,6 +64,177 @@ defalut_train_config_path = os.path.normpath(
 defalut_predict_config_path = os.path.normpath(
     os.path.join(project_dir, "./Model/predict_config.json"))
 
+class Detect_Source(object):
+    """
+    Detect_Source(source_id, frame_queue, mode, conf, sensitivity, save_dir, max_frame, motion_gate, roi_list,
+                  box_tracker, result_queue, pre_roll_time)
+
+    单个视频源在识别进程中的识别状态，一个识别进程可以同时处理多个视频源，每个视频源的状态相互独立
+
+    Parameters
+    ----------
+    source_id : int
+        视频源的编号，多视频源时用于标记返回的检测结果
+    frame_queue : Frame_Ring_Buffer
+        该视频源的视频帧环形缓冲区
+    mode : int
+        该视频源使用的识别模式
+    conf : float
+        该视频源使用的置信度阈值
+    sensitivity : int
+        该视频源对异常的敏感程度
+    save_dir : str
+        该视频源保存异常视频的目录
+    max_frame : int
+        该视频源缓冲的最大视频帧数量，限制预录部分占用的内存
+    motion_gate : Optional[Motion_Gate]
+        该视频源的运动检测门控，为None时每个视频帧都进行识别
+    roi_list : Optional[List[List[List[float]]]]
+        该视频源的感兴趣区域，为None或空列表时识别整个视频帧
+    box_tracker : Optional[Box_Tracker]
+        该视频源的识别框跟踪器，为None时每个需要识别的视频帧都进行模型识别
+    result_queue : Optional[multiprocessing.Queue]
+        该视频源返回错误码和置信度的结果队列，多个视频源可以使用同一个结果队列
+    pre_roll_time : float
+        异常前后保存的视频时长，单位为秒，默认为None，即按30fps计算max_frame帧的时长
+        送入识别进程的视频帧速度随识别负载变化，因此按捕捉时间而不是帧数确定保存范围
+
+    Attributes
+    ----------
+    save_frame_deque : deque
+        缓冲区，保存最近pre_roll_time秒内的视频帧，元素为捕捉时间和视频帧
+    warning_video_out : Optional[cv.VideoWriter]
+        写入有问题部分及前后的视频流到文件的对象
+    warning_flag : bool
+        错误视频帧标记
+    warning_type_record : int
+        已传输过的错误类型的记录
+    warning_conf_record : List[float]
+        已传输过的错误类型的最大置信度的记录
+    latest_time : float
+        最后一次取出的最新视频帧的捕捉时间
+    last_warning_time : float
+        最后一次识别到错误的视频帧的捕捉时间，超过pre_roll_time秒没有错误时结束异常视频
+    clip_fps : float
+        异常视频的帧率，为创建异常视频时缓冲区中视频帧的实际速度
+    clip_start_time : float
+        异常视频第一帧的捕捉时间
+    clip_frame_count : int
+        异常视频已写入的帧数
+    _default_clip_fps : float
+        无法测量视频帧速度时异常视频使用的帧率，是类变量
+    _max_clip_gap : float
+        按捕捉时间补齐视频帧时，两个视频帧之间最多补齐的时长，单位为秒，是类变量
+    """
+
+    # 无法测量视频帧速度时异常视频使用的帧率
+    _default_clip_fps = 30
+    # 两个视频帧之间最多补齐的时长，避免视频流重连等长时间中断时写入大量重复的视频帧
+    _max_clip_gap = 2
+
+    def __init__(self, source_id: int, frame_queue: Frame_Ring_Buffer, mode: int, conf: float,
+                 sensitivity: int, save_dir: str, max_frame: int, motion_gate: Optional[Motion_Gate] = None,
+                 roi_list: Optional[List[List[List[float]]]] = None,
+                 box_tracker: Optional[Box_Tracker] = None,
+                 result_queue: Optional[multiprocessing.Queue] = None,
+                 pre_roll_time: float = None):
+        """初始化视频源的识别状态"""
+        # 记录变量
+        self.source_id = source_id
+        self.frame_queue = frame_queue
+        self.mode = mode
+        self.conf = conf
+        self.sensitivity = sensitivity
+        self.save_dir = save_dir
+        self.max_frame = max_frame
+        self.motion_gate = motion_gate
+        self.roi_list = roi_list
+        self.box_tracker = box_tracker
+        self.result_queue = result_queue
+        self.pre_roll_time = pre_roll_time if pre_roll_time is not None else max_frame / self._default_clip_fps
+        self.save_frame_deque = deque(maxlen=max_frame)
+        self.warning_video_out = None
+        self.warning_flag = False
+        self.warning_type_record = 0
+        self.warning_conf_record = [0, 0, 0, 0]
+        self.latest_time = time.time()
+        self.last_warning_time = 0.0
+        self.clip_fps = self._default_clip_fps
+        self.clip_start_time = 0.0
+        self.clip_frame_count = 0
+
+    def take_latest_frame(self) -> Optional[np.ndarray]:
+        """
+        取出缓冲区中的全部视频帧按先入先出的顺序存入双端队列，再弹出最新的视频帧，缓冲区需要有视频帧或已经关闭
+
+        Returns
+        -------
+        frame : Optional[np.ndarray]
+            最新的视频帧，为结束标志时返回None
+        """
+        frame = self.frame_queue.get_nowait()
+        self.push_frame(self.frame_queue.last_timestamp, frame)
+        # 保存当前传入的其余全部帧
+        for _ in range(self.frame_queue.qsize()):
+            frame = self.frame_queue.get_nowait()
+            self.push_frame(self.frame_queue.last_timestamp, frame)
+        # 弹出最新帧，使其能够处理最新帧
+        self.latest_time, frame = self.save_frame_deque.pop()
+        return frame
+
+    def push_frame(self, timestamp: float, frame: Optional[np.ndarray]):
+        """将视频帧及其捕捉时间放入双端队列，并丢弃早于pre_roll_time秒之前的视频帧"""
+        self.save_frame_deque.append((timestamp, frame))
+        while self.save_frame_deque[0][0] < timestamp - self.pre_roll_time:
+            self.save_frame_deque.popleft()
+
+    def open_warning_video(self, warning_video_path: str, frame_shape: Tuple[int, ...]):
+        """
+        创建异常视频，帧率为双端队列中视频帧的实际速度，使异常视频的回放速度与实际时间一致
+
+        Parameters
+        ----------
+        warning_video_path : str
+            异常视频的绝对路径
+        frame_shape : Tuple[int, ...]
+            视频帧的形状
+        """
+        time_list = [timestamp for timestamp, _ in self.save_frame_deque]
+        if len(time_list) >= 2 and time_list[-1] > time_list[0]:
+            fps = (len(time_list) - 1) / (time_list[-1] - time_list[0])
+            self.clip_fps = min(max(fps, 1), self._default_clip_fps)
+        else:
+            self.clip_fps = self._default_clip_fps
+        self.clip_start_time = time_list[0] if time_list else self.latest_time
+        self.clip_frame_count = 0
+        fourcc = cv.VideoWriter.fourcc(*"DIVX")
+        self.warning_video_out = cv.VideoWriter(warning_video_path, fourcc, self.clip_fps,
+                                                (frame_shape[1], frame_shape[0]), True)
+
+    def write_warning_frames(self):
+        """
+        将双端队列中的全部视频帧写入异常视频
+        按捕捉时间确定每个视频帧写入的次数，视频帧速度变化时重复或跳过视频帧，保持回放速度与实际时间一致
+        """
+        max_count = math.ceil(self.clip_fps * self._max_clip_gap)
+        while self.save_frame_deque:
+            timestamp, frame = self.save_frame_deque.popleft()
+            count = round((timestamp - self.clip_start_time) * self.clip_fps) + 1 - self.clip_frame_count
+            # 长时间中断时只补齐_max_clip_gap秒，并将之后的视频帧整体前移
+            if count > max_count:
+                self.clip_start_time += (count - max_count) / self.clip_fps
+                count = max_count
+            for _ in range(count):
+                self.warning_video_out.write(frame)
+            self.clip_frame_count += max(count, 0)
+
+    def release(self):
+        """结束该视频源的识别，释放写入异常视频的对象"""
+        if self.warning_video_out is not None:
+            self.warning_video_out.release()
+            self.warning_video_out = None
+
+
 class Video_Detector(object):
     """
     Video_Detector(root_dir, use_defalut_parameter)
@@ -62,11 +258,12 @@ class Video_Detector(object):
         train_config和predict_config配置文件中的各变量记录，在后续加载时使用，是内部成员，不对外开放接口
     device : int
         标识用户可用于的识别的设备，如果有独显GPU使用独显GPU，否则使用CPU
-    train_model : YOLO
-        被用于训练的预加载模型，仅在训练新模型时使用
+    train_model : Optional[YOLO]
+        被用于训练的模型，仅在调用train时加载，未训练时为None
     predict_model: dict[int, YOLO]
-        模式-模型的数字-模型对象字典映射，通过映射可以将模式转变为yolov8要使用的模型对象，直接进行预测
-        此成员用于加速处理，保证多次调用预测函数或者修改模型内容时，均需要在初始化时加载一次模型即可
+        模式-模型的数字-已加载模型对象字典映射，通过映射可以将模式转变为yolov8要使用的模型对象，直接进行预测
+        模型在第一次使用时才加载，只包含实际使用过的模式，可以通过unload_predict_model卸载不再使用的模型
+        此成员用于加速处理，保证多次调用预测函数时，每个模型只需要加载一次即可
 
     model_mode_dict : dict[int, str]
         模式-模型的数字-绝对路径字典映射，通过映射可以将模式转变为yolov8要使用的模型绝对路径
@@ -105,6 +302,40 @@ class Video_Detector(object):
     save_dir: str       模型预测结果的保存目录，可在其中查看预测获得的识别信息视频和图片
     max_frame: int      从视频流处理器处获得视频帧时，存储的双端队列最大缓冲视频帧数量
                         考虑到大多数摄像头是30帧左右，默认存储1800帧，即保存一分钟左右的视频，可用于保存视频，获知异常出现的前因后果
+    pre_roll_time: float
+                        识别视频流时异常前后保存的视频时长，单位为秒，默认为60，即一分钟
+                        送入识别进程的视频帧速度随识别负载变化，按捕捉时间确定保存范围，异常视频的回放速度与实际时间一致
+    max_batch: int      批量预测时一次送入模型的最大视频帧数量，多个视频源的视频帧合并为一批进行预测，默认为8
+    batch_wait_time: float
+                        多个视频源同时识别时，为凑满一批视频帧等待其他视频源的最长时间，单位为秒，默认为0.02
+    motion_gate: bool   识别前是否使用运动检测门控跳过画面无明显变化的视频帧，默认为True
+    motion_min_area: float
+                        运动检测门控认为画面有明显变化时，变化区域占画面的最小比例，默认为0.002
+    motion_force_interval: float
+                        画面长时间无变化时强制识别的时间间隔，单位为秒，默认为5
+    track_interval: int 人像识别和异常行为识别模式下两次模型识别之间的视频帧间隔，其余视频帧使用光流跟踪识别框
+                        默认为5，小于等于1时不使用跟踪，每帧都进行模型识别
+    backend: str        预测使用的推理后端，可选"pytorch"、"onnx"和"openvino"，默认为"pytorch"
+                        使用onnx或openvino时，首次加载将模型导出到根目录下的export_cache目录中，之后直接加载缓存
+    int8_modes: list[int]
+                        使用INT8量化模型的模式列表，默认为空，量化模型需要先通过quantize_model生成
+                        列表中的模式优先于backend加载export_cache中的量化模型，量化模型不存在时按backend加载
+    int8_method: str    加载的INT8量化模型的量化方式，可选"dynamic"和"static"，默认为"static"
+    re_detect_workers: int
+                        重新识别历史视频时并行处理的进程数量，默认为1，即单进程顺序处理
+                        大于1时将视频按帧范围分块，各块在进程池中同时识别，再按顺序合并结果
+    sparse_interval : int
+                        重新识别历史视频时稀疏扫描的采样间隔，默认为0，即不进行稀疏扫描，逐帧识别
+                        大于1时先每隔sparse_interval帧采样识别一帧，只在阳性采样帧前后的窗口内逐帧识别
+                        持续时间短于sparse_interval帧且恰好落在两个采样帧之间的异常可能被漏掉，即与逐帧识别结果的容差
+    sparse_conf_margin : float
+                        稀疏扫描采样时降低的置信度阈值，默认为0.1，使置信度略低于阈值的临界采样帧也触发逐帧识别
+    detect_cache : bool
+                        重新识别历史视频时是否缓存逐帧识别结果，默认为True
+                        缓存以_detect_cache_conf识别得到的全部识别框，改变敏感程度或重新生成视频时只需按置信度过滤
+    re_detect_checkpoint_interval : int
+                        顺序重新识别历史视频时保存检查点的视频帧间隔，默认为1000，为0时不保存检查点
+                        ui界面停止或程序意外退出后，以相同参数重新识别同一视频时从最近的检查点继续
     Notes
     -----
     获取相关参数(可以让用户选择模式)，前端通过修改predict_config.json中的model_mode来改变模式
@@ -120,6 +351,39 @@ class Video_Detector(object):
     #: :noindex:
     predict_class_type_color_dict = {1: {0: (0, 0, 255), 1: (128, 128, 128)},
                                      2: (0, 255, 0), 3: (255, 0, 0)}
+    # 由mode_precdict_warning_mode和mode_precdict_class生成的查找表，以预测类别为下标直接获得错误码和错误类型
+    _warning_code_table = {model: np.array([class_dict[label] for label in sorted(class_dict)])
+                           for model, class_dict in mode_precdict_warning_mode.items()}
+    _warning_class_table = {model: np.array([class_dict[label] for label in sorted(class_dict)])
+                            for model, class_dict in mode_precdict_class.items()}
+    # 识别进程等待视频帧的最长时间，超过后认为视频流处理器已经停止
+    _frame_wait_time_out = 15
+    # 可以使用识别框跟踪的模式，即人像识别和异常行为识别，烟雾和火焰形状多变，不适合跟踪
+    _track_mode_list = [2, 3]
+    # 可用的推理后端和导出后模型路径的后缀，pytorch直接使用.pt权重文件
+    _backend_suffix_dict = {"pytorch": None, "onnx": ".onnx", "openvino": "_openvino_model"}
+    # 导出模型的缓存目录名，位于根目录下
+    _export_cache_dir = "export_cache"
+    # 可用的INT8量化方式，dynamic只量化权重，static使用校准视频帧同时量化权重和激活值
+    _int8_method_list = ["dynamic", "static"]
+    # 识别结果缓存的目录名，位于根目录下
+    _detect_cache_dir = "detect_cache"
+    # 缓存识别结果时使用的置信度阈值，低于所有敏感程度和稀疏扫描使用的阈值
+    _detect_cache_conf = 0.25
+    # 并行重新识别时每个进程平均分到的任务数，多个分块合并为一个任务提交，减少任务调度和传输的开销
+    _re_detect_task_per_worker = 4
+    # 预热时每个模型使用空白图像进行预测的次数
+    _warm_up_times = 2
+    # 常驻识别服务检查请求和等待视频帧的时间间隔
+    _service_poll_interval = 0.2
+    # 创建识别进程时传递的预测参数，子进程按配置文件创建检测器后用这些值覆盖
+    _spec_attribute_list = ["model_mode_dict", "model_mode", "iou", "conf", "show", "save_dir", "max_frame",
+                            "pre_roll_time", "imgsz", "max_batch", "batch_wait_time", "motion_gate", "motion_min_area",
+                            "motion_force_interval", "track_interval", "backend", "int8_modes", "int8_method",
+                            "re_detect_workers", "sparse_interval", "sparse_conf_margin",
+                            "detect_cache", "re_detect_checkpoint_interval"]
+    # 可以通过run_video_detector在子进程中调用的方法
+    _spec_method_list = ["detect", "detect_multi", "re_detect", "serve"]
 
     def __init__(self, root_dir: str = trans_config_abspath(config_defaluts["model-directory"]),
                  use_defalut_parameter=False) -> None:
@@ -153,7 +417,28 @@ class Video_Detector(object):
         # 否，则加载配置文件的内容
         if not use_defalut_parameter:
             batch, epochs, project, name, imgsz, data, weight_pt = self._train_config.values()
-            model_mode, iou, conf, show, save_dir, max_frame = self._predict_config.values()
+            # 按键名读取，旧的配置文件中没有批量预测的参数，使用默认值
+            model_mode = self._predict_config["model_mode"]
+            iou = self._predict_config["iou"]
+            conf = self._predict_config["conf"]
+            show = self._predict_config["show"]
+            save_dir = self._predict_config["save_dir"]
+            max_frame = self._predict_config["max_frame"]
+            pre_roll_time = self._predict_config.get("pre_roll_time", max_frame / 30)
+            max_batch = self._predict_config.get("max_batch", 8)
+            batch_wait_time = self._predict_config.get("batch_wait_time", 0.02)
+            motion_gate = self._predict_config.get("motion_gate", "True")
+            motion_min_area = self._predict_config.get("motion_min_area", 0.002)
+            motion_force_interval = self._predict_config.get("motion_force_interval", 5)
+            track_interval = self._predict_config.get("track_interval", 5)
+            backend = self._predict_config.get("backend", "pytorch")
+            int8_modes = self._predict_config.get("int8_modes", [])
+            int8_method = self._predict_config.get("int8_method", "static")
+            re_detect_workers = self._predict_config.get("re_detect_workers", 1)
+            sparse_interval = self._predict_config.get("sparse_interval", 0)
+            sparse_conf_margin = self._predict_config.get("sparse_conf_margin", 0.1)
+            detect_cache = self._predict_config.get("detect_cache", "True")
+            re_detect_checkpoint_interval = self._predict_config.get("re_detect_checkpoint_interval", 1000)
             device = self.get_device()
         # 是，则加载默认参数
         else:
@@ -170,6 +455,21 @@ class Video_Detector(object):
             show = "True"
             save_dir = "detect_result"
             max_frame = 1800
+            pre_roll_time = 60
+            max_batch = 8
+            batch_wait_time = 0.02
+            motion_gate = "True"
+            motion_min_area = 0.002
+            motion_force_interval = 5
+            track_interval = 5
+            backend = "pytorch"
+            int8_modes = []
+            int8_method = "static"
+            re_detect_workers = 1
+            sparse_interval = 0
+            sparse_conf_margin = 0.1
+            detect_cache = "True"
+            re_detect_checkpoint_interval = 1000
             device = 0
 
         # 赋值给类成员变量
@@ -193,13 +493,24 @@ class Video_Detector(object):
         else:
             self.weight_pt = os.path.join(root_dir, weight_pt)
 
-        self.train_model = YOLO(self.weight_pt)
+        # 训练模型和预测模型都在第一次使用时才加载，减少检测器的创建时间和内存占用
+        self.train_model = None
         self.device = device
 
         # 可以在函数调用时被外界参数覆盖的变量
         self.model_mode = model_mode
-        self.predict_model = {1: YOLO(self.model_mode_dict[1]), 2: YOLO(self.model_mode_dict[2]),
-                              3: YOLO(self.model_mode_dict[3])}
+        self.backend = backend
+        self.int8_modes = int8_modes
+        self.int8_method = int8_method
+        self.re_detect_workers = re_detect_workers
+        self.sparse_interval = sparse_interval
+        self.sparse_conf_margin = sparse_conf_margin
+        if detect_cache == "True":
+            self.detect_cache = True
+        else:
+            self.detect_cache = False
+        self.re_detect_checkpoint_interval = re_detect_checkpoint_interval
+        self.predict_model = {}
         self.iou = iou
         self.conf = conf
         if show == "True":
@@ -211,6 +522,451 @@ class Video_Detector(object):
         else:
             self.save_dir = os.path.join(root_dir, save_dir)
         self.max_frame = max_frame
+        self.pre_roll_time = pre_roll_time
+        self.max_batch = max_batch
+        self.batch_wait_time = batch_wait_time
+        if motion_gate == "True":
+            self.motion_gate = True
+        else:
+            self.motion_gate = False
+        self.motion_min_area = motion_min_area
+        self.motion_force_interval = motion_force_interval
+        self.track_interval = track_interval
+
+    def get_predict_model(self, mode: int) -> YOLO:
+        """
+        获得模式对应的预测模型，未加载时先加载
+
+        Parameters
+        ----------
+        mode : int
+            模型的模式，1为火焰模型，2为人物模型，3为异常行为模型
+
+        Returns
+        -------
+        model : YOLO
+            已加载的yolov8模型对象
+        """
+        model = self.predict_model.get(mode)
+        if model is None:
+            start_time = time.time()
+            model = self._load_predict_model(mode)
+            self.predict_model[mode] = model
+            self.info_logger.log_write(f"Load the model of mode {mode} in "
+                                       f"{time.time() - start_time:.2f}s", Log_Processor.INFO)
+        return model
+
+    def load_predict_model(self, mode_list: List[int], unload_other: bool = True):
+        """
+        预先加载要使用的模式对应的预测模型，避免第一帧识别时才加载造成延迟
+
+        Parameters
+        ----------
+        mode_list : List[int]
+            要使用的模式列表，0表示使用全部模型
+        unload_other : bool
+            是否卸载不在mode_list中的已加载模型，默认为True
+        """
+        model_list = self._model_list(mode_list)
+        if unload_other:
+            self.unload_predict_model([model for model in self.predict_model if model not in model_list])
+        for model in model_list:
+            self.get_predict_model(model)
+
+    @staticmethod
+    def _model_list(mode_list: List[int]) -> List[int]:
+        """将模式列表转为实际使用的模型列表，模式0对应全部模型，视为内部函数，不提供外部接口"""
+        return sorted({model for mode in mode_list for model in ([1, 2, 3] if mode == 0 else [mode])})
+
+    def warm_up(self, mode_list: List[int], batch_size: int = 1, unload_other: bool = True):
+        """
+        加载要使用的模型，并使用imgsz大小的空白图像进行预测，预先完成计算图构建和显存分配
+        避免识别开始时的前几帧因这些一次性开销而延迟数百毫秒
+
+        Parameters
+        ----------
+        mode_list : List[int]
+            要使用的模式列表，0表示使用全部模型
+        batch_size : int
+            批量预测时一批的最大视频帧数量，大于1时还会按该批大小预热，默认为1
+        unload_other : bool
+            是否卸载不在mode_list中的已加载模型，默认为True
+        """
+        start_time = time.time()
+        model_list = self._model_list(mode_list)
+        self.load_predict_model(model_list, unload_other)
+        # 空白图像使用yolov8的填充颜色
+        blank_frame = np.full((self.imgsz, self.imgsz, 3), 114, dtype=np.uint8)
+        size_list = sorted({1, max(1, batch_size)})
+        for mode in model_list:
+            for size in size_list:
+                for _ in range(self._warm_up_times):
+                    self.predict_model[mode].predict([blank_frame] * size, imgsz=self.imgsz, iou=self.iou,
+                                                     conf=self.conf, device=self.device,
+                                                     classes=0 if mode == 2 else None, verbose=False)
+        self.info_logger.log_write(f"Warm up the model of mode {model_list} in "
+                                   f"{time.time() - start_time:.2f}s", Log_Processor.INFO)
+
+    def unload_predict_model(self, mode_list: List[int] = None):
+        """
+        卸载已加载的预测模型，释放其占用的内存和显存，之后再次使用时会重新加载
+
+        Parameters
+        ----------
+        mode_list : List[int]
+            要卸载的模式列表，未指定(为None)时卸载全部已加载的模型
+        """
+        if mode_list is None:
+            mode_list = list(self.predict_model)
+        unload_list = [mode for mode in mode_list if self.predict_model.pop(mode, None) is not None]
+        if not unload_list:
+            return
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        self.info_logger.log_write(f"Unload the model of mode {unload_list}", Log_Processor.INFO)
+
+    def _load_predict_model(self, mode: int) -> YOLO:
+        """
+        按配置的推理后端加载模式对应的预测模型，导出失败时回退为pytorch后端
+
+        Parameters
+        ----------
+        mode : int
+            模型的模式，1为火焰模型，2为人物模型，3为异常行为模型
+
+        Returns
+        -------
+        model : YOLO
+            加载的yolov8模型对象，不同后端的预测接口和返回结果相同
+        """
+        weight_path = self.model_mode_dict[mode]
+        # 指定使用INT8量化模型的模式，优先加载缓存中的量化模型
+        if mode in self.int8_modes:
+            int8_path = self._int8_model_path(weight_path, self.int8_method)
+            if os.path.exists(int8_path):
+                return YOLO(int8_path, task="detect")
+            self.error_logger.log_write(f"The INT8 {self.int8_method} model of mode {mode} does not exist, "
+                                        f"call quantize_model first, use {self.backend} instead.",
+                                        Log_Processor.ERROR)
+        if self._backend_suffix_dict.get(self.backend) is None:
+            if self.backend != "pytorch":
+                self.error_logger.log_write(f"The backend {self.backend} is not supported, "
+                                            f"use pytorch instead.", Log_Processor.ERROR)
+            return YOLO(weight_path)
+        try:
+            export_path = self._export_predict_model(weight_path)
+        except Exception as e:
+            # 缺少onnxruntime或openvino等依赖时导出失败，仍可以使用pytorch后端
+            error_type = type(e).__name__
+            self.error_logger.logger.error("An error of type %s occurred when exporting %s to %s: %s",
+                                           error_type, weight_path, self.backend, str(e), exc_info=True)
+            return YOLO(weight_path)
+        return YOLO(export_path, task="detect")
+
+    def _export_predict_model(self, weight_path: str, backend: str = None) -> str:
+        """
+        将.pt权重文件导出为指定后端的格式并缓存，缓存以权重文件内容的哈希值命名，权重文件更新后会重新导出
+        多个进程可能同时导出同一权重文件，各进程在独立的临时目录中导出，完成后用os.replace原子地放入缓存
+
+        Parameters
+        ----------
+        weight_path : str
+            .pt权重文件的路径
+        backend : str
+            导出的后端，未指定(为None)时使用当前配置的后端
+
+        Returns
+        -------
+        export_path : str
+            缓存中导出模型的路径，onnx为文件，openvino为目录
+        """
+        if backend is None:
+            backend = self.backend
+        export_dir = os.path.join(self.root_dir, self._export_cache_dir)
+        export_path = os.path.join(export_dir,
+                                   f"{self._weight_cache_name(weight_path)}{self._backend_suffix_dict[backend]}")
+        if os.path.exists(export_path):
+            return export_path
+
+        # 导出为动态输入大小，以支持批量预测和裁剪后的感兴趣区域
+        # 导出结果位于权重文件旁，因此先将权重文件复制到临时目录中，避免多个进程写入同一路径
+        self.info_logger.log_write(f"Export {weight_path} to {backend}, this may take a while",
+                                   Log_Processor.INFO)
+        self.make_dir(export_dir)
+        temp_dir = tempfile.mkdtemp(prefix=".export_", dir=export_dir)
+        try:
+            temp_weight_path = os.path.join(temp_dir, os.path.basename(weight_path))
+            shutil.copyfile(weight_path, temp_weight_path)
+            exported_path = YOLO(temp_weight_path).export(format=backend, dynamic=True)
+            try:
+                os.replace(exported_path, export_path)
+            except OSError:
+                # openvino导出为目录，其他进程已经放入缓存时无法替换非空目录，直接使用已有的缓存
+                if not os.path.exists(export_path):
+                    raise
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        self.info_logger.log_write(f"Successfully exported {weight_path} to {export_path}",
+                                   Log_Processor.INFO)
+        return export_path
+
+    @staticmethod
+    def _weight_cache_name(weight_path: str) -> str:
+        """由权重文件名和权重文件内容哈希值的前16位组成缓存的文件名，视为内部函数，不提供外部接口"""
+        sha256 = hashlib.sha256()
+        with open(weight_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                sha256.update(chunk)
+        weight_name = os.path.splitext(os.path.basename(weight_path))[0]
+        return f"{weight_name}_{sha256.hexdigest()[:16]}"
+
+    def _int8_model_path(self, weight_path: str, method: str) -> str:
+        """获得权重文件对应的INT8量化模型在缓存中的路径，视为内部函数，不提供外部接口"""
+        return os.path.join(self.root_dir, self._export_cache_dir,
+                            f"{self._weight_cache_name(weight_path)}_int8_{method}.onnx")
+
+    @staticmethod
+    def sample_calibration_frames(video_list: List[str], frame_count: int = 100) -> List[np.ndarray]:
+        """
+        从历史视频中均匀抽取视频帧，作为INT8静态量化的校准集和量化精度的评估集
+
+        Parameters
+        ----------
+        video_list : List[str]
+            历史视频文件的路径列表
+        frame_count : int
+            抽取的视频帧总数，按视频的帧数比例分配到各个视频中，默认为100
+
+        Returns
+        -------
+        frame_list : List[np.ndarray]
+            抽取的BGR格式视频帧列表，无法读取的视频会被忽略
+        """
+        # 统计每个视频的帧数
+        count_dict = {}
+        for video_file in video_list:
+            cap = cv.VideoCapture(video_file)
+            if cap.isOpened():
+                count = int(cap.get(cv.CAP_PROP_FRAME_COUNT))
+                if count > 0:
+                    count_dict[video_file] = count
+            cap.release()
+        total_count = sum(count_dict.values())
+        if total_count == 0:
+            return []
+
+        # 按帧数比例分配抽取数量，每个视频内等间隔抽取
+        frame_list = []
+        for video_file, count in count_dict.items():
+            sample_count = max(1, round(frame_count * count / total_count))
+            cap = cv.VideoCapture(video_file)
+            for index in np.linspace(0, count - 1, min(sample_count, count)).astype(int):
+                cap.set(cv.CAP_PROP_POS_FRAMES, int(index))
+                ret, frame = cap.read()
+                if ret:
+                    frame_list.append(frame)
+            cap.release()
+        return frame_list[:frame_count]
+
+    def _preprocess_calibration_frame(self, frame: np.ndarray) -> np.ndarray:
+        """
+        按yolov8的预处理方式将视频帧转为模型输入，用于静态量化的校准，视为内部函数，不提供外部接口
+        等比例缩放到imgsz后用灰色(114)填充为正方形，BGR转为RGB，归一化到0 ~ 1，返回(1, 3, imgsz, imgsz)的float32数组
+        """
+        height, width = frame.shape[:2]
+        scale = min(self.imgsz / height, self.imgsz / width)
+        new_height, new_width = round(height * scale), round(width * scale)
+        image = np.full((self.imgsz, self.imgsz, 3), 114, dtype=np.uint8)
+        top, left = (self.imgsz - new_height) // 2, (self.imgsz - new_width) // 2
+        image[top:top + new_height, left:left + new_width] = cv.resize(frame, (new_width, new_height),
+                                                                       interpolation=cv.INTER_LINEAR)
+        image = image[:, :, ::-1].transpose(2, 0, 1)
+        return np.ascontiguousarray(image, dtype=np.float32)[None] / 255.0
+
+    def quantize_model(self, mode: int, method: str = "static", video_list: List[str] = None,
+                       frame_count: int = 100) -> Optional[Dict[str, float]]:
+        """
+        生成模式对应模型的INT8量化版本，保存到export_cache目录中，并评估量化模型相对FP32模型的精度变化
+        量化基于onnxruntime，先将.pt权重文件导出为FP32的onnx模型，再进行量化
+        dynamic只量化权重，运行时动态计算激活值的量化参数，不需要校准集
+        static使用历史视频帧校准，同时量化权重和激活值，在CPU上速度提升更明显
+        生成后将mode加入predict_config.json的int8_modes中，即可在预测时使用量化模型
+
+        Parameters
+        ----------
+        mode : int
+            模型的模式，1为火焰模型，2为人物模型，3为异常行为模型
+        method : str
+            量化方式，可选"dynamic"和"static"，默认为"static"
+        video_list : List[str]
+            用于校准和评估的历史视频文件路径列表，static方式必须提供
+        frame_count : int
+            从历史视频中抽取的视频帧数量，默认为100
+
+        Returns
+        -------
+        report : Optional[Dict[str, float]]
+            量化模型的精度评估结果，含义见evaluate_quantized_model，没有可用的视频帧时不评估，返回空字典
+            量化失败时返回None
+        """
+        if method not in self._int8_method_list:
+            self.error_logger.log_write(f"The quantization method {method} is not supported.",
+                                        Log_Processor.ERROR)
+            return None
+        weight_path = self.model_mode_dict[mode]
+        int8_path = self._int8_model_path(weight_path, method)
+        frame_list = self.sample_calibration_frames(video_list, frame_count) if video_list else []
+        if method == "static" and not frame_list:
+            self.error_logger.log_write("Static quantization needs calibration frames from history videos.",
+                                        Log_Processor.ERROR)
+            return None
+
+        try:
+            # onnxruntime和onnx是可选依赖，只在量化时需要
+            import onnx
+            from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType,
+                                                  quantize_dynamic, quantize_static)
+            fp32_path = self._export_predict_model(weight_path, "onnx")
+            self.info_logger.log_write(f"Quantize {fp32_path} to INT8 with {method} method, "
+                                       f"this may take a while", Log_Processor.INFO)
+            if method == "dynamic":
+                quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QUInt8)
+            else:
+                detector = self
+
+                class _Calibration_Reader(CalibrationDataReader):
+                    """逐帧提供校准数据的读取器"""
+                    def __init__(self):
+                        self.input_name = onnx.load(fp32_path).graph.input[0].name
+                        self.frame_iter = iter(frame_list)
+
+                    def get_next(self):
+                        frame = next(self.frame_iter, None)
+                        if frame is None:
+                            return None
+                        return {self.input_name: detector._preprocess_calibration_frame(frame)}
+
+                # QDQ格式在CPU上可以使用INT8卷积核，权重按通道量化以减小精度损失
+                quantize_static(fp32_path, int8_path, _Calibration_Reader(), quant_format=QuantFormat.QDQ,
+                                per_channel=True, activation_type=QuantType.QUInt8,
+                                weight_type=QuantType.QInt8)
+
+            # 量化后的模型会丢失导出时写入的类别名等元数据，从FP32模型中复制
+            fp32_model = onnx.load(fp32_path)
+            int8_model = onnx.load(int8_path)
+            del int8_model.metadata_props[:]
+            int8_model.metadata_props.extend(fp32_model.metadata_props)
+            onnx.save(int8_model, int8_path)
+        except Exception as e:
+            error_type = type(e).__name__
+            self.error_logger.logger.error("An error of type %s occurred when quantizing %s: %s",
+                                           error_type, weight_path, str(e), exc_info=True)
+            return None
+        self.info_logger.log_write(f"Successfully quantized {weight_path} to {int8_path}", Log_Processor.INFO)
+
+        if not frame_list:
+            return {}
+        report = self.evaluate_quantized_model(mode, int8_path, frame_list)
+        self.info_logger.log_write(f"INT8 {method} model of mode {mode}: " +
+                                   ", ".join(f"{key}={value:.4f}" for key, value in report.items()),
+                                   Log_Processor.INFO)
+        return report
+
+    def evaluate_quantized_model(self, mode: int, int8_path: str,
+                                 frame_list: List[np.ndarray]) -> Dict[str, float]:
+        """
+        在CPU上比较INT8量化模型和FP32模型在相同视频帧上的识别结果和速度
+        历史视频没有人工标注，以FP32模型的识别结果作为基准，同类别且IoU不低于0.5的识别框视为匹配
+
+        Parameters
+        ----------
+        mode : int
+            模型的模式
+        int8_path : str
+            INT8量化模型的路径
+        frame_list : List[np.ndarray]
+            用于评估的视频帧列表
+
+        Returns
+        -------
+        report : Dict[str, float]
+            包括fp32_boxes(FP32识别框数)、int8_boxes(INT8识别框数)、recall(FP32识别框被匹配的比例)、
+            precision(INT8识别框被匹配的比例)、conf_delta(匹配识别框置信度差的平均值，INT8减FP32)、
+            fp32_ms和int8_ms(平均每帧的识别耗时，单位为毫秒)、speedup(速度提升倍数)
+        """
+        model_dict = {"fp32": YOLO(self.model_mode_dict[mode]), "int8": YOLO(int8_path, task="detect")}
+        classes = 0 if mode == 2 else None
+        box_dict = {"fp32": [], "int8": []}
+        time_dict = {"fp32": 0.0, "int8": 0.0}
+        for name, model in model_dict.items():
+            # 先预测一帧进行预热，不计入耗时
+            model.predict(frame_list[0], iou=self.iou, conf=self.conf, device="cpu",
+                          classes=classes, verbose=False)
+            for frame in frame_list:
+                start_time = time.perf_counter()
+                result = model.predict(frame, iou=self.iou, conf=self.conf, device="cpu",
+                                       classes=classes, verbose=False)
+                time_dict[name] += time.perf_counter() - start_time
+                box_dict[name].append(result[0].boxes.data[:, :6].cpu())
+
+        # 逐帧匹配识别框，每个FP32识别框匹配IoU最大的同类别INT8识别框
+        fp32_boxes, int8_boxes, matched = 0, 0, 0
+        conf_delta_list = []
+        for fp32_data, int8_data in zip(box_dict["fp32"], box_dict["int8"]):
+            fp32_boxes += len(fp32_data)
+            int8_boxes += len(int8_data)
+            if len(fp32_data) == 0 or len(int8_data) == 0:
+                continue
+            iou_matrix = box_iou(fp32_data[:, :4], int8_data[:, :4])
+            iou_matrix[fp32_data[:, 5:6] != int8_data[:, 5].unsqueeze(0)] = 0
+            best_iou, best_index = iou_matrix.max(dim=1)
+            good = best_iou >= 0.5
+            matched += int(good.sum())
+            conf_delta_list.extend((int8_data[best_index[good], 4] - fp32_data[good, 4]).tolist())
+
+        frame_number = len(frame_list)
+        fp32_ms = time_dict["fp32"] / frame_number * 1000
+        int8_ms = time_dict["int8"] / frame_number * 1000
+        return {"fp32_boxes": fp32_boxes, "int8_boxes": int8_boxes,
+                "recall": matched / fp32_boxes if fp32_boxes else 1.0,
+                "precision": matched / int8_boxes if int8_boxes else 1.0,
+                "conf_delta": float(np.mean(conf_delta_list)) if conf_delta_list else 0.0,
+                "fp32_ms": fp32_ms, "int8_ms": int8_ms,
+                "speedup": fp32_ms / int8_ms if int8_ms else 0.0}
+
+    def to_spec(self) -> Dict[str, Any]:
+        """
+        获得创建识别进程所需的最小配置，只包括根目录、模型路径和预测参数，不包括已加载的模型和日志处理器
+        配置只由基本类型组成，传递给子进程时的序列化开销可以忽略
+
+        Returns
+        -------
+        detector_spec : Dict[str, Any]
+            包括root_dir(根目录)和parameter(_spec_attribute_list中各预测参数的当前值)
+        """
+        return {"root_dir": self.root_dir,
+                "parameter": {name: getattr(self, name) for name in self._spec_attribute_list}}
+
+    @classmethod
+    def from_spec(cls, detector_spec: Dict[str, Any]) -> "Video_Detector":
+        """
+        在子进程中根据to_spec获得的配置创建检测器，模型仍在第一次使用时才加载
+
+        Parameters
+        ----------
+        detector_spec : Dict[str, Any]
+            to_spec获得的配置
+
+        Returns
+        -------
+        detector : Video_Detector
+            预测参数与创建配置的检测器相同的新检测器
+        """
+        detector = cls(root_dir=detector_spec["root_dir"])
+        for name, value in detector_spec["parameter"].items():
+            setattr(detector, name, value)
+        return detector
 
     def _create_logger(self):
         """创建日志处理器对象的实例，分别记录ERROR和INFO信息"""
@@ -274,7 +1030,8 @@ class Video_Detector(object):
                 self.weight_pt = weight_pt
             else:
                 self.weight_pt = os.path.join(self.root_dir, weight_pt)
-            self.train_model = YOLO(weight_pt)
+            # 预训练模型改变后，在下一次训练时重新加载
+            self.train_model = None
         # device可能是0
         if device is not None:
             self.device = device
@@ -329,6 +1086,9 @@ class Video_Detector(object):
         需要在类外设置好训练参数和配置文件，以及数据集
         """
         try:
+            # 第一次训练时加载模型
+            if self.train_model is None:
+                self.train_model = YOLO(self.weight_pt)
             # begin train
             self.result = self.train_model.train(data=self.data, batch=self.batch,
                                                  epochs=self.epochs, imgsz=self.imgsz,
@@ -342,20 +1102,21 @@ class Video_Detector(object):
             self.error_logger.logger.error(f"An error of type {error_type} occurred: {str(e)}",
                                             exc_info=True)
 
-    def _one_model_predict(self, pre_source: Union[str, np.ndarray],
+    def _one_model_predict(self, pre_source: Union[str, np.ndarray, List[np.ndarray]],
                            mode: int = None,
                            show: int = None,
                            iou: float = None,
                            conf: float = None) -> Optional[list[Results]]:
         """
         单个模型的预测函数，可以根据mode选择模型加载图片/视频进行预测，获得对应的返回结果
-        是内置的方法，不提供对外接口，是predict函数的子部分
+        是内置的方法，不提供对外接口，是predict和predict_batch函数的子部分
 
         Parameters
         ----------
-        pre_source : Union[str, np.ndarray]
+        pre_source : Union[str, np.ndarray, List[np.ndarray]]
             用于推理的的特定数据源，可以是矩阵，图片路径，URL，视频路径或者设备id
             支持广泛的格式和来源，实现了跨不同类型输入的灵活应用。
+            为矩阵列表时，列表中的全部矩阵作为一批同时送入模型预测
         mode : int
             指定使用的识别模型，未指定(为None)时使用内部的默认模式对应的模型进行识别
         show: bool
@@ -388,7 +1149,7 @@ class Video_Detector(object):
         try:
             if isinstance(pre_source, str):
                 if mode == 2:
-                    result = self.predict_model[mode].predict(
+                    result = self.get_predict_model(mode).predict(
                         stream=True,
                         show=show,
                         source=pre_source,
@@ -397,7 +1158,7 @@ class Video_Detector(object):
                         device=self.device,
                         classes=0)
                 else:
-                    result = self.predict_model[mode].predict(
+                    result = self.get_predict_model(mode).predict(
                         stream=True,
                         show=show,
                         source=pre_source,
@@ -406,7 +1167,7 @@ class Video_Detector(object):
                         device=self.device)
             else:
                 if mode == 2:
-                    result = self.predict_model[mode].predict(
+                    result = self.get_predict_model(mode).predict(
                         stream=False,
                         show=show,
                         source=pre_source,
@@ -415,7 +1176,7 @@ class Video_Detector(object):
                         device=self.device,
                         classes=0)
                 else:
-                    result = self.predict_model[mode].predict(
+                    result = self.get_predict_model(mode).predict(
                         stream=False,
                         show=show,
                         source=pre_source,
@@ -474,6 +1235,147 @@ class Video_Detector(object):
             return None
         return result
 
+    def predict_batch(self, frame_list: List[np.ndarray],
+                      mode: int = None,
+                      iou: float = None,
+                      conf: float = None,
+                      max_batch: int = None,
+                      roi_list: List[Optional[List[List[List[float]]]]] = None
+                      ) -> Optional[List[dict[int, list[Results]]]]:
+        """
+        批量预测函数，将多个视频帧(可以来自不同的视频源)合并为批次送入模型，减少逐帧调用模型的开销
+        视频帧设置了感兴趣区域时，只将各感兴趣区域裁剪后送入模型，识别结果的坐标映射回整个视频帧
+
+        Parameters
+        ----------
+        frame_list : List[np.ndarray]
+            要预测的视频帧列表
+        mode : int
+            指定使用的识别模型，允许为0，即使用所有模型，未指定(为None)时使用默认模式
+        iou: float
+            指定衡量预测边界框与真实边界框之间重叠程度，未指定(为None)时使用默认值
+        conf: float
+            指定模型对识别设置的置信度阈值，未指定(为None)时使用默认值
+        max_batch : int
+            一次送入模型的最大图像数量，超过时分为多批依次预测，未指定(为None)时使用默认值
+        roi_list : List[Optional[List[List[List[float]]]]]
+            与frame_list一一对应的感兴趣区域，每个元素为多边形的列表，顶点坐标是相对于视频帧宽高的比例
+            元素为None或空列表时识别整个视频帧，未指定(为None)时全部视频帧都识别整个视频帧
+
+        Returns
+        -------
+        result_list : Optional[List[dict[int, list[Results]]]]
+            与frame_list一一对应的预测结果，每个元素与predict的返回值结构相同
+            模式无效或预测出错时返回None
+        """
+        if mode is None:
+            mode = self.model_mode
+        if mode == 0:
+            model_list = [1, 2, 3]
+        elif mode in (1, 2, 3):
+            model_list = [mode]
+        else:
+            return None
+        if max_batch is None:
+            max_batch = self.max_batch
+        if roi_list is None:
+            roi_list = [None] * len(frame_list)
+
+        # 将设置了感兴趣区域的视频帧裁剪为多个图像，记录每个图像所属的视频帧和在视频帧中的偏移
+        input_list = []
+        input_offset_list = []
+        for index, (frame, roi) in enumerate(zip(frame_list, roi_list)):
+            if roi:
+                for polygon in roi:
+                    crop, x, y = self.crop_roi(frame, polygon)
+                    input_list.append(crop)
+                    input_offset_list.append((index, x, y))
+            else:
+                input_list.append(frame)
+                input_offset_list.append((index, 0, 0))
+
+        result_list = [{} for _ in frame_list]
+        for model in model_list:
+            # 按最大批次大小分批，每个模型对每批各预测一次
+            input_result_list = []
+            for start in range(0, len(input_list), max_batch):
+                batch_result = self._one_model_predict(input_list[start:start + max_batch],
+                                                       model, False, iou, conf)
+                if batch_result is None:
+                    return None
+                input_result_list.extend(batch_result)
+
+            # 识别整个视频帧的直接使用预测结果，感兴趣区域的预测结果将坐标平移回视频帧后合并
+            box_data_dict = {}
+            for (index, x, y), result in zip(input_offset_list, input_result_list):
+                if not roi_list[index]:
+                    result_list[index][model] = [result]
+                    continue
+                box_data = result.boxes.data.clone()
+                box_data[:, [0, 2]] += x
+                box_data[:, [1, 3]] += y
+                box_data_dict.setdefault(index, []).append(box_data)
+            for index, box_data_list in box_data_dict.items():
+                box_data = torch.cat(box_data_list)
+                # 感兴趣区域重叠时，去除重叠部分的重复识别框
+                if len(box_data_list) > 1 and len(box_data):
+                    keep = batched_nms(box_data[:, :4], box_data[:, 4], box_data[:, 5],
+                                       self.iou if iou is None else iou)
+                    box_data = box_data[keep]
+                result_list[index][model] = [self._create_results(frame_list[index], model, box_data)]
+        return result_list
+
+    def _create_results(self, frame: np.ndarray, mode: int, box_data: torch.Tensor) -> Results:
+        """
+        根据整个视频帧中的识别框创建yolov8的结果对象，视为内部函数，不提供外部接口
+
+        Parameters
+        ----------
+        frame : np.ndarray
+            识别框所在的视频帧
+        mode : int
+            识别框对应的模型的模式
+        box_data : torch.Tensor
+            (N, 6)的识别框张量，每行为x1, y1, x2, y2, 置信度, 类别
+
+        Returns
+        -------
+        result : Results
+            与模型预测得到的结果对象结构相同，可以直接用于绘制和判断错误类型
+        """
+        return Results(orig_img=frame, path="", names=self.get_predict_model(mode).names, boxes=box_data)
+
+    @staticmethod
+    def crop_roi(frame: np.ndarray, polygon: List[List[float]]) -> Tuple[np.ndarray, int, int]:
+        """
+        将视频帧裁剪为感兴趣区域多边形的外接矩形，多边形以外的像素填充为灰色，避免识别到区域以外的目标
+
+        Parameters
+        ----------
+        frame : np.ndarray
+            要裁剪的视频帧
+        polygon : List[List[float]]
+            感兴趣区域的多边形，顶点坐标是相对于视频帧宽高的比例
+
+        Returns
+        -------
+        crop : np.ndarray
+            裁剪后的图像，送入模型时由模型自行缩放和填充为模型的输入大小
+        x : int
+            裁剪后的图像左上角在视频帧中的横坐标
+        y : int
+            裁剪后的图像左上角在视频帧中的纵坐标
+        """
+        height, width = frame.shape[:2]
+        points = np.round(np.asarray(polygon, dtype=np.float32) * [width - 1, height - 1]).astype(np.int32)
+        x, y, crop_width, crop_height = cv.boundingRect(points)
+        crop = frame[y:y + crop_height, x:x + crop_width].copy()
+        # 多边形以外的像素使用与yolov8填充边框相同的灰色
+        mask = np.zeros(crop.shape[:2], dtype=np.uint8)
+        cv.fillPoly(mask, [(points - [x, y]).astype(np.int32)], 255)
+        crop[mask == 0] = 114
+        return crop, x, y
+
     def model_plot(self, frame: np.ndarray, results1: Results = None,
                    results2: Results = None, results3: Results = None) -> np.ndarray:
         """
@@ -495,78 +1397,72 @@ class Video_Detector(object):
         """
 
         # 在图像上绘制边界框
-        if results1 is not None:
-            for box in results1.boxes:
-                # 获取边界框坐标
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                # 获取置信度和标签
-                confidence = box.conf[0]
-                label = box.cls[0]
-                # 绘制矩形边界框
-                cv.rectangle(frame, (x1, y1), (x2, y2),
-                             self.predict_class_type_color_dict[1][int(label)], 2)
-                # 在边界框上绘制标签和置信度
-                label_text = f'{self.predict_model[1].names[int(label)]}: {confidence:.2f}'
-                cv.putText(frame, label_text, (x1, y1 - 10), cv.FONT_HERSHEY_SIMPLEX, 0.6,
-                           (255, 255, 255), 2)
+        self._plot_boxes(frame, results1, 1)
         # 其他同理
-        if results2 is not None:
-            for box in results2.boxes:
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                confidence = box.conf[0]
-                label = box.cls[0]
-                cv.rectangle(frame, (x1, y1), (x2, y2),
-                             self.predict_class_type_color_dict[2], 2)
-                label_text = f'{self.predict_model[2].names[int(label)]}: {confidence:.2f}'
-                cv.putText(frame, label_text, (x1, y1 - 10), cv.FONT_HERSHEY_SIMPLEX, 0.6,
-                           (255, 255, 255), 2)
-        if results3 is not None:
-            for box in results3.boxes:
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                confidence = box.conf[0]
-                label = box.cls[0]
-                cv.rectangle(frame, (x1, y1), (x2, y2),
-                             self.predict_class_type_color_dict[3], 2)
-                label_text = f'{self.predict_model[3].names[int(label)]}: {confidence:.2f}'
-                cv.putText(frame, label_text, (x1, y1 - 10), cv.FONT_HERSHEY_SIMPLEX, 0.6,
-                           (255, 255, 255), 2)
+        self._plot_boxes(frame, results2, 2)
+        self._plot_boxes(frame, results3, 3)
         return frame
 
-    def detect(self, frame_queue: multiprocessing.Queue,
-               result_queue: multiprocessing.Queue,
-               mode: int = None,
-               save_dir: str = None, max_frame: int = None,
-               iou: float = None, sensitivity: int = 0) -> None:
+    def _plot_boxes(self, frame: np.ndarray, results: Optional[Results], model: int):
         """
-        对摄像头捕捉视频帧的实时检测和处理函数，是视频检测器的核心处理函数
-        通过多进程的视频帧队列从视频流处理器对象处获得视频帧
-        并通过另一个队列将检测后的错误码和每个预测类型的对应置信度返回给视频流处理器对象，完成进程通信
+        在图像上绘制单个模型识别结果的全部碰撞箱，视为内部函数，不提供外部接口
+        坐标、置信度和类别一次性从张量转为数组，逐个碰撞箱只进行绘制
+
         Parameters
         ----------
-        frame_queue : multiprocessing.Queue
-            视频流对象传入的视频帧队列，用于获得要处理的视频帧队列
-        result_queue : multiprocessing.Queue
-            返回给视频流对象的处理队列，用于返回错误码和置信度
+        frame : np.ndarray
+            要绘制的图像，原地修改
+        results : Optional[Results]
+            模型的识别结果，如果为None，则不绘制
+        model : int
+            识别结果对应的模型，用于选择碰撞箱的颜色
+        """
+        if results is None or len(results.boxes) == 0:
+            return
+        boxes = results.boxes
+        xyxy_list = boxes.xyxy.cpu().numpy().astype(int).tolist()
+        conf_list = boxes.conf.cpu().numpy().tolist()
+        label_list = boxes.cls.cpu().numpy().astype(int).tolist()
+        color = self.predict_class_type_color_dict[model]
+        for (x1, y1, x2, y2), confidence, label in zip(xyxy_list, conf_list, label_list):
+            # 绘制矩形边界框，火焰模型按类别使用不同的颜色
+            cv.rectangle(frame, (x1, y1), (x2, y2), color[label] if isinstance(color, dict) else color, 2)
+            # 在边界框上绘制标签和置信度
+            cv.putText(frame, f'{results.names[label]}: {confidence:.2f}', (x1, y1 - 10),
+                       cv.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+
+    def _create_detect_source(self, source_id: int, frame_queue: Frame_Ring_Buffer,
+                              mode: int = None, save_dir: str = None, max_frame: int = None,
+                              sensitivity: int = 0,
+                              roi_list: List[List[List[float]]] = None,
+                              result_queue: multiprocessing.Queue = None) -> "Detect_Source":
+        """
+        根据传入参数创建单个视频源的识别状态，参数的含义与detect相同，视为内部函数，不提供外部接口
+
+        Parameters
+        ----------
+        source_id : int
+            视频源的编号
+        frame_queue : Frame_Ring_Buffer
+            该视频源的视频帧环形缓冲区
         mode : int
-            指定的模式，用户指定后由视频流处理器传给当前的检测器实例，以完成用户要求的检测功能
+            指定的模式，未指定(为None)时使用默认值
         save_dir : str
-            指定的视频保存路径，目前不提供设置方式，需要在进一步优化后完成设置
+            指定的视频保存路径，未指定(为None)时在保存目录下按当前时间创建子目录
         max_frame : int
-            指定的最大缓冲区帧数，因为无法直接解析视频设备的帧率，故暂未用于实践
-        iou : float
-            指定衡量预测边界框与真实边界框之间重叠程度，未指定(为None)时使用默认值
+            指定的最大缓冲区帧数，未指定(为None)时使用默认值
         sensitivity : int
-            指定对异常的敏感程度，0对应低敏感程度，设置置信度阈值为0.6，1对应高敏感程度，设置置信度阈值为0.5，默认为低敏感
+            指定对异常的敏感程度，0对应低敏感程度，设置置信度阈值为0.6，1对应高敏感程度，设置置信度阈值为0.5
+        roi_list : List[List[List[float]]]
+            该视频源的感兴趣区域，未指定(为None)时识别整个视频帧
+        result_queue : multiprocessing.Queue
+            该视频源返回错误码和置信度的结果队列
 
-        Notes
-        -----
-        传入的视频帧使用具有限定大小的双端队列进行处理
-        每次从传入视频帧队列中获得全部视频帧按先入先出的顺序进行存储，随后从队列末尾取最实时的视频帧进行检测
-        这相对于对双端队列中未取出检测的视频帧进行了识别丢帧处理，但能够被保存
-        最终处理的视频帧比例由设备性能和进程被分配的资源决定
-        既能保存异常出现的前因后果，又可以保证处理的实时性
+        Returns
+        -------
+        source : Detect_Source
+            该视频源的识别状态
         """
-
         # 设置mode和save_dir，max_frame
         # iou和conf在self.predict里设置
         if mode is None:
@@ -574,217 +1470,43 @@ class Video_Detector(object):
         if save_dir is None:
             save_now = datetime.datetime.now().strftime(Log_Processor.strftime_all)
             save_dir = os.path.join(self.save_dir, save_now)
-            self.make_dir(save_dir)
         if not os.path.isabs(save_dir):
             save_dir = os.path.join(self.root_dir, save_dir)
-            self.make_dir(save_dir)
+        self.make_dir(save_dir)
         if max_frame is None:
             max_frame = self.max_frame
         if sensitivity == 0:
             conf = 0.6
         else:
             conf = 0.5
-        # 进程调用需要重新创建一些对象
-        self._create_logger()
-        self.info_logger.log_write("Video Detector start detect", Log_Processor.INFO)
-        # 缓冲区，保存限定数量的视频帧
-        save_frame_deque = deque(maxlen=max_frame)
-        # 写入有问题部分及前后的视频流到文件的对象
-        warning_video_out = None
-
-        # 读取视频帧队列是否为空
-        flag_wait = False
-        # 错误视频帧标记和等待传入视频帧时间记录
-        warning_flag = False
-        # 已传输过的错误类型的记录
-        warning_type_record = 0
-        # 已传输过的错误类型的最大置信度的记录
-        warning_conf_record = [0, 0, 0, 0]
-        # 最后一次识别到错误的视频帧之后的无无措视频帧数量
-        no_warning_frame = 0
-        # 运行的开始时间
-        start_wait_time = time.time()
-        # 主循环
-        while True:
-            try:
-                # 判断另一进程是否结束
-                if frame_queue.empty():
-                    # 未处于等待状态，说明之前处理了视频帧，从此处开始等待
-                    if not flag_wait:
-                        flag_wait = True
-                        # 记录开始等待时间
-                        start_wait_time = time.time()
-                        continue
-                    # 处理等待状态
-                    else:
-                        # 如果等待的时间超过了15s，结束运行
-                        if time.time() - start_wait_time >= 15:
-                            self.error_logger.log_write(f"Timed out waiting for video frame." +
-                                                        f" Video Detector stop waiting " +
-                                                        f"and exit the detect process",
-                                                        Log_Processor.ERROR)
-                            break
-                        # 否则继续循环
-                        else:
-                            continue
-
-                # 如果不为空，重置等待状态，重计时
-                else:
-                    flag_wait = False
-                    start_wait_time = time.time()
-
-                # 保存当前传入的全部帧
-                for _ in range(frame_queue.qsize()):
-                    save_frame_deque.append(frame_queue.get())
-                # 弹出最新帧，使其能够处理最新帧
-                frame = save_frame_deque.pop()
-
-                # 传入结束标志，需要清空result_queue再关闭，并释放warning_video_out
-                if frame is None:
-                    for _ in range(result_queue.qsize()):
-                        result_queue.get()
-                    self.info_logger.log_write(f"Detect finish. Please cheack the {save_dir}",
-                                               Log_Processor.INFO)
-                    if warning_video_out is not None:
-                        warning_video_out.release()
-                    return
-
-                # 否则处理最新帧
-                else:
-                    # 预测视频帧获得结果
-                    predict_result = self.predict(pre_source=frame, mode=mode,
-                                                  show=False, iou=iou, conf=conf)
-                    # 记录错误码
-                    warning_mode = 0
-                    # 记录每类错误的最大置信度
-                    warning_conf = [0, 0, 0, 0]
-                    # 全部识别模式和单个模型模式的出现错误的范围不同
-                    if mode == 0:
-                        # 遍历三个模型的预测结果
-                        for i in range(1, 4):
-                            # 遍历预测图片的碰撞箱
-                            for box in predict_result[i][0].boxes:
-                                for box_error in set(box.cls.tolist()):
-                                # 获得错误码和每个错误类型的最大置信度
-                                    warning_mode |= self.mode_precdict_warning_mode[i][box_error]
-                                    warning_conf[self.mode_precdict_class[i][box_error]] = \
-                                        max(warning_conf[self.mode_precdict_class[i][box_error]],
-                                            max(box.conf.tolist()))
-                    else:
-                        # 遍历使用模型的预测结果，获得错误码和错误类型的最大置信度
-                        for box in predict_result[mode][0].boxes:
-                            for box_error in set(box.cls.tolist()):
-                                # 获得错误码和每个错误类型的最大置信度
-                                warning_mode |= self.mode_precdict_warning_mode[mode][box_error]
-                                warning_conf[self.mode_precdict_class[mode][box_error]] = \
-                                    max(warning_conf[self.mode_precdict_class[mode][box_error]],
-                                        max(box.conf.tolist()))
-
-                    # 出现错误时
-                    if warning_mode:
-                        # 全部识别模式保存检测框内图像并需要重新绘制图像
-                        if mode == 0:
-                            predict_frame = self.model_plot(predict_result[1][0].orig_img,
-                                                            predict_result[1][0], predict_result[2][0],
-                                                            predict_result[3][0])
-                        # 单个模型识别模式保存检测框内图像并绘制图像
-                        else:
-                            predict_frame = predict_result[mode][0].plot()
-                        # 将预测帧结果放回缓冲队列
-                        save_frame_deque.append(predict_frame)
-                        # 如果不在警告标志范围内
-                        if not warning_flag:
-                            # 发送警告信息，包括错误码和置信度的二元素列表
-                            result_queue.put([warning_mode, warning_conf])
-                            # 记录已发送的错误类型和最大置信度
-                            warning_type_record |= warning_mode
-                            warning_conf_record = warning_conf
-                            warning_flag = True
-                            # 利用VideoWriter保存有问题部分及前后的视频流，
-                            # 文件路径为生成路径，帧率和分辨率统一为限制后的视频大小和帧率，彩色模式
-                            fourcc = cv.VideoWriter.fourcc(*"DIVX")
-                            save_name = datetime.datetime.now().strftime(Log_Processor.strftime_all)
-                            warning_video_path = os.path.join(save_dir, f"{save_name}.avi")
-                            warning_video_out = cv.VideoWriter(warning_video_path, fourcc, 30,
-                                                               (predict_frame.shape[1],
-                                                                predict_frame.shape[0]), True)
-                            # 将缓冲区的全部视频帧写入
-                            while save_frame_deque:
-                                warning_video_out.write(save_frame_deque.popleft())
-                            # 日志记录
-                            self.error_logger.log_write("Video Detector Warning!!!\n"
-                                                        f"The warning code is {warning_mode}, "
-                                                        f"the warning conf is {warning_conf}",
-                                                        Log_Processor.ERROR)
-
-                        # 如果在警告标志范围内
-                        else:
-                            new_warning_code = 0
-                            # 比较新的错误的最大置信度等级是否比原最大置信度等级高
-                            for i in range(len(warning_conf_record)):
-                                # 如果是，此位置需要发送新的错误信息，并记录该最大置信度
-                                # 未发送过的错误类型在判断中也被保存了
-                                if Warning_Processor.get_level_description(warning_conf_record[i], sensitivity) < \
-                                   Warning_Processor.get_level_description(warning_conf[i], sensitivity):
-                                    new_warning_code |= self.warning_mode_list[i]
-                                    warning_conf_record[i] = warning_conf[i]
-                            # 如果有需要发送新的错误信息，则发送对应的警告信息
-                            if new_warning_code:
-                                result_queue.put([new_warning_code, warning_conf])
-                                warning_type_record |= new_warning_code
-                                # 日志记录
-                                self.error_logger.log_write("Video Detector Warning!!!\n"
-                                                            f"The warning code is {warning_mode}, "
-                                                            f"the warning conf is {warning_conf}",
-                                                            Log_Processor.ERROR)
-
-                            # 将缓冲区的全部视频帧写入
-                            while save_frame_deque:
-                                warning_video_out.write(save_frame_deque.popleft())
-                        # 重新记录无问题视频帧数量
-                        no_warning_frame = 0
-
-                    # 无错误时
-                    else:
-                        # 正常返回原视频帧
-                        save_frame_deque.append(frame)
-                        # 检测前面出现问题时，当前是否经过了max_frame帧
-                        if warning_flag:
-                            # 先将缓冲区的全部视频帧写入
-                            if warning_video_out is not None:
-                                while save_frame_deque:
-                                    warning_video_out.write(save_frame_deque.popleft())
-                            # 如果经过了max_frame帧
-                            no_warning_frame += 1
-                            if no_warning_frame == max_frame:
-                                # 重置警告标志
-                                warning_flag = False
-                                # 释放写视频文件对象
-                                warning_video_out.release()
-                                # 重置无发送错误类型
-                                warning_type_record = 0
-
-            # 错误处理
-            except Exception as e:
-                # catch all errors and export to the log
-                error_type = type(e).__name__
-                self.error_logger.logger.error("An error of type %s occurred: %s", error_type, str(e),
-                                               exc_info=True)
-                break
-
-    def re_detect(self, video_file: str, ui_event=None,
-                  mode: int = None,
-                  save_dir: str = None, max_frame: int = None,
-                  iou: float = None, sensitivity: int = 0) -> None:
+        # 每个视频源使用独立的运动检测门控，各自学习背景
+        motion_gate = None
+        if self.motion_gate:
+            motion_gate = Motion_Gate(self.motion_min_area, self.motion_force_interval)
+        # 人像识别和异常行为识别模式下，每个视频源使用独立的识别框跟踪器
+        box_tracker = None
+        if mode in self._track_mode_list and self.track_interval > 1:
+            box_tracker = Box_Tracker(self.track_interval)
+        return Detect_Source(source_id, frame_queue, mode, conf, sensitivity, save_dir, max_frame,
+                             motion_gate, roi_list, box_tracker, result_queue, self.pre_roll_time)
+
+    def detect(self, frame_queue: Frame_Ring_Buffer,
+               result_queue: multiprocessing.Queue,
+               mode: int = None,
+               save_dir: str = None, max_frame: int = None,
+               iou: float = None, sensitivity: int = 0,
+               roi_list: List[List[List[float]]] = None,
+               ready_event: synchronize.Event = None) -> None:
         """
-        对传入视频路径的视频的检测和处理函数，是视频检测器的另一个核心处理函数
-        被创建后作为独立的进程运行，不受视频处理器的创建进程影响，只受ui界面的停止命令影响
+        对摄像头捕捉视频帧的实时检测和处理函数，是视频检测器的核心处理函数
+        通过多进程的视频帧队列从视频流处理器对象处获得视频帧
+        并通过另一个队列将检测后的错误码和每个预测类型的对应置信度返回给视频流处理器对象，完成进程通信
         Parameters
         ----------
-        video_file : str
-            要处理视频的指定绝对路径
-        ui_event : multiprocessing.Event
-            用于监听ui界面的停止信息的事件
+        frame_queue : Frame_Ring_Buffer
+            视频流对象传入的基于共享内存的视频帧环形缓冲区，用于获得要处理的视频帧，接口与multiprocessing.Queue相同
+        result_queue : multiprocessing.Queue
+            返回给视频流对象的处理队列，用于返回错误码和置信度
         mode : int
             指定的模式，用户指定后由视频流处理器传给当前的检测器实例，以完成用户要求的检测功能
         save_dir : str
@@ -795,18 +1517,531 @@ class Video_Detector(object):
             指定衡量预测边界框与真实边界框之间重叠程度，未指定(为None)时使用默认值
         sensitivity : int
             指定对异常的敏感程度，0对应低敏感程度，设置置信度阈值为0.6，1对应高敏感程度，设置置信度阈值为0.5，默认为低敏感
-        """
+        roi_list : List[List[List[float]]]
+            感兴趣区域的多边形列表，顶点坐标是相对于视频帧宽高的比例，只识别这些区域，未指定(为None)时识别整个视频帧
+        ready_event : multiprocessing.Event
+            模型加载和预热完成后设置的事件，视频流处理器等待该事件后再送入视频帧，未指定(为None)时不通知
 
-        # 设置mode和save_dir，max_frame
-        # iou和conf在self.predict里设置
-        if mode is None:
-            mode = self.model_mode
+        Notes
+        -----
+        传入的视频帧使用具有限定大小的双端队列进行处理
+        每次在视频帧缓冲区上阻塞等待新的视频帧，无视频帧时进程处于睡眠状态，超过15s未收到视频帧时结束运行
+        获得视频帧后取出缓冲区中的全部视频帧按先入先出的顺序进行存储，随后从队列末尾取最实时的视频帧进行检测
+        这相对于对双端队列中未取出检测的视频帧进行了识别丢帧处理，但能够被保存
+        最终处理的视频帧比例由设备性能和进程被分配的资源决定
+        既能保存异常出现的前因后果，又可以保证处理的实时性
+        """
+
+        # 进程调用需要重新创建一些对象
+        self._create_logger()
+        source = self._create_detect_source(0, frame_queue, mode, save_dir, max_frame, sensitivity, roi_list,
+                                            result_queue)
+        self.info_logger.log_write("Video Detector start detect", Log_Processor.INFO)
+        # 返回的结果不需要标记视频源
+        self._detect_sources([source], iou, tag_source=False, ready_event=ready_event)
+
+    def detect_multi(self, frame_queue_list: List[Frame_Ring_Buffer],
+                     result_queue: multiprocessing.Queue,
+                     mode: int = None,
+                     save_dir: str = None, max_frame: int = None,
+                     iou: float = None, sensitivity: int = 0,
+                     roi_list_list: List[Optional[List[List[List[float]]]]] = None,
+                     ready_event: synchronize.Event = None) -> None:
+        """
+        在一个进程中对多个视频源进行实时检测和处理的函数，所有视频源共用同一份已加载的模型
+        每个视频源有独立的视频帧环形缓冲区和识别状态，检测结果通过同一个队列返回，并标记视频源的编号
+
+        Parameters
+        ----------
+        frame_queue_list : List[Frame_Ring_Buffer]
+            各视频源的视频帧环形缓冲区，必须使用同一个条件变量，视频源的编号为其在列表中的索引
+        result_queue : multiprocessing.Queue
+            返回给视频流对象的处理队列，每个元素为[视频源编号, 错误码, 置信度]
+        mode : int
+            指定的模式，所有视频源使用相同的模式
+        save_dir : str
+            指定的视频保存路径，每个视频源在其下使用以source_编号命名的子目录
+        max_frame : int
+            指定的最大缓冲区帧数
+        iou : float
+            指定衡量预测边界框与真实边界框之间重叠程度，未指定(为None)时使用默认值
+        sensitivity : int
+            指定对异常的敏感程度，含义与detect相同
+        roi_list_list : List[Optional[List[List[List[float]]]]]
+            与frame_queue_list一一对应的各视频源的感兴趣区域，含义与detect的roi_list相同，未指定(为None)时都识别整个视频帧
+        ready_event : multiprocessing.Event
+            模型加载和预热完成后设置的事件，含义与detect相同
+
+        Notes
+        -----
+        进程在各缓冲区共用的条件变量上同时等待，任一视频源有视频帧时被唤醒
+        被唤醒后最多等待batch_wait_time以凑满一批，再将所有有视频帧的视频源的最新视频帧合并为一批预测
+        每轮每个视频源只识别一帧，保证各视频源被公平地处理
+        某个视频源结束或超时后，其余视频源继续识别，直到全部视频源结束
+        """
+
+        # 进程调用需要重新创建一些对象
+        self._create_logger()
+        if save_dir is None:
+            save_now = datetime.datetime.now().strftime(Log_Processor.strftime_all)
+            save_dir = os.path.join(self.save_dir, save_now)
+        elif not os.path.isabs(save_dir):
+            save_dir = os.path.join(self.root_dir, save_dir)
+        if roi_list_list is None:
+            roi_list_list = [None] * len(frame_queue_list)
+        source_list = [self._create_detect_source(source_id, frame_queue, mode,
+                                                  os.path.join(save_dir, f"source_{source_id}"),
+                                                  max_frame, sensitivity, roi_list_list[source_id],
+                                                  result_queue)
+                       for source_id, frame_queue in enumerate(frame_queue_list)]
+        self.info_logger.log_write(f"Video Detector start detect {len(source_list)} video sources",
+                                   Log_Processor.INFO)
+        self._detect_sources(source_list, iou, tag_source=True, ready_event=ready_event)
+
+    def serve(self, frame_queue_list: List[Frame_Ring_Buffer],
+              result_queue_list: List[multiprocessing.Queue],
+              request_queue: multiprocessing.Queue,
+              response_queue_list: List[multiprocessing.Queue],
+              iou: float = None, ready_event: synchronize.Event = None) -> None:
+        """
+        常驻识别服务的主函数，被创建后作为长期运行的进程，已加载的模型在多次监控之间保持不变
+        视频设备通过请求连接(attach)到服务的某个槽位，结束时解除连接(detach)，不需要重新创建进程和加载模型
+        一般不直接调用，而是通过Detector_Service创建和使用
+
+        Parameters
+        ----------
+        frame_queue_list : List[Frame_Ring_Buffer]
+            各槽位的视频帧环形缓冲区，必须使用同一个条件变量，槽位的编号为其在列表中的索引
+        result_queue_list : List[multiprocessing.Queue]
+            与frame_queue_list一一对应的各槽位的结果队列，每个元素为[错误码, 置信度]
+        request_queue : multiprocessing.Queue
+            接收请求的队列，请求为元组，包括：
+            ("attach", 槽位, 模式, 敏感程度, 感兴趣区域列表)，使用该槽位开始识别，模型未加载时先加载并预热
+            ("detach", 槽位)，结束该槽位的识别
+            ("stop",)，结束识别服务
+        response_queue_list : List[multiprocessing.Queue]
+            与frame_queue_list一一对应的各槽位的响应队列，attach成功时响应("attached", 槽位)
+            失败时响应("failed", 槽位)，detach完成时响应("detached", 槽位)
+        iou : float
+            指定衡量预测边界框与真实边界框之间重叠程度，未指定(为None)时使用默认值
+        ready_event : multiprocessing.Event
+            默认模式的模型加载和预热完成后设置的事件
+
+        Notes
+        -----
+        没有连接的视频设备时在请求队列上等待，有连接的视频设备时每轮识别前检查一次请求
+        等待视频帧的时间不超过_service_poll_interval，保证请求能够被及时处理
+        识别服务不会卸载已加载的模型，不同模式的视频设备连接时只需要加载一次
+        """
+
+        # 进程调用需要重新创建一些对象
+        self._create_logger()
+        batch_size = min(len(frame_queue_list), self.max_batch)
+        # 预先加载并预热默认模式的模型
+        self.warm_up([self.model_mode], batch_size, unload_other=False)
+        if ready_event is not None:
+            ready_event.set()
+        self.info_logger.log_write(f"Video Detector start serving {len(frame_queue_list)} slots",
+                                   Log_Processor.INFO)
+
+        # 各槽位的视频源和仍在运行的视频源
+        source_dict = {}
+        active_list = []
+        while True:
+            # 没有视频源时等待请求，有视频源时只检查请求，由等待视频帧控制循环的间隔
+            try:
+                if active_list:
+                    request = request_queue.get_nowait()
+                else:
+                    request = request_queue.get(timeout=self._service_poll_interval)
+            except queue.Empty:
+                request = None
+
+            if request is not None:
+                if request[0] == "stop":
+                    break
+                slot = request[1]
+                # 无论连接还是解除连接，先结束该槽位原有的视频源
+                old_source = source_dict.pop(slot, None)
+                if old_source is not None:
+                    old_source.release()
+                    if old_source in active_list:
+                        active_list.remove(old_source)
+                if request[0] == "attach":
+                    mode, sensitivity, roi_list = request[2:]
+                    try:
+                        # 新模式的模型在连接时加载并预热，已加载的模型直接使用
+                        if any(model not in self.predict_model for model in self._model_list([mode])):
+                            self.warm_up([mode], batch_size, unload_other=False)
+                        frame_queue_list[slot].reset()
+                        source = self._create_detect_source(slot, frame_queue_list[slot], mode, None, None,
+                                                            sensitivity, roi_list, result_queue_list[slot])
+                    except Exception as e:
+                        error_type = type(e).__name__
+                        self.error_logger.logger.error("An error of type %s occurred when attaching slot %s: %s",
+                                                       error_type, slot, str(e), exc_info=True)
+                        response_queue_list[slot].put(("failed", slot))
+                        continue
+                    source_dict[slot] = source
+                    active_list.append(source)
+                    self.info_logger.log_write(f"Slot {slot} attached with mode {mode}", Log_Processor.INFO)
+                    response_queue_list[slot].put(("attached", slot))
+                else:
+                    self.info_logger.log_write(f"Slot {slot} detached", Log_Processor.INFO)
+                    response_queue_list[slot].put(("detached", slot))
+                continue
+
+            if active_list:
+                try:
+                    self._detect_round(active_list, iou, False, self._service_poll_interval)
+                except Exception as e:
+                    # 单个视频源出错不影响识别服务继续运行
+                    error_type = type(e).__name__
+                    self.error_logger.logger.error("An error of type %s occurred: %s", error_type, str(e),
+                                                   exc_info=True)
+
+        for source in source_dict.values():
+            source.release()
+        self.info_logger.log_write("Video Detector stop serving", Log_Processor.INFO)
+
+    def _detect_sources(self, source_list: List["Detect_Source"],
+                        iou: float = None, tag_source: bool = False,
+                        ready_event: synchronize.Event = None) -> None:
+        """
+        识别进程的主循环，视为内部函数，不提供外部接口
+
+        Parameters
+        ----------
+        source_list : List[Detect_Source]
+            各视频源的识别状态
+        iou : float
+            指定衡量预测边界框与真实边界框之间重叠程度，未指定(为None)时使用默认值
+        tag_source : bool
+            返回的结果是否在开头标记视频源的编号
+        ready_event : multiprocessing.Event
+            模型加载和预热完成后设置的事件
+        """
+
+        # 只加载并预热各视频源实际使用的模型，完成后通知视频流处理器开始送入视频帧
+        self.warm_up([source.mode for source in source_list], min(len(source_list), self.max_batch))
+        if ready_event is not None:
+            ready_event.set()
+        # 仍在运行的视频源
+        active_list = list(source_list)
+        # 主循环
+        while active_list:
+            try:
+                self._detect_round(active_list, iou, tag_source, self._frame_wait_time_out)
+
+            # 错误处理
+            except Exception as e:
+                # catch all errors and export to the log
+                error_type = type(e).__name__
+                self.error_logger.logger.error("An error of type %s occurred: %s", error_type, str(e),
+                                               exc_info=True)
+                break
+
+        # 全部视频源结束后，需要清空result_queue再关闭
+        if not active_list:
+            for result_queue in {source.result_queue for source in source_list}:
+                for _ in range(result_queue.qsize()):
+                    result_queue.get()
+        for source in active_list:
+            source.release()
+
+    def _detect_round(self, active_list: List["Detect_Source"], iou: float = None,
+                      tag_source: bool = False, wait_time: float = None) -> None:
+        """
+        识别进程主循环的一轮，等待视频帧并对每个有视频帧的视频源识别一次，视为内部函数，不提供外部接口
+        结束或超时的视频源会被释放并从active_list中移除
+
+        Parameters
+        ----------
+        active_list : List[Detect_Source]
+            仍在运行的视频源的识别状态
+        iou : float
+            指定衡量预测边界框与真实边界框之间重叠程度，未指定(为None)时使用默认值
+        tag_source : bool
+            返回的结果是否在开头标记视频源的编号
+        wait_time : float
+            等待视频帧的最长时间，单位为秒，超时后检查各视频源的心跳
+        """
+        # 在缓冲区上阻塞等待视频帧，空闲时不占用CPU
+        # 如果没有视频帧，且另一进程超过15s没有刷新心跳，说明其已经停止传入视频帧，结束该视频源
+        ready_list = Frame_Ring_Buffer.wait_any([source.frame_queue for source in active_list], wait_time)
+        if not ready_list:
+            for source in [source for source in active_list
+                           if source.frame_queue.heartbeat_age() >= self._frame_wait_time_out]:
+                self.error_logger.log_write(f"Timed out waiting for video frame of source " +
+                                            f"{source.source_id}. Video Detector stop waiting " +
+                                            f"and exit the detect of the source",
+                                            Log_Processor.ERROR)
+                source.release()
+                active_list.remove(source)
+            return
+
+        # 多个视频源时，短暂等待其他视频源的视频帧，凑成一批同时预测
+        batch_count = min(self.max_batch, len(active_list))
+        if len(ready_list) < batch_count and self.batch_wait_time > 0:
+            ready_list = Frame_Ring_Buffer.wait_any([source.frame_queue for source in active_list],
+                                                    self.batch_wait_time, batch_count)
+
+        # 每个有视频帧的视频源取出一次最新的视频帧，按模式和置信度阈值分组
+        batch_dict = {}
+        for source in [source for source in active_list if source.frame_queue in ready_list]:
+            frame = source.take_latest_frame()
+
+            # 传入结束标志，释放该视频源的warning_video_out
+            if frame is None:
+                self.info_logger.log_write(f"Detect finish. Please cheack the {source.save_dir}\n"
+                                           f"The frame buffer stats is {source.frame_queue.stats()}",
+                                           Log_Processor.INFO)
+                if source.motion_gate is not None:
+                    self.info_logger.log_write(f"The motion gate stats is {source.motion_gate.stats()}",
+                                               Log_Processor.INFO)
+                if source.box_tracker is not None:
+                    self.info_logger.log_write(f"The box tracker stats is {source.box_tracker.stats()}",
+                                               Log_Processor.INFO)
+                source.release()
+                active_list.remove(source)
+                continue
+            # 画面无明显变化时跳过识别，视为无错误的视频帧，警告期间不跳过以便跟踪异常的变化
+            if source.motion_gate is not None and not source.warning_flag and \
+                    not source.motion_gate.should_infer(frame):
+                self._process_predict_result(source, frame, None)
+                continue
+            # 两次模型识别之间使用光流跟踪上一次的识别框，跟踪丢失时立即进行模型识别
+            if source.box_tracker is not None and not source.box_tracker.need_detect():
+                box_dict = source.box_tracker.track(frame)
+                if box_dict is not None:
+                    predict_result = {model: [self._create_results(frame, model, torch.from_numpy(box_data))]
+                                      for model, box_data in box_dict.items()}
+                    self._send_warning_info(source, frame, predict_result, tag_source)
+                    continue
+            batch_dict.setdefault((source.mode, source.conf), []).append((source, frame))
+
+        # 否则批量预测最新帧获得结果，并返回需要发送的警告信息
+        for (mode, conf), batch in batch_dict.items():
+            predict_result_list = self.predict_batch([frame for _, frame in batch], mode, iou, conf,
+                                                     roi_list=[source.roi_list for source, _ in batch])
+            # 预测出错时已写入日志，跳过这一批视频帧
+            if predict_result_list is None:
+                continue
+            for (source, frame), predict_result in zip(batch, predict_result_list):
+                # 用模型识别的结果重新开始跟踪
+                if source.box_tracker is not None:
+                    source.box_tracker.update(frame, {model: result[0].boxes.data[:, :6].cpu().numpy()
+                                                      for model, result in predict_result.items()})
+                self._send_warning_info(source, frame, predict_result, tag_source)
+
+    def _send_warning_info(self, source: "Detect_Source", frame: np.ndarray,
+                           predict_result: dict[int, list[Results]], tag_source: bool):
+        """
+        处理单个视频源最新视频帧的预测结果，并将需要发送的警告信息放入结果队列，视为内部函数，不提供外部接口
+
+        Parameters
+        ----------
+        source : Detect_Source
+            视频源的识别状态
+        frame : np.ndarray
+            被识别的视频帧
+        predict_result : dict[int, list[Results]]
+            模型识别或识别框跟踪得到的预测结果
+        tag_source : bool
+            返回的结果是否在开头标记视频源的编号
+        """
+        for warning_info in self._process_predict_result(source, frame, predict_result):
+            if tag_source:
+                source.result_queue.put([source.source_id] + warning_info)
+            else:
+                source.result_queue.put(warning_info)
+
+    def _summarize_warning(self, predict_result: dict[int, list[Results]],
+                           model_list: List[int]) -> Tuple[int, List[float]]:
+        """
+        使用查找表在识别结果的类别和置信度数组上一次性计算错误码和每类错误的最大置信度，视为内部函数，不提供外部接口
+        每个模型只进行常数次数组运算，开销与识别框的数量无关
+
+        Parameters
+        ----------
+        predict_result : dict[int, list[Results]]
+            预测结果
+        model_list : List[int]
+            需要统计的模型
+
+        Returns
+        -------
+        warning_mode : int
+            各识别框对应错误码的按位或
+        warning_conf : List[float]
+            每类错误的最大置信度，顺序与warning_mode_list相同，未出现的错误为0
+        """
+        warning_mode = 0
+        warning_conf = np.zeros(len(self.warning_mode_list), dtype=np.float32)
+        for model in model_list:
+            boxes = predict_result[model][0].boxes
+            if len(boxes) == 0:
+                continue
+            label = boxes.cls.cpu().numpy().astype(int)
+            warning_mode |= int(np.bitwise_or.reduce(self._warning_code_table[model][label]))
+            # 同一类错误的多个识别框取最大置信度
+            np.maximum.at(warning_conf, self._warning_class_table[model][label], boxes.conf.cpu().numpy())
+        return warning_mode, warning_conf.tolist()
+
+    def _process_predict_result(self, source: "Detect_Source", frame: np.ndarray,
+                                predict_result: Optional[dict[int, list[Results]]]) -> List[list]:
+        """
+        处理单个视频源最新视频帧的预测结果，更新其识别状态，保存异常前后的视频，视为内部函数，不提供外部接口
+
+        Parameters
+        ----------
+        source : Detect_Source
+            视频源的识别状态
+        frame : np.ndarray
+            被识别的视频帧
+        predict_result : Optional[dict[int, list[Results]]]
+            predict返回的预测结果，为None时说明被运动检测门控跳过识别，按无错误的视频帧处理
+
+        Returns
+        -------
+        warning_info_list : List[list]
+            需要发送的警告信息，每个元素为错误码和置信度的二元素列表
+        """
+        warning_info_list = []
+        mode = source.mode
+        # 全部识别模式和单个模型模式的出现错误的范围不同，获得错误码和每类错误的最大置信度
+        if predict_result is None:
+            warning_mode, warning_conf = 0, [0, 0, 0, 0]
+        elif mode == 0:
+            warning_mode, warning_conf = self._summarize_warning(predict_result, [1, 2, 3])
+        else:
+            warning_mode, warning_conf = self._summarize_warning(predict_result, [mode])
+
+        # 出现错误时
+        if warning_mode:
+            # 全部识别模式保存检测框内图像并需要重新绘制图像
+            if mode == 0:
+                predict_frame = self.model_plot(predict_result[1][0].orig_img,
+                                                predict_result[1][0], predict_result[2][0],
+                                                predict_result[3][0])
+            # 单个模型识别模式保存检测框内图像并绘制图像
+            else:
+                predict_frame = predict_result[mode][0].plot()
+            # 将预测帧结果放回缓冲队列
+            source.push_frame(source.latest_time, predict_frame)
+            source.last_warning_time = source.latest_time
+            # 如果不在警告标志范围内
+            if not source.warning_flag:
+                # 发送警告信息，包括错误码和置信度的二元素列表
+                warning_info_list.append([warning_mode, warning_conf])
+                # 记录已发送的错误类型和最大置信度
+                source.warning_type_record |= warning_mode
+                source.warning_conf_record = warning_conf
+                source.warning_flag = True
+                # 利用VideoWriter保存有问题部分及前后的视频流，
+                # 文件路径为生成路径，帧率为送入识别进程的视频帧的实际速度，彩色模式
+                save_name = datetime.datetime.now().strftime(Log_Processor.strftime_all)
+                warning_video_path = os.path.join(source.save_dir, f"{save_name}.avi")
+                source.open_warning_video(warning_video_path, predict_frame.shape)
+                # 将缓冲区的全部视频帧写入
+                source.write_warning_frames()
+                # 日志记录
+                self.error_logger.log_write("Video Detector Warning!!!\n"
+                                            f"The warning code is {warning_mode}, "
+                                            f"the warning conf is {warning_conf}",
+                                            Log_Processor.ERROR)
+
+            # 如果在警告标志范围内
+            else:
+                new_warning_code = 0
+                # 比较新的错误的最大置信度等级是否比原最大置信度等级高
+                for i in range(len(source.warning_conf_record)):
+                    # 如果是，此位置需要发送新的错误信息，并记录该最大置信度
+                    # 未发送过的错误类型在判断中也被保存了
+                    if Warning_Processor.get_level_description(source.warning_conf_record[i],
+                                                               source.sensitivity) < \
+                       Warning_Processor.get_level_description(warning_conf[i], source.sensitivity):
+                        new_warning_code |= self.warning_mode_list[i]
+                        source.warning_conf_record[i] = warning_conf[i]
+                # 如果有需要发送新的错误信息，则发送对应的警告信息
+                if new_warning_code:
+                    warning_info_list.append([new_warning_code, warning_conf])
+                    source.warning_type_record |= new_warning_code
+                    # 日志记录
+                    self.error_logger.log_write("Video Detector Warning!!!\n"
+                                                f"The warning code is {warning_mode}, "
+                                                f"the warning conf is {warning_conf}",
+                                                Log_Processor.ERROR)
+
+                # 将缓冲区的全部视频帧写入
+                source.write_warning_frames()
+
+        # 无错误时
+        else:
+            # 正常返回原视频帧
+            source.push_frame(source.latest_time, frame)
+            # 检测前面出现问题时，当前是否经过了pre_roll_time秒
+            if source.warning_flag:
+                # 先将缓冲区的全部视频帧写入
+                if source.warning_video_out is not None:
+                    source.write_warning_frames()
+                # 如果经过了pre_roll_time秒
+                if source.latest_time - source.last_warning_time >= source.pre_roll_time:
+                    # 重置警告标志
+                    source.warning_flag = False
+                    # 释放写视频文件对象
+                    source.warning_video_out.release()
+                    # 重置无发送错误类型
+                    source.warning_type_record = 0
+        return warning_info_list
+
+    def re_detect(self, video_file: str, ui_event=None,
+                  mode: int = None,
+                  save_dir: str = None, max_frame: int = None,
+                  iou: float = None, sensitivity: int = 0, worker_count: int = None,
+                  sparse_interval: int = None) -> None:
+        """
+        对传入视频路径的视频的检测和处理函数，是视频检测器的另一个核心处理函数
+        被创建后作为独立的进程运行，不受视频处理器的创建进程影响，只受ui界面的停止命令影响
+        顺序识别时定期保存检查点，被停止或意外退出后，以相同参数重新识别同一视频时从检查点继续
+        Parameters
+        ----------
+        video_file : str
+            要处理视频的指定绝对路径
+        ui_event : multiprocessing.Event
+            用于监听ui界面的停止信息的事件
+        mode : int
+            指定的模式，用户指定后由视频流处理器传给当前的检测器实例，以完成用户要求的检测功能
+        save_dir : str
+            指定的视频保存路径，目前不提供设置方式，需要在进一步优化后完成设置
+        max_frame : int
+            指定的最大缓冲区帧数，因为无法直接解析视频设备的帧率，故暂未用于实践
+        iou : float
+            指定衡量预测边界框与真实边界框之间重叠程度，未指定(为None)时使用默认值
+        sensitivity : int
+            指定对异常的敏感程度，0对应低敏感程度，设置置信度阈值为0.6，1对应高敏感程度，设置置信度阈值为0.5，默认为低敏感
+        worker_count : int
+            并行识别的进程数量，未指定(为None)时使用re_detect_workers，大于1时调用_re_detect_parallel分块并行识别
+        sparse_interval : int
+            稀疏扫描的采样间隔，未指定(为None)时使用sparse_interval，大于1时调用_re_detect_sparse先稀疏扫描再逐帧识别
+        """
+
+        # 设置mode和save_dir，max_frame
+        # iou和conf在self.predict里设置
+        if mode is None:
+            mode = self.model_mode
+        if worker_count is None:
+            worker_count = self.re_detect_workers
+        if sparse_interval is None:
+            sparse_interval = self.sparse_interval
         if save_dir is None:
             save_dir = self.save_dir
         elif not os.path.isabs(save_dir):
             save_dir = os.path.join(self.root_dir, save_dir)
         if max_frame is None:
             max_frame = self.max_frame
+        if iou is None:
+            iou = self.iou
         # 如果是低敏感度，置信度conf默认为0.6
         if sensitivity == 0:
             conf = 0.6
@@ -816,111 +2051,810 @@ class Video_Detector(object):
 
         # 进程调用需要重新创建一些对象
         self._create_logger()
+        # 稀疏扫描时只在阳性采样帧附近逐帧识别
+        if sparse_interval > 1:
+            self._re_detect_sparse(video_file, ui_event, mode, save_dir, max_frame, iou, conf,
+                                   sparse_interval, worker_count)
+            return
+        # 多进程时分块并行识别，视频较短不足以分块时仍顺序识别
+        if worker_count > 1 and self._re_detect_parallel(video_file, ui_event, mode, save_dir, max_frame,
+                                                         iou, conf, worker_count):
+            return
+        self.load_predict_model([mode])
+        model_list = self._model_list([mode])
         self.info_logger.log_write("Video Detector start re-detect", Log_Processor.INFO)
 
-        # 对整个视频流进行完整的预测处理
-        predict_result = self.predict(pre_source=video_file, mode=mode,
-                                      show=False, iou=iou, conf=conf)
+        # 检查点由任务的参数确定，相同的任务重新开始时从检查点继续
+        checkpoint_path = self._re_detect_checkpoint_path(video_file, save_dir, mode, max_frame, iou, conf)
+        checkpoint = self._load_re_detect_checkpoint(checkpoint_path)
+        if checkpoint is None:
+            # 根据save_dir和当前时间创建目录来保存识别结果(包括了子路径video和chunk的创建)
+            use_dir = self._create_re_detect_dir(save_dir)
+            # 下一个要识别的视频帧索引
+            frame_index = 0
+            # 检查点时缓冲队列中还没有写入的视频帧数量
+            pending_frame = 0
+            # 已经写完的视频分段，每段为写入的视频帧索引和异常视频帧记录
+            segment_list = []
+            # 日志记录
+            self.info_logger.log_write("Re-detect and save at the same time.\n"
+                                       f"The save dir is {use_dir}.", Log_Processor.INFO)
+        else:
+            use_dir = checkpoint["use_dir"]
+            frame_index = checkpoint["frame_index"]
+            pending_frame = checkpoint["pending_frame"]
+            segment_list = [(written_list, [tuple(event) for event in segment_event_list])
+                            for written_list, segment_event_list in checkpoint["segment_list"]]
+            self.info_logger.log_write(f"Resume re-detect from frame {frame_index}.\n"
+                                       f"The save dir is {use_dir}.", Log_Processor.INFO)
+        # 删除检查点之后写入的不完整的视频分段
+        chunk_dir = os.path.join(use_dir, "chunk")
+        self.make_dir(chunk_dir)
+        segment_name_set = {f"chunk_{index}.avi" for index in range(len(segment_list))}
+        for file_name in os.listdir(chunk_dir):
+            if file_name not in segment_name_set:
+                os.remove(os.path.join(chunk_dir, file_name))
+
+        # 用队列存储处理结果帧，缓冲区限制大小，元素为视频帧索引和视频帧
+        frame_queue = deque(maxlen=max_frame)
+        # 重新读取检查点时缓冲队列中还没有写入的视频帧
+        if pending_frame:
+            cap = cv.VideoCapture(video_file)
+            cap.set(cv.CAP_PROP_POS_FRAMES, frame_index - pending_frame)
+            for pending_index in range(frame_index - pending_frame, frame_index):
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frame_queue.append((pending_index, frame))
+            cap.release()
+
+        # 以流的方式逐帧预测，每次只保留当前视频帧的结果，内存占用与视频长度无关
+        cache_dict = self._open_detect_cache(video_file, mode, iou)
+        stream_dict = self._stream_predict(video_file, mode, iou, conf, cache_dict, frame_index)
+        warning_video_out = None
+        written_list = []
+        event_list = []
+        flag_stop = False
+        # 同步遍历各模型对每个视频帧的处理结果，zip每次只从各生成器取一个结果
+        for result in zip(*(stream_dict[model] for model in model_list)):
+            # 如果要求退出则退出
+            if ui_event is not None and ui_event.is_set():
+                flag_stop = True
+                break
+            predict_result = {model: [model_result] for model, model_result in zip(model_list, result)}
+            warning_mode, _ = self._summarize_warning(predict_result, model_list)
+            # 如果出现了任意一个检测类型
+            if warning_mode:
+                # 全部类型识别时用model_plot绘制加入碰撞箱之后的原始视频帧
+                if mode == 0:
+                    frame = self.model_plot(result[0].orig_img, *result)
+                else:
+                    frame = result[0].plot()
+                # 将问题帧用图片保存起来
+                cv.imwrite(os.path.join(use_dir, f"frame_{frame_index}.jpg"), frame)
+                event_list.append((frame_index, warning_mode))
+                # 将问题帧加入队列
+                frame_queue.append((frame_index, frame))
+                if warning_video_out is None:
+                    # 创建视频写入流，每个视频分段写入一个文件，识别结束后合并
+                    fourcc = cv.VideoWriter.fourcc(*"DIVX")
+                    warning_video_out = cv.VideoWriter(os.path.join(chunk_dir, f"chunk_{len(segment_list)}.avi"),
+                                                       fourcc, 30, (frame.shape[1], frame.shape[0]), True)
+                    if warning_video_out.isOpened():
+                        self.info_logger.log_write("Start video save", Log_Processor.INFO)
+                # 将缓冲区的全部视频帧写入
+                while frame_queue:
+                    written_index, written_frame = frame_queue.popleft()
+                    warning_video_out.write(written_frame)
+                    written_list.append(written_index)
+            # 否则只保存视频帧即可
+            else:
+                frame_queue.append((frame_index, result[0].orig_img))
+            frame_index += 1
+
+            # 定期保存检查点
+            if self.re_detect_checkpoint_interval > 0 and frame_index % self.re_detect_checkpoint_interval == 0:
+                # 结束当前的视频分段，保证检查点记录的视频分段都已完整写入
+                if warning_video_out is not None:
+                    warning_video_out.release()
+                    warning_video_out = None
+                    segment_list.append((written_list, event_list))
+                    written_list, event_list = [], []
+                # 识别结果缓存每次保存都要重写整个文件，只在停止和识别完成时保存，检查点不保存缓存
+                self._save_re_detect_checkpoint(checkpoint_path, use_dir, frame_index, len(frame_queue),
+                                                segment_list)
 
-        # 预测完成后才能退出，如果要求退出则退出
-        if ui_event is not None:
-            if ui_event.is_set():
+        if warning_video_out is not None:
+            warning_video_out.release()
+            segment_list.append((written_list, event_list))
+        # 被停止时保存检查点，以相同参数重新识别时从停止的位置继续，不保存检查点时直接合并已识别部分的结果
+        if flag_stop:
+            self._close_detect_cache(cache_dict)
+            self.info_logger.log_write(f"Re-detect stopped at frame {frame_index}", Log_Processor.INFO)
+            if self.re_detect_checkpoint_interval > 0:
+                self._save_re_detect_checkpoint(checkpoint_path, use_dir, frame_index, len(frame_queue),
+                                                segment_list)
                 return
+        # 没有被中断时已经识别完整个视频，缓存完整
+        else:
+            self._close_detect_cache(cache_dict, frame_index)
+        self._merge_re_detect_chunks(use_dir, segment_list)
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
 
-        # 获得当前时间
-        now = datetime.datetime.now().strftime(Log_Processor.strftime_all)
-        # 根据save_dir和当前时间记录要使用的绝对路径
-        use_dir = os.path.join(save_dir, "re-detect_"+now)
-        # 创建目录来保存识别结果(包括了子路径video的创建)
-        self.make_dir(os.path.join(use_dir, "video"))
+    def _re_detect_checkpoint_path(self, video_file: str, save_dir: str, mode: int, max_frame: int,
+                                   iou: float, conf: float) -> str:
+        """
+        获得重新识别任务的检查点文件路径，视为内部函数，不提供外部接口
+        文件名由视频文件的路径、大小和修改时间以及识别参数的哈希值组成，只有相同的任务使用同一个检查点
 
-        # 日志记录
-        self.info_logger.log_write("Finish re-detect. Start saving...\n"
+        Parameters
+        ----------
+        video_file : str
+            要处理视频的指定绝对路径
+        save_dir : str
+            识别结果的保存目录，检查点文件保存在该目录下
+        mode : int
+            指定的模式
+        max_frame : int
+            缓冲区帧数
+        iou : float
+            指定衡量预测边界框与真实边界框之间重叠程度
+        conf : float
+            模型对识别设置的置信度阈值
+
+        Returns
+        -------
+        checkpoint_path : str
+            检查点文件的绝对路径
+        """
+        stat = os.stat(video_file)
+        job_hash = hashlib.sha256(f"{os.path.abspath(video_file)}|{stat.st_size}|{stat.st_mtime_ns}|"
+                                  f"{mode}|{max_frame}|{iou}|{conf}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(save_dir, f"re-detect_checkpoint_{job_hash}.json")
+
+    def _load_re_detect_checkpoint(self, checkpoint_path: str) -> Optional[Dict[str, Any]]:
+        """
+        读取重新识别任务的检查点，视为内部函数，不提供外部接口
+
+        Parameters
+        ----------
+        checkpoint_path : str
+            检查点文件的绝对路径
+
+        Returns
+        -------
+        checkpoint : Optional[Dict[str, Any]]
+            检查点的内容，包括use_dir、frame_index、pending_frame和segment_list
+            检查点不存在、已损坏或其保存目录已被删除时返回None
+        """
+        if self.re_detect_checkpoint_interval <= 0 or not os.path.exists(checkpoint_path):
+            return None
+        try:
+            with open(checkpoint_path, "r", encoding="utf-8") as file:
+                checkpoint = json.load(file)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            error_type = type(e).__name__
+            self.error_logger.logger.error("An error of type %s occurred when loading checkpoint %s: %s",
+                                           error_type, checkpoint_path, str(e), exc_info=True)
+            return None
+        if not isinstance(checkpoint, dict) or not {"use_dir", "frame_index", "pending_frame", "segment_list"} <= checkpoint.keys() or \
+           not os.path.isdir(checkpoint["use_dir"]):
+            return None
+        return checkpoint
+
+    @staticmethod
+    def _save_re_detect_checkpoint(checkpoint_path: str, use_dir: str, frame_index: int, pending_frame: int,
+                                   segment_list: List[Tuple[List[int], List[Tuple[int, int]]]]):
+        """
+        保存重新识别任务的检查点，先写入临时文件再替换，避免中断时损坏已有的检查点，视为内部函数，不提供外部接口
+
+        Parameters
+        ----------
+        checkpoint_path : str
+            检查点文件的绝对路径
+        use_dir : str
+            重新识别的保存目录
+        frame_index : int
+            下一个要识别的视频帧索引
+        pending_frame : int
+            缓冲队列中还没有写入的视频帧数量，即frame_index之前的这些视频帧需要重新读取
+        segment_list : List[Tuple[List[int], List[Tuple[int, int]]]]
+            已经写完的视频分段，每段为写入的视频帧索引和异常视频帧记录
+        """
+        temp_path = checkpoint_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump({"use_dir": use_dir, "frame_index": frame_index, "pending_frame": pending_frame,
+                       "segment_list": segment_list}, file)
+        os.replace(temp_path, checkpoint_path)
+
+    def _re_detect_parallel(self, video_file: str, ui_event, mode: int, save_dir: str, max_frame: int,
+                            iou: float, conf: float, worker_count: int) -> bool:
+        """
+        将视频按帧范围分块，在进程池中并行重新识别，再按顺序合并各块的结果，视为内部函数，不提供外部接口
+        每块向前多读取max_frame帧作为预录部分，使块开头的异常也能保存其之前的视频帧，与顺序识别的结果一致
+
+        Parameters
+        ----------
+        video_file : str
+            要处理视频的指定绝对路径
+        ui_event : multiprocessing.Event
+            用于监听ui界面的停止信息的事件，传递给进程池中的各进程
+        mode : int
+            指定的模式
+        save_dir : str
+            识别结果的保存目录
+        max_frame : int
+            缓冲区帧数，即预录部分的长度
+        iou : float
+            指定衡量预测边界框与真实边界框之间重叠程度
+        conf : float
+            模型对识别设置的置信度阈值
+        worker_count : int
+            并行识别的进程数量
+
+        Returns
+        -------
+        flag : bool
+            是否进行了并行识别，视频帧数不足以分块时返回False，由调用者顺序识别
+        """
+        cap = cv.VideoCapture(video_file)
+        total_frame = int(cap.get(cv.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+        cap.release()
+        # 每块至少是预录部分长度的两倍，否则重叠部分的开销过大
+        chunk_frame = max(math.ceil(total_frame / worker_count), 2 * max_frame)
+        chunk_count = math.ceil(total_frame / chunk_frame) if total_frame else 0
+        if chunk_count <= 1:
+            return False
+
+        use_dir = self._create_re_detect_dir(save_dir)
+        self.info_logger.log_write(f"Video Detector start re-detect {total_frame} frames in {chunk_count} chunks "
+                                   f"with {worker_count} processes.\nThe save dir is {use_dir}.",
+                                   Log_Processor.INFO)
+
+        # 最后一块读取到视频结尾，避免帧数统计不准确时漏掉视频帧
+        range_list = [(index * chunk_frame, None if index == chunk_count - 1 else (index + 1) * chunk_frame)
+                      for index in range(chunk_count)]
+        cache_dict = self._open_detect_cache(video_file, mode, iou)
+        chunk_result_list = self._run_re_detect_ranges(video_file, range_list, ui_event, mode, max_frame,
+                                                       iou, conf, use_dir, worker_count, cache_dict)
+        # 被停止时各分块返回已识别部分的结果，合并已识别部分，与顺序识别不保存检查点时相同
+        if ui_event is not None and ui_event.is_set():
+            self._close_detect_cache(cache_dict)
+            self.info_logger.log_write("Re-detect stopped, merge the finished part", Log_Processor.INFO)
+        # 各分块覆盖了整个视频，缓存完整
+        else:
+            self._close_detect_cache(cache_dict, complete=True)
+        self._merge_re_detect_chunks(use_dir, chunk_result_list)
+        return True
+
+    def _re_detect_sparse(self, video_file: str, ui_event, mode: int, save_dir: str, max_frame: int,
+                          iou: float, conf: float, sparse_interval: int, worker_count: int):
+        """
+        先稀疏扫描再逐帧识别的重新识别方式，视为内部函数，不提供外部接口
+        第一遍每隔sparse_interval帧采样识别一帧，使用降低sparse_conf_margin后的置信度阈值，其余视频帧只读取不解码
+        第二遍只对阳性采样帧前后各sparse_interval帧的窗口逐帧识别，各窗口作为分块识别和合并，保存的结果与逐帧识别相同
+        只有持续时间短于sparse_interval帧且恰好落在两个采样帧之间的异常可能被漏掉
+
+        Parameters
+        ----------
+        video_file : str
+            要处理视频的指定绝对路径
+        ui_event : multiprocessing.Event
+            用于监听ui界面的停止信息的事件
+        mode : int
+            指定的模式
+        save_dir : str
+            识别结果的保存目录
+        max_frame : int
+            缓冲区帧数，即每个窗口预录部分的长度
+        iou : float
+            指定衡量预测边界框与真实边界框之间重叠程度
+        conf : float
+            模型对识别设置的置信度阈值
+        sparse_interval : int
+            稀疏扫描的采样间隔
+        worker_count : int
+            逐帧识别各窗口时并行的进程数量，不大于1时在当前进程中依次识别
+        """
+        self.load_predict_model([mode])
+        model_list = self._model_list([mode])
+        cache_dict = self._open_detect_cache(video_file, mode, iou)
+        scan_conf = max(conf - self.sparse_conf_margin, self._detect_cache_conf)
+        use_dir = self._create_re_detect_dir(save_dir)
+        self.info_logger.log_write(f"Video Detector start sparse re-detect with interval {sparse_interval}.\n"
                                    f"The save dir is {use_dir}.", Log_Processor.INFO)
 
-        # 用队列存储处理结果帧，缓冲区限制大小
-        frame_queue = deque(maxlen=max_frame)
-        # 视频帧索引
+        # 稀疏扫描，记录阳性和临界的采样帧
+        positive_list = []
         frame_index = 0
-        # 错误标记
-        flag_error = False
-        warning_video_out = None
-        # 全部类型识别
-        if mode == 0:
-            # 遍历三个模型对每个视频帧的处理结果
-            for result in zip(predict_result[1], predict_result[2], predict_result[3]):
-                # 如果要求退出则退出
-                if ui_event is not None:
-                    if ui_event.is_set():
-                        return
-                # 如果这三个result中出现了任意一个检测类型
-                if len(result[0].boxes.cls) != 0 or \
-                   len(result[1].boxes.cls) != 0 or \
-                   len(result[2].boxes.cls) != 0:
-                    # 用model_plot绘制加入碰撞箱之后的原始视频帧
-                    frame = self.model_plot(result[0].orig_img, result[0], result[1], result[2])
-                    # 将问题帧用图片保存起来
-                    save_path = os.path.join(use_dir, f"frame_{frame_index}.jpg")
-                    cv.imwrite(save_path, frame)
-                    # 将问题帧加入队列
-                    frame_queue.append(frame)
-                    if not flag_error:
-                        flag_error = True
-                        # 创建视频写入流，利用VideoWriter保存有问题部分及前后的视频流，
-                        # 文件路径为生成路径，帧率和分辨率统一为限制后的视频大小和帧率，彩色模式
-                        fourcc = cv.VideoWriter.fourcc(*"DIVX")
-                        warning_video_path = os.path.join(use_dir, "video", "1_re-detect.avi")
-                        warning_video_out = cv.VideoWriter(warning_video_path, fourcc, 30,
-                                                           (frame.shape[1],
-                                                            frame.shape[0]), True)
-                        if warning_video_out.isOpened():
-                            self.info_logger.log_write("Start video save", Log_Processor.INFO)
-
-                    if warning_video_out is not None:
-                        # 将缓冲区的全部视频帧写入
-                        while frame_queue:
-                            warning_video_out.write(frame_queue.popleft())
-                # 否则只保存视频帧即可
-                else:
-                    frame_queue.append(result[0].orig_img)
+        cap = cv.VideoCapture(video_file)
+        while True:
+            # 稀疏扫描时被停止还没有保存任何结果，删除保存目录
+            if ui_event is not None and ui_event.is_set():
+                cap.release()
+                self._close_detect_cache(cache_dict)
+                shutil.rmtree(use_dir, ignore_errors=True)
+                return
+            # 非采样帧只读取不解码
+            if frame_index % sparse_interval:
+                if not cap.grab():
+                    break
                 frame_index += 1
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            predict_result = {model: self._cached_predict(frame, frame_index, model, iou, scan_conf, cache_dict)
+                              for model in model_list}
+            if self._summarize_warning(predict_result, model_list)[0]:
+                positive_list.append(frame_index)
+            frame_index += 1
+        cap.release()
+        total_frame = frame_index
+        # 逐帧识别窗口的进程从缓存文件中读取采样帧的结果
+        self._close_detect_cache(cache_dict)
+
+        # 阳性采样帧前后到相邻采样帧之间的视频帧组成窗口，合并重叠和相邻的窗口
+        range_list = []
+        for positive_index in positive_list:
+            start_frame = max(0, positive_index - sparse_interval + 1)
+            end_frame = min(total_frame, positive_index + sparse_interval)
+            if range_list and start_frame <= range_list[-1][1]:
+                range_list[-1] = (range_list[-1][0], end_frame)
+            else:
+                range_list.append((start_frame, end_frame))
+        self.info_logger.log_write(f"Sparse scan finish, {len(positive_list)} of "
+                                   f"{math.ceil(total_frame / sparse_interval)} samples are positive, "
+                                   f"dense re-detect {sum(end - start for start, end in range_list)} of "
+                                   f"{total_frame} frames in {len(range_list)} windows", Log_Processor.INFO)
+
+        chunk_result_list = self._run_re_detect_ranges(video_file, range_list, ui_event, mode, max_frame,
+                                                       iou, conf, use_dir, worker_count, cache_dict)
+        self._close_detect_cache(cache_dict)
+        # 被停止时合并已识别部分的窗口
+        if ui_event is not None and ui_event.is_set():
+            self.info_logger.log_write("Re-detect stopped, merge the finished part", Log_Processor.INFO)
+        self._merge_re_detect_chunks(use_dir, chunk_result_list)
+
+    def _create_re_detect_dir(self, save_dir: str) -> str:
+        """根据当前时间创建重新识别的保存目录及其video和chunk子目录，返回保存目录，视为内部函数，不提供外部接口"""
+        now = datetime.datetime.now().strftime(Log_Processor.strftime_all)
+        use_dir = os.path.join(save_dir, "re-detect_" + now)
+        self.make_dir(os.path.join(use_dir, "video"))
+        self.make_dir(os.path.join(use_dir, "chunk"))
+        return use_dir
+
+    def _run_re_detect_ranges(self, video_file: str, range_list: List[Tuple[int, Optional[int]]], ui_event,
+                              mode: int, max_frame: int, iou: float, conf: float, use_dir: str,
+                              worker_count: int, cache_dict: Dict[int, Detection_Cache]
+                              ) -> List[Tuple[List[int], List[Tuple[int, int]]]]:
+        """
+        按帧范围列表逐帧识别视频的各个分块，视为内部函数，不提供外部接口
+        worker_count大于1且有多个分块时在进程池中并行识别，否则在当前进程中依次识别
+        进程池的每个进程只创建一次检测器并加载一次模型，相邻的多个分块合并为一个任务，减少调度开销
+        各分块新识别的结果合并到cache_dict中，由调用者保存
+
+        Parameters
+        ----------
+        video_file : str
+            要处理视频的指定绝对路径
+        range_list : List[Tuple[int, Optional[int]]]
+            各分块的起始帧索引和结束帧索引(不包括)，结束帧索引为None时读取到视频结尾
+        ui_event : multiprocessing.Event
+            用于监听ui界面的停止信息的事件
+        mode : int
+            指定的模式
+        max_frame : int
+            缓冲区帧数，即预录部分的长度
+        iou : float
+            指定衡量预测边界框与真实边界框之间重叠程度
+        conf : float
+            模型对识别设置的置信度阈值
+        use_dir : str
+            重新识别的保存目录，各分块的视频文件保存在其chunk子目录中
+        worker_count : int
+            并行识别的进程数量
+        cache_dict : Dict[int, Detection_Cache]
+            各模型的识别结果缓存，由_open_detect_cache获得，不使用缓存时为空
 
-        # 如果只选择单个的模型
+        Returns
+        -------
+        chunk_result_list : List[Tuple[List[int], List[Tuple[int, int]]]]
+            按顺序排列的各分块的保存视频帧索引和异常视频帧记录，含义与_re_detect_chunk的返回值相同
+        """
+        chunk_path_list = [os.path.join(use_dir, "chunk", f"chunk_{index}.avi") for index in range(len(range_list))]
+        if worker_count <= 1 or len(range_list) <= 1:
+            result_list = [self._re_detect_chunk(video_file, start_frame, end_frame, max_frame, mode, iou, conf,
+                                                 use_dir, chunk_path, stop_event=ui_event)
+                           for (start_frame, end_frame), chunk_path in zip(range_list, chunk_path_list)]
         else:
-            for result in predict_result[mode]:
-                # 如果要求退出则退出
-                if ui_event is not None:
-                    if ui_event.is_set():
-                        return
-                # results是一个Results对象
-                boxes = result.boxes
-                frame = result.plot()
-                frame_queue.append(frame)
-                # 如果监测到了类型，进行图片保存
-                if len(boxes.cls) != 0:
-                    result.save(filename=os.path.join(use_dir, f"frame_{frame_index}.jpg"))
-                    if not flag_error:
-                        flag_error = True
-                        # 创建视频写入流，利用VideoWriter保存有问题部分及前后的视频流，
-                        # 文件路径为生成路径，帧率和分辨率统一为限制后的视频大小和帧率，彩色模式
-                        fourcc = cv.VideoWriter.fourcc(*"DIVX")
-                        warning_video_path = os.path.join(use_dir, "video", "1_re-detect.avi")
-                        warning_video_out = cv.VideoWriter(warning_video_path, fourcc, 30,
-                                                           (frame.shape[1],
-                                                            frame.shape[0]), True)
-
-                        if warning_video_out.isOpened():
-                            self.info_logger.log_write("Start video save", Log_Processor.INFO)
-                    if warning_video_out is not None:
-                        # 将缓冲区的全部视频帧写入
-                        while frame_queue:
-                            warning_video_out.write(frame_queue.popleft())
-                frame_index += 1
+            # 相邻的分块按顺序合并为任务，任务数不超过进程数的_re_detect_task_per_worker倍
+            chunk_list = [(start_frame, end_frame, chunk_path)
+                          for (start_frame, end_frame), chunk_path in zip(range_list, chunk_path_list)]
+            task_size = math.ceil(len(chunk_list) / (worker_count * self._re_detect_task_per_worker))
+            task_list = [chunk_list[index:index + task_size] for index in range(0, len(chunk_list), task_size)]
+            # 各进程平分CPU核心，避免推理线程数超过核心数
+            with ProcessPoolExecutor(max_workers=worker_count, initializer=_init_re_detect_worker,
+                                     initargs=(self.to_spec(), ui_event,
+                                               max(1, (os.cpu_count() or 1) // worker_count))) as executor:
+                future_list = [executor.submit(_run_re_detect_chunks, task, video_file, max_frame, mode, iou, conf,
+                                               use_dir)
+                               for task in task_list]
+                result_list = [result for future in future_list for result in future.result()]
+        # 合并各分块新缓存的识别结果
+        for _, _, pending_dict in result_list:
+            for model, (names, frame_dict) in pending_dict.items():
+                if model in cache_dict:
+                    cache_dict[model].names = cache_dict[model].names or names
+                    cache_dict[model].update(frame_dict)
+        return [(written_list, event_list) for written_list, event_list, _ in result_list]
+
+    def _merge_re_detect_chunks(self, use_dir: str,
+                                chunk_result_list: List[Tuple[List[int], List[Tuple[int, int]]]]):
+        """
+        按顺序合并各分块保存的视频帧和异常视频帧记录，视为内部函数，不提供外部接口
+        预录部分可能已被前一块保存，按帧索引去重，合并后删除chunk子目录
 
-        # 日志记录
-        self.info_logger.log_write("Save finish", Log_Processor.INFO)
+        Parameters
+        ----------
+        use_dir : str
+            重新识别的保存目录
+        chunk_result_list : List[Tuple[List[int], List[Tuple[int, int]]]]
+            按顺序排列的各分块的保存视频帧索引和异常视频帧记录，由_run_re_detect_ranges获得或顺序识别的各视频分段
+        """
+        chunk_dir = os.path.join(use_dir, "chunk")
+        warning_video_out = None
+        last_index = -1
+        event_list = []
+        # 只有一个分块写入了视频帧时不会重复，直接移动该分块的视频文件
+        written_index_list = [index for index, (written_list, _) in enumerate(chunk_result_list) if written_list]
+        if len(written_index_list) == 1:
+            shutil.move(os.path.join(chunk_dir, f"chunk_{written_index_list[0]}.avi"),
+                        os.path.join(use_dir, "video", "1_re-detect.avi"))
+            chunk_result_list = [([], chunk_event_list) for _, chunk_event_list in chunk_result_list]
+        for index, (written_list, chunk_event_list) in enumerate(chunk_result_list):
+            event_list.extend(chunk_event_list)
+            chunk_cap = cv.VideoCapture(os.path.join(chunk_dir, f"chunk_{index}.avi"))
+            for frame_index in written_list:
+                ret, frame = chunk_cap.read()
+                if not ret:
+                    break
+                if frame_index <= last_index:
+                    continue
+                if warning_video_out is None:
+                    fourcc = cv.VideoWriter.fourcc(*"DIVX")
+                    warning_video_out = cv.VideoWriter(os.path.join(use_dir, "video", "1_re-detect.avi"), fourcc,
+                                                       30, (frame.shape[1], frame.shape[0]), True)
+                warning_video_out.write(frame)
+                last_index = frame_index
+            chunk_cap.release()
         if warning_video_out is not None:
             warning_video_out.release()
+        shutil.rmtree(chunk_dir, ignore_errors=True)
+
+        # 保存全部出现异常的视频帧索引和错误码
+        with open(os.path.join(use_dir, "events.csv"), "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame_index", "warning_code"])
+            writer.writerows(event_list)
+        self.info_logger.log_write(f"Save finish, {len(event_list)} frames have exception", Log_Processor.INFO)
+
+    def _re_detect_chunk(self, video_file: str, start_frame: int, end_frame: Optional[int], pre_roll: int,
+                         mode: int, iou: float, conf: float, use_dir: str,
+                         chunk_path: str, stop_event=None
+                         ) -> Tuple[List[int], List[Tuple[int, int]], Dict[int, Tuple[Dict[int, str], Dict[int, np.ndarray]]]]:
+        """
+        重新识别视频的一个分块，在进程池的进程或当前进程中运行，视为内部函数，不提供外部接口
+        预录部分的视频帧只放入缓冲队列，不进行识别，分块内出现异常时将缓冲队列写入该块的视频文件
+
+        Parameters
+        ----------
+        video_file : str
+            要处理视频的指定绝对路径
+        start_frame : int
+            分块的起始帧索引
+        end_frame : Optional[int]
+            分块的结束帧索引(不包括)，为None时读取到视频结尾
+        pre_roll : int
+            预录部分的帧数，即缓冲队列的长度
+        mode : int
+            指定的模式
+        iou : float
+            指定衡量预测边界框与真实边界框之间重叠程度
+        conf : float
+            模型对识别设置的置信度阈值
+        use_dir : str
+            保存异常视频帧图片的目录
+        chunk_path : str
+            该块的视频文件路径
+        stop_event : multiprocessing.Event
+            ui界面的停止事件，设置后立即结束
+
+        Returns
+        -------
+        written_list : List[int]
+            按顺序写入该块视频文件的各视频帧在原视频中的索引
+        event_list : List[Tuple[int, int]]
+            该块内出现异常的视频帧索引和错误码
+        pending_dict : Dict[int, Tuple[Dict[int, str], Dict[int, np.ndarray]]]
+            各模型在该块内新缓存的识别结果，value为类别名称和各视频帧的识别框，由调用者合并保存
+        """
+        self.load_predict_model([mode])
+        model_list = self._model_list([mode])
+        cache_dict = self._open_detect_cache(video_file, mode, iou)
+        frame_queue = deque(maxlen=pre_roll)
+        written_list = []
+        event_list = []
+        warning_video_out = None
+
+        frame_index = max(0, start_frame - pre_roll)
+        cap = cv.VideoCapture(video_file)
+        cap.set(cv.CAP_PROP_POS_FRAMES, frame_index)
+        while end_frame is None or frame_index < end_frame:
+            if stop_event is not None and stop_event.is_set():
+                break
+            ret, frame = cap.read()
+            if not ret:
+                break
+            # 预录部分只放入缓冲队列
+            if frame_index < start_frame:
+                frame_queue.append((frame_index, frame))
+                frame_index += 1
+                continue
+
+            predict_result = {model: self._cached_predict(frame, frame_index, model, iou, conf, cache_dict)
+                              for model in model_list}
+            warning_mode, _ = self._summarize_warning(predict_result, model_list)
+            if warning_mode:
+                if mode == 0:
+                    frame = self.model_plot(frame, predict_result[1][0], predict_result[2][0], predict_result[3][0])
+                else:
+                    frame = predict_result[mode][0].plot()
+                cv.imwrite(os.path.join(use_dir, f"frame_{frame_index}.jpg"), frame)
+                event_list.append((frame_index, warning_mode))
+                frame_queue.append((frame_index, frame))
+                if warning_video_out is None:
+                    fourcc = cv.VideoWriter.fourcc(*"DIVX")
+                    warning_video_out = cv.VideoWriter(chunk_path, fourcc, 30, (frame.shape[1], frame.shape[0]), True)
+                # 将缓冲区的全部视频帧写入
+                while frame_queue:
+                    written_index, written_frame = frame_queue.popleft()
+                    warning_video_out.write(written_frame)
+                    written_list.append(written_index)
+            else:
+                frame_queue.append((frame_index, frame))
+            frame_index += 1
+        cap.release()
+        if warning_video_out is not None:
+            warning_video_out.release()
+        pending_dict = {model: (cache.names, cache.pending()) for model, cache in cache_dict.items()}
+        return written_list, event_list, pending_dict
+
+    def _stream_predict(self, video_file: str, mode: int, iou: float = None, conf: float = None,
+                        cache_dict: Dict[int, Detection_Cache] = None,
+                        start_frame: int = 0) -> Dict[int, Iterator[Results]]:
+        """
+        以流的方式逐帧预测视频文件，每个模型返回一个生成器，每次只产生一个视频帧的结果，视为内部函数，不提供外部接口
+
+        Parameters
+        ----------
+        video_file : str
+            要处理视频的指定绝对路径
+        mode : int
+            指定的模式，0表示使用全部模型
+        iou : float
+            指定衡量预测边界框与真实边界框之间重叠程度，未指定(为None)时使用默认值
+        conf : float
+            模型对识别设置的置信度阈值，未指定(为None)时使用默认值
+        cache_dict : Dict[int, Detection_Cache]
+            各模型的识别结果缓存，由_open_detect_cache获得，存在缓存的模型通过_cached_stream预测
+        start_frame : int
+            开始预测的视频帧索引，默认为0，大于0时通过_cached_stream从该视频帧开始预测
+
+        Returns
+        -------
+        stream_dict : Dict[int, Iterator[Results]]
+            key为模型的模式，value为该模型逐帧产生Results的生成器
+        """
+        if iou is None:
+            iou = self.iou
+        if conf is None:
+            conf = self.conf
+        if cache_dict is None:
+            cache_dict = {}
+        return {model: self._cached_stream(video_file, model, iou, conf, cache_dict.get(model), start_frame)
+                if model in cache_dict or start_frame > 0
+                else self.get_predict_model(model).predict(source=video_file, stream=True, show=False,
+                                                           iou=iou, conf=conf, device=self.device,
+                                                           classes=0 if model == 2 else None,
+                                                           verbose=False)
+                for model in self._model_list([mode])}
+
+    def _cached_stream(self, video_file: str, model: int, iou: float, conf: float,
+                       cache: Optional[Detection_Cache], start_frame: int = 0) -> Iterator[Results]:
+        """
+        使用识别结果缓存逐帧预测视频文件的生成器，视为内部函数，不提供外部接口
+        缓存非空或从视频中间开始时逐帧读取视频帧并通过_cached_predict预测，只对没有缓存的视频帧进行推理
+        缓存为空时以_detect_cache_conf流式预测整个视频，缓存每个视频帧的结果后再过滤
+
+        Parameters
+        ----------
+        video_file : str
+            要处理视频的指定绝对路径
+        model : int
+            模型的模式
+        iou : float
+            指定衡量预测边界框与真实边界框之间重叠程度
+        conf : float
+            模型对识别设置的置信度阈值
+        cache : Optional[Detection_Cache]
+            该模型的识别结果缓存，为None时不使用缓存
+        start_frame : int
+            开始预测的视频帧索引，默认为0
+
+        Yields
+        ------
+        result : Results
+            过滤后的单个视频帧的识别结果
+        """
+        frame_index = start_frame
+        if cache is None or len(cache) > 0 or start_frame > 0:
+            cache_dict = {} if cache is None else {model: cache}
+            cap = cv.VideoCapture(video_file)
+            cap.set(cv.CAP_PROP_POS_FRAMES, start_frame)
+            try:
+                while True:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    yield self._cached_predict(frame, frame_index, model, iou, conf, cache_dict)[0]
+                    frame_index += 1
+            finally:
+                cap.release()
+            return
+        for result in self.get_predict_model(model).predict(source=video_file, stream=True, show=False,
+                                                            iou=iou, conf=self._detect_cache_conf,
+                                                            device=self.device,
+                                                            classes=0 if model == 2 else None,
+                                                            verbose=False):
+            cache.names = result.names
+            cache.put(frame_index, result.boxes.data.cpu().numpy())
+            yield self._cached_result(result.orig_img, frame_index, conf, cache)
+            frame_index += 1
+
+    def _cached_predict(self, frame: np.ndarray, frame_index: int, model: int, iou: float, conf: float,
+                        cache_dict: Dict[int, Detection_Cache]) -> Optional[list[Results]]:
+        """
+        使用识别结果缓存预测单个视频帧，视为内部函数，不提供外部接口
+        视频帧已被缓存时直接过滤缓存的结果，否则以_detect_cache_conf预测并缓存后再过滤，没有该模型的缓存时直接预测
+
+        Parameters
+        ----------
+        frame : np.ndarray
+            要预测的视频帧
+        frame_index : int
+            视频帧在视频中的索引
+        model : int
+            模型的模式
+        iou : float
+            指定衡量预测边界框与真实边界框之间重叠程度
+        conf : float
+            模型对识别设置的置信度阈值
+        cache_dict : Dict[int, Detection_Cache]
+            各模型的识别结果缓存，由_open_detect_cache获得
+
+        Returns
+        -------
+        result_list : Optional[list[Results]]
+            只包括一个Results的列表，与_one_model_predict的返回值相同
+        """
+        cache = cache_dict.get(model)
+        if cache is None:
+            return self._one_model_predict(frame, model, False, iou, conf)
+        if cache.get(frame_index) is None:
+            result_list = self._one_model_predict(frame, model, False, iou, self._detect_cache_conf)
+            if result_list is None:
+                return None
+            cache.names = result_list[0].names
+            cache.put(frame_index, result_list[0].boxes.data.cpu().numpy())
+        return [self._cached_result(frame, frame_index, conf, cache)]
+
+    @staticmethod
+    def _cached_result(frame: np.ndarray, frame_index: int, conf: float, cache: Detection_Cache) -> Results:
+        """由缓存中置信度不低于conf的识别框重建视频帧的识别结果，视为内部函数，不提供外部接口"""
+        return Results(frame, path="", names=cache.names, boxes=torch.from_numpy(cache.get(frame_index, conf)))
+
+    def _detect_cache_path(self, video_file: str, model: int, iou: float) -> str:
+        """
+        获得模型对视频文件的识别结果缓存文件的路径，视为内部函数，不提供外部接口
+        文件名由视频文件的路径、大小和修改时间的哈希值，模型权重的哈希值，实际使用的模型格式，imgsz和iou组成
+        其中任意一项改变后都会使用新的缓存文件
+
+        Parameters
+        ----------
+        video_file : str
+            视频文件的绝对路径
+        model : int
+            模型的模式
+        iou : float
+            指定衡量预测边界框与真实边界框之间重叠程度
+
+        Returns
+        -------
+        cache_path : str
+            缓存文件的绝对路径
+        """
+        stat = os.stat(video_file)
+        video_hash = hashlib.sha256(f"{os.path.abspath(video_file)}|{stat.st_size}|{stat.st_mtime_ns}"
+                                    .encode("utf-8")).hexdigest()[:16]
+        video_name = os.path.splitext(os.path.basename(video_file))[0]
+        weight_path = self.model_mode_dict[model]
+        # 量化模型和不同后端的识别结果略有差异，分别缓存
+        model_format = self.backend
+        if model in self.int8_modes and os.path.exists(self._int8_model_path(weight_path, self.int8_method)):
+            model_format = f"int8_{self.int8_method}"
+        return os.path.join(self.root_dir, self._detect_cache_dir,
+                            f"{video_name}_{video_hash}_{self._weight_cache_name(weight_path)}_{model_format}"
+                            f"_{self.imgsz}_{iou}.npz")
+
+    def _open_detect_cache(self, video_file: str, mode: int, iou: float = None) -> Dict[int, Detection_Cache]:
+        """
+        打开模式对应的各模型对视频文件的识别结果缓存，视为内部函数，不提供外部接口
+
+        Parameters
+        ----------
+        video_file : str
+            视频文件的绝对路径
+        mode : int
+            指定的模式，0表示使用全部模型
+        iou : float
+            指定衡量预测边界框与真实边界框之间重叠程度，未指定(为None)时使用默认值
+
+        Returns
+        -------
+        cache_dict : Dict[int, Detection_Cache]
+            key为模型的模式，value为已读取缓存文件的识别结果缓存，不使用缓存时为空
+        """
+        if not self.detect_cache:
+            return {}
+        if iou is None:
+            iou = self.iou
+        cache_dict = {}
+        for model in self._model_list([mode]):
+            cache = Detection_Cache(self._detect_cache_path(video_file, model, iou))
+            if cache.load():
+                self.info_logger.log_write(f"Load {len(cache)} cached frames of model {model} "
+                                           f"from {cache.cache_path}", Log_Processor.INFO)
+            cache_dict[model] = cache
+        return cache_dict
+
+    def _close_detect_cache(self, cache_dict: Dict[int, Detection_Cache], frame_count: int = None,
+                            complete: bool = False):
+        """
+        保存各模型的识别结果缓存，视为内部函数，不提供外部接口
+
+        Parameters
+        ----------
+        cache_dict : Dict[int, Detection_Cache]
+            各模型的识别结果缓存，由_open_detect_cache获得
+        frame_count : int
+            识别完整个视频后得到的视频总帧数，未指定(为None)时说明没有识别完整个视频
+        complete : bool
+            是否已经缓存了整个视频的全部视频帧，为True时以已缓存的视频帧数量作为视频总帧数
+        """
+        for cache in cache_dict.values():
+            if complete:
+                frame_count = len(cache)
+            if frame_count is not None:
+                cache.frame_count = frame_count
+            try:
+                cache.save()
+            except OSError as e:
+                # 缓存保存失败不影响识别结果
+                error_type = type(e).__name__
+                self.error_logger.logger.error("An error of type %s occurred when saving %s: %s",
+                                               error_type, cache.cache_path, str(e), exc_info=True)
 
     def make_dir(self, dir_path: str):
         """
@@ -1009,6 +2943,47 @@ class Video_Detector(object):
             logging.error("Detailed traceback information:", exc_info=True)
 
 
+def run_video_detector(detector_spec: Dict[str, Any], method: str, *args, **kwargs) -> None:
+    """
+    识别进程的入口函数，作为multiprocessing.Process的target使用
+    只传递检测器的配置，在子进程中重新创建检测器并调用指定的方法，避免序列化整个检测器对象
+
+    Parameters
+    ----------
+    detector_spec : Dict[str, Any]
+        Video_Detector.to_spec获得的配置
+    method : str
+        要调用的方法名，可选"detect"、"detect_multi"、"re_detect"和"serve"
+    args & kwargs
+        传递给该方法的参数
+    """
+    if method not in Video_Detector._spec_method_list:
+        raise ValueError(f"The method {method} can not be run in the detect process!")
+    detector = Video_Detector.from_spec(detector_spec)
+    getattr(detector, method)(*args, **kwargs)
+
+
+# 进程池中各进程共享的ui界面停止事件，由_init_re_detect_worker在进程创建时设置
+_re_detect_stop_event = None
+# 进程池中各进程的检测器，由初始化函数创建，该进程的全部任务共用，模型只加载一次
+_re_detect_detector = None
+
+def _init_re_detect_worker(detector_spec: Dict[str, Any], stop_event, thread_count: int):
+    """进程池中各进程的初始化函数，根据配置创建检测器，记录停止事件并限制推理线程数，视为内部函数，不提供外部接口"""
+    global _re_detect_stop_event, _re_detect_detector
+    _re_detect_stop_event = stop_event
+    torch.set_num_threads(thread_count)
+    _re_detect_detector = Video_Detector.from_spec(detector_spec)
+
+def _run_re_detect_chunks(chunk_list: List[Tuple[int, Optional[int], str]], video_file: str, pre_roll: int,
+                          mode: int, iou: float, conf: float, use_dir: str
+                          ) -> List[Tuple[List[int], List[Tuple[int, int]], Dict]]:
+    """在进程池的进程中用该进程的检测器依次重新识别多个分块，按顺序返回各分块的结果，视为内部函数，不提供外部接口"""
+    return [_re_detect_detector._re_detect_chunk(video_file, start_frame, end_frame, pre_roll, mode, iou, conf,
+                                                 use_dir, chunk_path, stop_event=_re_detect_stop_event)
+            for start_frame, end_frame, chunk_path in chunk_list]
+
+
 ## 模块单元测试部分，调用部分函数方法，保证类内所有方法均已被调用 ##
 if __name__ == '__main__':
 
@@ -14,12 +14,26 @@ from PyCameraList.camera_device import list_video_devices
 from home_security_surveillance.File_process import *
 # 引入video_capture_process库
 from home_security_surveillance.Video_process.video_capture_process import *
+# 引入frame_ring_buffer库
+from home_security_surveillance.Video_process.frame_ring_buffer import *
+# 引入frame_scheduler库
+from home_security_surveillance.Video_process.frame_scheduler import *
+# 引入video_capture_reader库
+from home_security_surveillance.Video_process.video_capture_reader import *
+# 引入nvd_health_prober库
+from home_security_surveillance.Video_process.nvd_health_prober import *
 # 引入video_detect库
 from home_security_surveillance.Video_process.video_detect import *
+# 引入detector_service库
+from home_security_surveillance.Video_process.detector_service import *
 # 引入Exception_process库
 from home_security_surveillance.Exception_process import *
 # 引入synchronize库的Event对象
 from multiprocessing import synchronize
+# 引入queue库，用queue.Empty判断等待视频帧超时
+import queue
+# 引入random库，用于重连间隔的随机抖动
+import random
 
 __all__ = ["Video_Processor"]
 
@@ -32,12 +46,19 @@ class Video_Processor(object):
     Parameters
     ----------
     url_capture_time_out : int
-        opencv在捕捉网络摄像头url视频流时的超时时间设置，各协议统一，且应小于opencv已设置的时间
+        opencv在捕捉网络摄像头url视频流时打开和读取的超时时间设置，各协议统一
         此处最大为15s，默认值为10s，最大请尽量小于15s
     event: synchronize.Event
         ui界面创建对象时传递的事件，在该类传递事件内标记设置为False时结束任务退出进程，默认为None
     return_value : multiprocessing.Value
         ui界面创建对象时传递的共享内存变量，默认为None
+    frame_buffer_size : int
+        传递给识别进程的视频帧环形缓冲区的槽位数量，默认为16
+    frame_buffer_policy : str
+        视频帧环形缓冲区已满时的处理策略，默认为"drop_oldest"，即最新优先
+        可选"drop_oldest"、"drop_newest"和"block"，含义与Frame_Ring_Buffer的policy相同
+    detector_service : Detector_Service
+        ui界面创建的常驻识别服务，默认为None，此时每次识别都创建新的识别进程
 
     Attributes
     ----------
@@ -49,8 +70,14 @@ class Video_Processor(object):
     create_time : str
         创建该对象的时间，字符串类型，格式与log.py中Log_Processor的strftime_all相同
     url_capture_time_out : int
-        opencv在捕捉网络摄像头url视频流时的超时时间设置，各协议统一，且应小于opencv已设置的时间
+        opencv在捕捉网络摄像头url视频流时打开和读取的超时时间设置，各协议统一
         此处最大为15s，默认值为10s，最大请尽量小于15s
+    frame_buffer_size : int
+        传递给识别进程的视频帧环形缓冲区的槽位数量
+    frame_buffer_policy : str
+        视频帧环形缓冲区已满时的处理策略
+    detector_service : Optional[Detector_Service]
+        常驻识别服务，不为None且已就绪时，本地和网络视频设备连接到识别服务进行识别，而不是创建新的识别进程
     config_data : dict
         配置文件的字典格式，每个元素为一个键值对，键为配置文件的属性名，值为配置文件的属性值
 
@@ -62,6 +89,8 @@ class Video_Processor(object):
         日志处理器对象的一个实例，用于记录该类活动过程中的运行信息和错误信息
     nvd_processor : Nvd_processor
         网络视频设备处理器对象的一个实例，用于处理网络应用设备的加载、访问和修改
+    nvd_health_prober : Nvd_Health_Prober
+        网络视频设备健康探测器的一个实例，缓存文件与网络摄像头配置文件位于同一目录下
     hs_processor : History_video_processor
         历史视频处理器对象的一个实例，用于处理对历史视频的加载、访问和识别
     video_detector : Video_Detector
@@ -76,6 +105,7 @@ class Video_Processor(object):
     -----
     视频流的来源包括本地视频设备(如USB摄像头)，网络视频设备（如ip摄像头）和历史监控视频三种
     传入video_type=1对应本地监视器设备，video_type=2对应网络视频设备，video_type=3对应历史监控视频
+    多个本地和网络视频设备可以通过load_multi_video_device同时监控，共用一个识别进程
     Examples
     --------
     """
@@ -83,9 +113,33 @@ class Video_Processor(object):
     _video_suffix = "avi"
     # 可使用的最大分辨率
     _video_resolution = (1280, 720)
+    # 视频帧环形缓冲区使用阻塞策略时，放入视频帧的最长等待时间
+    _frame_buffer_timeout = 15
+    # 视频帧环形缓冲区统计信息写入日志的时间间隔
+    _frame_buffer_log_interval = 60
+    # 可视化进程等待视频帧的最长时间，超过后认为视频流处理器已经停止
+    _frame_wait_time_out = 15
+    # 单次等待读取线程的新视频帧的最长时间，超时后检查ui界面的关闭事件并继续等待
+    _capture_read_time_out = 1
+    # 读取线程超过该时间仍没有新的视频帧时，认为视频流读取失败
+    _capture_stall_time_out = 15
+    # 停止读取线程时等待其结束的最长时间
+    _capture_stop_time_out = 5
+    # ui界面停止时等待重新识别进程保存检查点并退出的最长时间，超时后强制终止
+    _re_detect_stop_time_out = 30
+    # 网络视频流断开后重连的初始间隔、最大间隔和最长重连时间，单位为秒
+    _reconnect_base_delay = 0.5
+    _reconnect_max_delay = 30
+    _reconnect_max_time = 300
+    # 网络视频设备健康状态缓存文件名的后缀
+    _nvd_health_cache_suffix = "_health.json"
+    # 创建录像分段的锁，多个视频设备同时保存时，保证历史视频的索引不会重复
+    _video_segment_lock = threading.Lock()
 
     def __init__(self, url_capture_time_out: int = 10,
-                 event: synchronize.Event = None, return_value: multiprocessing.Value = None):
+                 event: synchronize.Event = None, return_value: multiprocessing.Value = None,
+                 frame_buffer_size: int = 16, frame_buffer_policy: str = "drop_oldest",
+                 detector_service: Detector_Service = None):
         """初始化Video_processor对象"""
 
         # 获得格式化的当前时间，作为该类的创建时间
@@ -96,6 +150,11 @@ class Video_Processor(object):
         # 记录共享变量和事件
         self.ui_event = event
         self.ui_value = return_value
+        # 记录视频帧环形缓冲区的设置
+        self.frame_buffer_size = frame_buffer_size
+        self.frame_buffer_policy = frame_buffer_policy
+        # 记录常驻识别服务
+        self.detector_service = detector_service
         # 加载json格式的配置文件
         try:
             self.config_data, invalid_config_data = load_config(relative=False)
@@ -162,6 +221,268 @@ class Video_Processor(object):
         # 创建的日志处理器的处理文件名为该类的创建时间
         return Log_Processor(log_dir, self.create_time + ".log", level)
 
+    def _stop_video_detect(self, frame_queue: Frame_Ring_Buffer,
+                           video_detect_process: Optional[multiprocessing.Process]):
+        """
+        结束识别进程并释放视频帧环形缓冲区
+
+        Parameters
+        ----------
+        frame_queue : Frame_Ring_Buffer
+            传给识别进程的视频帧环形缓冲区
+        video_detect_process : Optional[multiprocessing.Process]
+            执行识别功能的进程，为None时说明使用的是多个视频设备共用的识别进程或常驻识别服务
+            此时只关闭缓冲区以结束该视频设备的识别，识别进程和共享内存由load_multi_video_device负责释放
+            使用常驻识别服务时还会解除连接，释放其槽位，识别服务继续运行
+        """
+
+        # 由于没有终止视频帧None，手动关闭缓冲区结束识别进程，正在等待视频帧的识别进程会被立即唤醒
+        frame_queue.shutdown()
+        if video_detect_process is None:
+            if self.detector_service is not None and self.detector_service.owns(frame_queue):
+                self.detector_service.detach(frame_queue)
+                self.logger.log_write("Detach from the detector service", Log_Processor.INFO)
+            return
+        # 等待识别进程处理完结束标志，再释放共享内存
+        video_detect_process.join()
+        self._log_frame_buffer_stats(frame_queue)
+        frame_queue.close()
+        frame_queue.unlink()
+        self.logger.log_write("Stop running video detect process", Log_Processor.INFO)
+
+    def _attach_detector_service(self, video_detect_type: int, video_detect_sensitivity: int,
+                                 roi_list: List[List[List[float]]] = None) \
+            -> Tuple[Optional[Frame_Ring_Buffer], Optional[multiprocessing.Queue]]:
+        """
+        连接到常驻识别服务，获得分配的视频帧环形缓冲区和结果队列
+
+        Parameters
+        ----------
+        video_detect_type : int
+            识别的类型，0为全部监测，1为只监测火焰，2为只监测人，3为检测异常情况
+        video_detect_sensitivity : int
+            识别的敏感度，0为低敏感度，1为高敏感度
+        roi_list : List[List[List[float]]]
+            感兴趣区域的多边形列表，未指定(为None)时识别整个视频帧
+
+        Returns
+        -------
+        frame_queue : Optional[Frame_Ring_Buffer]
+            分配的视频帧环形缓冲区，没有识别服务、识别服务未就绪或连接失败时为None
+        result_queue : Optional[multiprocessing.Queue]
+            分配的结果队列，连接失败时为None
+        """
+        if self.detector_service is None or not self.detector_service.is_ready():
+            return None, None
+        slot_queue = self.detector_service.attach(video_detect_type, video_detect_sensitivity, roi_list)
+        if slot_queue is None:
+            self.logger.log_write("Fail to attach to the detector service, start a new video detect process",
+                                  Log_Processor.WARNING)
+            return None, None
+        self.logger.log_write("Attach to the detector service", Log_Processor.INFO)
+        return slot_queue
+
+    def _wait_video_detect_ready(self, ready_event: synchronize.Event,
+                                 video_detect_process: multiprocessing.Process) -> bool:
+        """
+        等待识别进程完成模型的加载和预热，避免在此期间向缓冲区送入视频帧，使识别开始时的视频帧被延迟处理
+        等待期间ui界面触发关闭事件时立即返回，由之后的循环负责退出
+
+        Parameters
+        ----------
+        ready_event : synchronize.Event
+            识别进程完成预热后设置的事件
+        video_detect_process : multiprocessing.Process
+            执行识别功能的进程
+
+        Returns
+        -------
+        flag : bool
+            识别进程是否可用，识别进程在完成预热前意外结束时返回False
+        """
+        start_time = time.time()
+        while not ready_event.wait(self._capture_read_time_out):
+            if self.ui_event.is_set():
+                return True
+            if not video_detect_process.is_alive():
+                self.logger.log_write("The video detect process exited before it was ready.",
+                                      Log_Processor.ERROR)
+                return False
+        self.logger.log_write(f"The video detect process is ready after {time.time() - start_time:.2f}s",
+                              Log_Processor.INFO)
+        return True
+
+    def _open_video_segment(self, fps: float, width: int, height: int) -> Optional[cv.VideoWriter]:
+        """
+        根据当前时间在历史视频目录中创建一个新的录像分段文件
+
+        Parameters
+        ----------
+        fps : float
+            录像的帧率
+        width : int
+            录像的宽度
+        height : int
+            录像的高度
+
+        Returns
+        -------
+        video_out : Optional[cv.VideoWriter]
+            打开成功的VideoWriter对象，创建目录或打开视频文件失败时返回None
+        """
+
+        # 根据当前时间生成文件路径并更新历史视频处理器中的hv_dict(在函数中完成)
+        try:
+            with self._video_segment_lock:
+                save_path = self.hs_processor.generate_video_file(
+                    datetime.datetime.now().strftime(Log_Processor.strftime_all))
+        # 如果目录已存在且再次创建，或者路径有错误
+        except OSError as e:
+            self.logger.log_write(f"Fail to create save video dir: " + e.strerror,
+                                  Log_Processor.ERROR)
+            return None
+
+        # 声明编码保存方式
+        fourcc = cv.VideoWriter.fourcc(*"DIVX")
+        # 利用VideoWriter保存视频，文件路径为生成路径，帧率和分辨率统一为限制后的视频大小和帧率，彩色模式
+        video_out = cv.VideoWriter(save_path, fourcc, fps, (width, height), True)
+        # 如果打开成功，日志记录
+        if video_out.isOpened():
+            self.logger.log_write(f"Create save video file: {save_path}",
+                                  Log_Processor.INFO)
+            return video_out
+        # 如果打开失败，删除历史视频处理器中的hv_dict信息
+        self.hs_processor.delete_new_video_file(save_path)
+        self.logger.log_write(f"Fail to create save video file: {save_path}",
+                              Log_Processor.ERROR)
+        return None
+
+    def _apply_network_video_setting(self, video_stream: cv.VideoCapture) -> Tuple[int, int, int, int, int, int]:
+        """
+        将网络视频流的分辨率限制为720p，帧率限制为30，每次打开和重连视频流后都需要调用
+        此处的限制只能对能够修改对应效果的摄像头生效，否则视频帧需要在读取后缩放为返回的大小
+
+        Parameters
+        ----------
+        video_stream : cv.VideoCapture
+            已经打开的网络视频流
+
+        Returns
+        -------
+        setting : Tuple[int, int, int, int, int, int]
+            依次为视频流原始的宽度、高度和帧率，以及限制后视频帧应有的宽度、高度和帧率
+        """
+        real_width = int(video_stream.get(cv.CAP_PROP_FRAME_WIDTH))
+        real_height = int(video_stream.get(cv.CAP_PROP_FRAME_HEIGHT))
+        real_fps = int(video_stream.get(cv.CAP_PROP_FPS))
+
+        # 横屏和竖屏的分辨率上限
+        if real_width > real_height:
+            max_width, max_height = self._video_resolution[0], self._video_resolution[1]
+        else:
+            max_width, max_height = self._video_resolution[1], self._video_resolution[0]
+        if real_width > max_width or real_height > max_height:
+            video_stream.set(cv.CAP_PROP_FRAME_WIDTH, max_width)
+            video_stream.set(cv.CAP_PROP_FRAME_HEIGHT, max_height)
+            width = int(video_stream.get(cv.CAP_PROP_FRAME_WIDTH))
+            height = int(video_stream.get(cv.CAP_PROP_FRAME_HEIGHT))
+            # 摄像头不支持修改分辨率时，读取后缩放为上限
+            if width > max_width or height > max_height:
+                width, height = max_width, max_height
+        else:
+            width, height = real_width, real_height
+
+        # 帧率限制
+        # fps为90000表示时钟频率，不做处理
+        if real_fps != 90000 and real_fps > 30:
+            video_stream.set(cv.CAP_PROP_FPS, 30)
+            fps = int(video_stream.get(cv.CAP_PROP_FPS))
+        elif real_fps == 90000:
+            fps = 30
+        else:
+            fps = real_fps
+        return real_width, real_height, real_fps, width, height, fps
+
+    def _reconnect_network_video_stream(self, video_sourse: str,
+                                        frame_queue: Optional[Frame_Ring_Buffer],
+                                        vis_frame_queue: Optional[multiprocessing.Queue],
+                                        last_frame: Optional[np.ndarray]) -> Optional[cv.VideoCapture]:
+        """
+        网络视频流断开后，以指数退避加随机抖动的间隔原地重连，等待期间保持识别进程和可视化进程存活
+
+        Parameters
+        ----------
+        video_sourse : str
+            网络视频设备的url地址
+        frame_queue : Optional[Frame_Ring_Buffer]
+            传给识别进程的视频帧环形缓冲区，等待期间刷新其心跳，不识别时为None
+        vis_frame_queue : Optional[multiprocessing.Queue]
+            传给可视化进程的视频帧队列，等待期间重复放入最后一帧，不可视化时为None
+        last_frame : Optional[np.ndarray]
+            断开前的最后一帧
+
+        Returns
+        -------
+        video_stream : Optional[cv.VideoCapture]
+            重连成功时返回打开的视频流，ui界面触发了关闭事件或超过最长重连时间时返回None
+        """
+
+        start_time = time.time()
+        attempt = 0
+        while time.time() - start_time < self._reconnect_max_time:
+            # 指数退避，并在区间[delay / 2, delay]内随机抖动，避免多个设备同时重连
+            delay = min(self._reconnect_max_delay, self._reconnect_base_delay * 2 ** attempt)
+            delay = random.uniform(delay / 2, delay)
+            attempt += 1
+            wait_end_time = time.time() + delay
+            while True:
+                # 保持识别进程和可视化进程存活，避免其等待视频帧超时后退出
+                if frame_queue is not None:
+                    frame_queue.heartbeat()
+                if vis_frame_queue is not None and last_frame is not None:
+                    vis_frame_queue.put(last_frame)
+                remaining_time = wait_end_time - time.time()
+                if remaining_time <= 0:
+                    break
+                # ui界面触发了关闭事件时停止重连
+                if self.ui_event.wait(min(remaining_time, self._capture_read_time_out)):
+                    return None
+
+            # 尝试重新打开视频流
+            video_stream = open_network_video_stream(video_sourse, self.url_capture_time_out)
+            if video_stream is not None:
+                if video_stream.isOpened():
+                    return video_stream
+                video_stream.release()
+            self.logger.log_write(f"Reconnect attempt {attempt} to the network video device "
+                                  f"{video_sourse} failed.",
+                                  Log_Processor.WARNING)
+        return None
+
+    def _log_frame_buffer_stats(self, frame_queue: Frame_Ring_Buffer,
+                                frame_scheduler: Frame_Scheduler = None):
+        """
+        将视频帧环形缓冲区的统计信息写入日志
+
+        Parameters
+        ----------
+        frame_queue : Frame_Ring_Buffer
+            传给识别进程的视频帧环形缓冲区
+        frame_scheduler : Frame_Scheduler
+            决定送入识别进程的视频帧的调度器，不为None时一并记录其统计信息，默认为None
+        """
+        stats = frame_queue.stats()
+        self.logger.log_write(f"Frame buffer ({frame_queue.policy}, {frame_queue.slot_count} slots): "
+                              f"produced {stats['produced']}, consumed {stats['consumed']}, "
+                              f"dropped {stats['dropped']}, queued {stats['queued']}",
+                              Log_Processor.INFO)
+        if frame_scheduler is not None:
+            stats = frame_scheduler.stats()
+            self.logger.log_write(f"Frame scheduler: send rate {stats['send_rate']:.2f} fps, "
+                                  f"consume rate {stats['consume_rate']:.2f} fps, "
+                                  f"sent {stats['sent']}, skipped {stats['skipped']}",
+                                  Log_Processor.INFO)
+
     def load_video_sourse(self):
         """加载视频资源函数"""
 
@@ -197,6 +518,11 @@ class Video_Processor(object):
             self.logger.log_write(f"Successfully loaded network video device",
                                   Log_Processor.INFO)
 
+        # 加载网络视频设备的健康状态缓存，文件名为网络摄像头配置文件名加上_health后缀
+        health_cache_file = os.path.splitext(self.config_data["IP-video-device-file"])[0] + \
+                            self._nvd_health_cache_suffix
+        self.nvd_health_prober = Nvd_Health_Prober(health_cache_file)
+
         # 加载所有历史保存视频视频处理器对象
         self.hs_processor = History_Video_Processor(self.config_data["history-video-directory"],
                                                     self._video_suffix)
@@ -239,7 +565,8 @@ class Video_Processor(object):
                                 flag_save: bool = True,
                                 flag_detect: bool = True,
                                 video_detect_type: int = 1,
-                                video_detect_sensitivity: int = 0
+                                video_detect_sensitivity: int = 0,
+                                detect_frame_queue: Frame_Ring_Buffer = None
                                 ) -> int:
         """
         从本地视频设备利用opencv库加载视频流，根据传入的本地视频设备号来捕捉视频信息
@@ -258,6 +585,9 @@ class Video_Processor(object):
             控制视频流监测的类型，0为全部监测，1为只监测火焰，2为只监测人，3为检测异常情况
         video_detect_sensitivity : int
             控制视频流在监测时的敏感度，0为低敏感度，1为高敏感度
+        detect_frame_queue : Frame_Ring_Buffer
+            多个视频设备共用的识别进程中该设备的视频帧环形缓冲区，默认为None，即创建自己的识别进程
+            不为None时只向其中放入视频帧，识别结果由load_multi_video_device统一处理
         Returns
         --------
         res : int
@@ -271,9 +601,9 @@ class Video_Processor(object):
 
         Notes
         -----
-        为了加速模型识别处理速度，创建一个进程单独执行识别功能，与该进程的通信使用两个多进程队列multiprocessing.Queue
-        一个是frame_queue，用于将捕捉的视频帧在处理后传给识别进程
-        一个是result_queue，用于将识别进程识别到错误的获得的错误类型和置信度返回给该进程
+        为了加速模型识别处理速度，创建一个进程单独执行识别功能，与该进程的通信使用两个跨进程的队列
+        一个是frame_queue，是基于共享内存的环形缓冲区Frame_Ring_Buffer，用于将捕捉的视频帧在处理后无序列化地传给识别进程
+        一个是result_queue，是多进程队列multiprocessing.Queue，用于将识别进程识别到错误的获得的错误类型和置信度返回给该进程
         """
 
         # 检查本地设备是否为空
@@ -328,6 +658,13 @@ class Video_Processor(object):
                     width, height = real_width, real_height
                 if width > self._video_resolution[1] or height > self._video_resolution[0]:
                     flag_resize = 2
+            # 送入识别和可视化的视频帧大小，超过阈值时根据横竖屏重整为阈值
+            if flag_resize == 1:
+                frame_width, frame_height = self._video_resolution[0], self._video_resolution[1]
+            elif flag_resize == 2:
+                frame_width, frame_height = self._video_resolution[1], self._video_resolution[0]
+            else:
+                frame_width, frame_height = int(width), int(height)
             # 帧率限制
             # fps为90000表示时钟频率，不做处理
             if real_fps != 90000 and real_fps > 30:
@@ -356,23 +693,47 @@ class Video_Processor(object):
                                   Log_Processor.INFO)
 
             # 如果需要识别视频，创建保存帧的读取队列和结果队列
-            frame_queue = None
+            # 使用共用的识别进程时，只使用其分配的缓冲区，不创建结果队列和识别进程
+            frame_queue = detect_frame_queue
             result_queue = None
-            if flag_detect:
-                frame_queue = multiprocessing.Queue()
+            frame_scheduler = None
+            video_detect_process = None
+            # 有常驻识别服务时优先连接到识别服务，不需要重新加载模型
+            if flag_detect and frame_queue is None:
+                frame_queue, result_queue = self._attach_detector_service(video_detect_type,
+                                                                          video_detect_sensitivity)
+            if flag_detect and frame_queue is None:
+                frame_queue = Frame_Ring_Buffer(self.frame_buffer_size,
+                                                (self._video_resolution[1], self._video_resolution[0], 3),
+                                                self.frame_buffer_policy)
                 result_queue = multiprocessing.Queue()
+                ready_event = multiprocessing.Event()
                 # 创建进程，传入参数并运行
                 video_detect_process = multiprocessing.Process(
-                    target=self.video_detector.detect,
-                    args=(frame_queue, result_queue, video_detect_type),
-                    kwargs={"sensitivity": video_detect_sensitivity})
+                    target=run_video_detector,
+                    args=(self.video_detector.to_spec(), "detect", frame_queue, result_queue, video_detect_type),
+                    kwargs={"sensitivity": video_detect_sensitivity, "ready_event": ready_event})
                 video_detect_process.start()
                 self.logger.log_write("Start running video detect process",
                                       Log_Processor.INFO)
 
             # 如果需要可视化，创建视频窗口，设置相应参数
+            # opencv的窗口函数不是线程安全的，不在主线程中运行时(如load_multi_video_device)使用可视化进程展示
             Window_name = ""
-            if flag_visibility:
+            vis_frame_queue = None
+            vis_result_queue = None
+            flag_visibility_process = threading.current_thread() is not threading.main_thread()
+            if flag_visibility and flag_visibility_process:
+                vis_frame_queue = multiprocessing.Queue()
+                vis_result_queue = multiprocessing.Queue()
+                video_visibility_process = multiprocessing.Process(
+                    target=self._network_device_visibility,
+                    args=(vis_frame_queue, vis_result_queue, self.local_video_device_list[video_sourse][1],
+                          real_width, real_height))
+                video_visibility_process.start()
+                self.logger.log_write("Start running video visibility process",
+                                      Log_Processor.INFO)
+            elif flag_visibility:
                 # 窗口名
                 Window_name = f"{self.local_video_device_list[video_sourse][1]}"
                 # WINDOW_NORMAL控制窗口可以放缩，WINDOW_KEEPRATIO控制窗口缩放的过程中保持比率
@@ -390,144 +751,142 @@ class Video_Processor(object):
             # 如果需要保存视频，在指定目录处创建视频文件，用于写入视频帧
             video_out = None
             if flag_save:
-                # 根据当前时间生成文件路径并更新历史视频处理器中的hv_dict(在函数中完成)
-                try:
-                    save_path = self.hs_processor.generate_video_file(
-                        datetime.datetime.now().strftime(Log_Processor.strftime_all))
-                # 如果目录已存在且再次创建
-                except FileExistsError as e:
-                    self.logger.log_write(f"Fail to create save video dir: " + e.strerror,
-                                          Log_Processor.ERROR)
-                    self.ui_value.value = -3
-                    return -3
-                # 如果路径有错误
-                except OSError as e:
-                    self.logger.log_write(f"Fail to create save video dir: " + e.strerror,
-                                          Log_Processor.ERROR)
+                video_out = self._open_video_segment(fps, width, height)
+                if video_out is None:
+                    if flag_detect:
+                        self._stop_video_detect(frame_queue, video_detect_process)
                     self.ui_value.value = -3
                     return -3
-                # 无错误则输入视频流至文件中
-                else:
-                    # 声明编码保存方式
-                    fourcc = cv.VideoWriter.fourcc(*"DIVX")
-                    # 利用VideoWriter保存视频，文件路径为生成路径，帧率和分辨率统一为限制后的视频大小和帧率，彩色模式
-                    video_out = cv.VideoWriter(save_path, fourcc, fps, (width, height), True)
-                    # 如果打开成功，日志记录
-                    if video_out.isOpened():
-                        self.logger.log_write(f"Create save video file: {save_path}",
-                                              Log_Processor.INFO)
-                    # 如果打开失败，删除历史视频处理器中的hv_dict信息
-                    else:
-                        self.hs_processor.delete_new_video_file(save_path)
-                        self.logger.log_write(f"Fail to create save video file: {save_path}",
-                                              Log_Processor.ERROR)
-                        self.ui_value.value = -3
-                        return -3
 
-            # 循环部分，用于读取视频
-            # skip用于跳帧
-            skip = 0
-            Warning_thread = None
-            while True:
-                # 如果ui界面触发了关闭事件，退出进程
-                if self.ui_event.is_set():
-                    if flag_save:
-                        video_out.release()
-                    if flag_visibility:
-                        cv.destroyWindow(Window_name)
-                    video_stream.release()
-                    # 由于没有终止视频帧None，手动传输结束识别进程
-                    if flag_detect:
-                        frame_queue.put(None)
-                    break
-
-                success = video_stream.grab()
-                # 如果摄像头读取失败，日志记录，结束运行，释放视频捕捉对象，销毁窗口
-                if not success:
-                    self.logger.log_write(f"Fail to read the video of the local video device " +
-                                          f"{self.local_video_device_list[video_sourse][1]}. " +
-                                          f"Please check the device.",
-                                          Log_Processor.ERROR)
-                    if flag_save:
-                        video_out.release()
-                    if flag_visibility:
-                        cv.destroyWindow(Window_name)
-                    video_stream.release()
-                    # 由于没有终止视频帧None，手动传输结束识别进程
-                    if flag_detect:
-                        frame_queue.put(None)
-                    self.ui_value.value = -2
-                    return -2
-
-                # 跳帧或者视频解码
-                skip += 1
-                skip %= 4
-                if 15 <= fps < 60 and skip % 2 == 1:
-                    continue
-                elif fps >= 60 and skip >= 1:
-                    continue
-                else:
-                    _, frame = video_stream.retrieve()
-
-                # 如果视频帧分辨率大于阈值，根据横竖屏重整为阈值
-                if flag_resize == 1:
-                    frame = cv.resize(frame, (self._video_resolution[0], self._video_resolution[1]),
-                                      interpolation=cv.INTER_LINEAR)
-                elif flag_resize == 2:
-                    frame = cv.resize(frame, (self._video_resolution[1], self._video_resolution[0]),
-                                      interpolation=cv.INTER_LINEAR)
+            # 等待识别进程完成预热后再开始读取视频帧，识别进程不可用时只进行录像和可视化
+            if video_detect_process is not None and \
+                    not self._wait_video_detect_ready(ready_event, video_detect_process):
+                self._stop_video_detect(frame_queue, video_detect_process)
+                flag_detect = False
+            if flag_detect:
+                # 根据识别进程的处理速度决定送入的视频帧，上限为视频流的帧率
+                # 在识别进程就绪后创建，避免把预热时间计入取出速度
+                frame_scheduler = Frame_Scheduler(frame_queue, fps)
 
-                # 识别视频流的操作，放入帧并检查结果
-                if flag_detect:
-                    frame_queue.put(frame)
-                    # 如果结果队列非空，说明出现了错误
-                    if not result_queue.empty():
-                        # 错误类型是一个列表，第一个元素是错误编码，第二个是各错误的置信度
-                        warning_info = result_queue.get()
-                        now_time = datetime.datetime.now().strftime(Log_Processor.strftime_all)
-                        # 创建线程，并用报警器进行处理
-                        Warning_thread = threading.Thread(target=self.warning_processor.warning_process,
-                                                          args=(warning_info[0], now_time, warning_info[1],
-                                                                video_detect_sensitivity))
-                        Warning_thread.start()
-                        self.logger.log_write(f"{now_time} have exception", Log_Processor.WARNING)
+            # 创建并启动读取线程，此后视频捕捉对象只由读取线程持有和访问
+            video_reader = Video_Capture_Reader(video_stream, drop_frames=True)
+            video_reader.start()
 
-                # 可见窗口时的操作
-                if flag_visibility:
-                    # 将当前帧在窗口中展示
-                    cv.imshow(Window_name, frame)
-                    # 按'q'和'ESC'键退出，释放视频捕捉对象，销毁窗口
-                    cv2key = cv.waitKey(1)
-                    if cv2key & 0xFF == ord('q') or cv2key & 0xFF == 27:
-                        cv.destroyWindow(Window_name)
+            # 循环部分，用于读取视频
+            # 上一次记录视频帧环形缓冲区统计信息的时间
+            buffer_log_time = time.time()
+            # 上一次获得视频帧的捕捉时间，用于判断视频流是否停滞
+            last_frame_time = time.time()
+            Warning_thread = None
+            # 无论以何种方式退出循环(包括出现异常)，都在finally中结束识别，释放识别服务的槽位或共享内存
+            try:
+                while True:
+                    # 如果ui界面触发了关闭事件，退出进程
+                    if self.ui_event.is_set():
                         if flag_save:
                             video_out.release()
-                        video_stream.release()
-                        # 由于没有终止视频帧None，手动传输结束识别进程
-                        if flag_detect:
-                            frame_queue.put(None)
+                        if flag_visibility and flag_visibility_process:
+                            vis_frame_queue.put(None)
+                        elif flag_visibility:
+                            cv.destroyWindow(Window_name)
+                        video_reader.stop(self._capture_stop_time_out)
                         break
-                    # # 如果s键按下，则进行图片保存
-                    # elif cv2key == ord('s'):
-                    #     # 记录当前时间
-                    #     now_time = datetime.datetime.now().strftime(Log_Processor.strftime_all)
-                    #     # 写入图片 并命名图片为 图片序号.png
-                    #     cv.imwrite(f"{now_time}.png", frame)
-                    # 点击"x"关闭之后退出
-                    if cv.getWindowProperty(Window_name, cv.WND_PROP_VISIBLE) < 1:
+
+                    # 从读取线程获得最新的视频帧，等待超时且视频流未停滞时继续检查关闭事件
+                    success, frame, frame_time = video_reader.read(self._capture_read_time_out)
+                    if success:
+                        last_frame_time = frame_time
+                    elif not video_reader.finished and \
+                            time.time() - last_frame_time < self._capture_stall_time_out:
+                        continue
+                    # 如果摄像头读取失败或长时间没有新的视频帧，日志记录，结束运行，停止读取线程，销毁窗口
+                    if not success:
+                        self.logger.log_write(f"Fail to read the video of the local video device " +
+                                              f"{self.local_video_device_list[video_sourse][1]}. " +
+                                              f"Please check the device.",
+                                              Log_Processor.ERROR)
                         if flag_save:
                             video_out.release()
-                        video_stream.release()
-                        # 由于没有终止视频帧None，手动传输结束识别进程
-                        if flag_detect:
-                            frame_queue.put(None)
-                        break
+                        if flag_visibility and flag_visibility_process:
+                            vis_frame_queue.put(None)
+                        elif flag_visibility:
+                            cv.destroyWindow(Window_name)
+                        video_reader.stop(self._capture_stop_time_out)
+                        self.ui_value.value = -2
+                        return -2
 
-                # 保存文件时的操作
-                if flag_save:
-                    # 注意要重写图像大小，否则分辨率不一致时会报错
-                    write_frame = cv.resize(frame, (width, height), interpolation=cv.INTER_LINEAR)
-                    video_out.write(write_frame)
+                    # 如果视频帧大小与送入缓冲区的大小不同(摄像头不支持修改分辨率等)，重整为该大小，保证不超过缓冲区槽位
+                    if frame.shape[1] != frame_width or frame.shape[0] != frame_height:
+                        frame = cv.resize(frame, (frame_width, frame_height), interpolation=cv.INTER_LINEAR)
+
+                    # 识别视频流的操作，放入帧并检查结果
+                    # 录像和可视化使用全部视频帧，只有调度器选中的视频帧送入识别进程
+                    if flag_detect:
+                        # 放入视频帧，缓冲区已满时按处理策略丢弃视频帧并计数
+                        if frame_scheduler.should_send():
+                            frame_queue.put(frame, timeout=self._frame_buffer_timeout, timestamp=frame_time)
+                        # 定期记录缓冲区和调度器的统计信息
+                        if time.time() - buffer_log_time >= self._frame_buffer_log_interval:
+                            buffer_log_time = time.time()
+                            self._log_frame_buffer_stats(frame_queue, frame_scheduler)
+                        # 如果结果队列非空，说明出现了错误
+                        if result_queue is not None and not result_queue.empty():
+                            # 错误类型是一个列表，第一个元素是错误编码，第二个是各错误的置信度
+                            warning_info = result_queue.get()
+                            now_time = datetime.datetime.now().strftime(Log_Processor.strftime_all)
+                            # 创建线程，并用报警器进行处理
+                            Warning_thread = threading.Thread(target=self.warning_processor.warning_process,
+                                                              args=(warning_info[0], now_time, warning_info[1],
+                                                                    video_detect_sensitivity))
+                            Warning_thread.start()
+                            self.logger.log_write(f"{now_time} have exception", Log_Processor.WARNING)
+
+                    # 使用可视化进程时放入视频帧
+                    if flag_visibility and flag_visibility_process:
+                        vis_frame_queue.put(frame)
+                        # 如果非空，说明有结果返回，说明对方终止了运行，此处也需要终止
+                        if not vis_result_queue.empty():
+                            # 如果返回False，说明是超时
+                            if not vis_result_queue.get():
+                                self.logger.log_write("video visibility process timing out.", Log_Processor.ERROR)
+                            if flag_save:
+                                video_out.release()
+                            video_reader.stop(self._capture_stop_time_out)
+                            break
+                    # 可见窗口时的操作
+                    elif flag_visibility:
+                        # 将当前帧在窗口中展示
+                        cv.imshow(Window_name, frame)
+                        # 按'q'和'ESC'键退出，释放视频捕捉对象，销毁窗口
+                        cv2key = cv.waitKey(1)
+                        if cv2key & 0xFF == ord('q') or cv2key & 0xFF == 27:
+                            cv.destroyWindow(Window_name)
+                            if flag_save:
+                                video_out.release()
+                            video_reader.stop(self._capture_stop_time_out)
+                            break
+                        # # 如果s键按下，则进行图片保存
+                        # elif cv2key == ord('s'):
+                        #     # 记录当前时间
+                        #     now_time = datetime.datetime.now().strftime(Log_Processor.strftime_all)
+                        #     # 写入图片 并命名图片为 图片序号.png
+                        #     cv.imwrite(f"{now_time}.png", frame)
+                        # 点击"x"关闭之后退出
+                        if cv.getWindowProperty(Window_name, cv.WND_PROP_VISIBLE) < 1:
+                            if flag_save:
+                                video_out.release()
+                            video_reader.stop(self._capture_stop_time_out)
+                            break
+
+                    # 保存文件时的操作
+                    if flag_save:
+                        # 注意要重写图像大小，否则分辨率不一致时会报错
+                        write_frame = cv.resize(frame, (width, height), interpolation=cv.INTER_LINEAR)
+                        video_out.write(write_frame)
+            finally:
+                # 由于没有终止视频帧None，手动传输结束识别进程
+                if flag_detect:
+                    self._stop_video_detect(frame_queue, video_detect_process)
 
         # 打开失败则输出错误错误到日志文件中
         else:
@@ -551,6 +910,7 @@ class Video_Processor(object):
                                    real_width: int, real_height: int):
         """
         网络ip摄像头使用rtsp格式监控时会有大幅度的速度降低，此处使用新进程创建窗口
+        本地视频设备不在主线程中读取时也使用该进程展示，因为opencv的窗口函数不是线程安全的
         Parameters
         ----------
         vis_frame_queue : multiprocessing.Queue
@@ -558,7 +918,7 @@ class Video_Processor(object):
         vis_result_queue: multiprocessing.Queue
             返回视频帧处理结果队列
         video_sourse : Union[int, str]
-            传入的ip或者url字符串，或者是已存储url的索引值
+            传入的ip或者url字符串，或者是已存储url的索引值，本地视频设备为其名称，用作窗口名
         """
         # 窗口名
         Window_name = f"{video_sourse}"
@@ -574,74 +934,54 @@ class Video_Processor(object):
         else:
             cv.resizeWindow(Window_name, 720, 720)
 
-        # 获得当前时间，记录是否等待
-        flag_wait = False
-        start_wait_time = time.time()
         # 主循环
         while True:
-            # 判断接收视频帧队列是否为空
-            if not vis_frame_queue.empty():
-                # 非空，重置等待标志，并获得每一帧进行处理
-                if flag_wait:
-                    flag_wait = False
-                frame = vis_frame_queue.get()
-
-                # 如果不是None
-                if frame is not None:
-                    # 将当前帧在窗口中展示
-                    cv.imshow(Window_name, frame)
-                    # 按'q'和'ESC'键退出，释放视频捕捉对象，销毁窗口
-                    cv2key = cv.waitKey(1)
-                    if cv2key & 0xFF == ord('q') or cv2key & 0xFF == 27:
-                        for i in range(vis_frame_queue.qsize()):
-                            vis_frame_queue.get()
-                        cv.destroyWindow(Window_name)
-                        vis_result_queue.put(True)
-                        vis_result_queue.close()
-                        vis_result_queue.join_thread()
-                        return
-                    # # 如果s键按下，则进行图片保存
-                    # elif cv2key == ord('s'):
-                    #     # 记录当前时间
-                    #     now_time = datetime.datetime.now().strftime(Log_Processor.strftime_all)
-                    #     # 写入图片 并命名图片为 图片序号.png
-                    #     cv.imwrite(f"{now_time}.png", frame)
-                    # 点击"x"关闭之后退出
-                    if cv.getWindowProperty(Window_name, cv.WND_PROP_VISIBLE) < 1:
-                        for i in range(vis_frame_queue.qsize()):
-                            vis_frame_queue.get()
-                        vis_result_queue.put(True)
-                        vis_result_queue.close()
-                        vis_result_queue.join_thread()
-                        return
-
-                # 如果为None，说明读取结束
-                else:
+            # 在接收视频帧队列上阻塞等待视频帧，空闲时不占用CPU
+            try:
+                frame = vis_frame_queue.get(timeout=Video_Processor._frame_wait_time_out)
+            # 如果等待的时间超过了15s，说明可视化超时等待，结束运行
+            except queue.Empty:
+                # 为返回视频帧处理结果队列传入结束运行帧，关闭队列，等待发送结束
+                vis_result_queue.put(False)
+                vis_result_queue.close()
+                vis_result_queue.join_thread()
+                return
+
+            # 如果不是None
+            if frame is not None:
+                # 将当前帧在窗口中展示
+                cv.imshow(Window_name, frame)
+                # 按'q'和'ESC'键退出，释放视频捕捉对象，销毁窗口
+                cv2key = cv.waitKey(1)
+                if cv2key & 0xFF == ord('q') or cv2key & 0xFF == 27:
                     for i in range(vis_frame_queue.qsize()):
                         vis_frame_queue.get()
                     cv.destroyWindow(Window_name)
+                    vis_result_queue.put(True)
+                    vis_result_queue.close()
+                    vis_result_queue.join_thread()
+                    return
+                # # 如果s键按下，则进行图片保存
+                # elif cv2key == ord('s'):
+                #     # 记录当前时间
+                #     now_time = datetime.datetime.now().strftime(Log_Processor.strftime_all)
+                #     # 写入图片 并命名图片为 图片序号.png
+                #     cv.imwrite(f"{now_time}.png", frame)
+                # 点击"x"关闭之后退出
+                if cv.getWindowProperty(Window_name, cv.WND_PROP_VISIBLE) < 1:
+                    for i in range(vis_frame_queue.qsize()):
+                        vis_frame_queue.get()
+                    vis_result_queue.put(True)
+                    vis_result_queue.close()
+                    vis_result_queue.join_thread()
                     return
 
-            # 接收视频帧队列为空
+            # 如果为None，说明读取结束
             else:
-                # 如果此前未进入等待状态，开始等待，并计时
-                if not flag_wait:
-                    flag_wait = True
-                    start_wait_time = time.time()
-                    continue
-                # 如果此前进入了等待状态，判断等待时间是否超过了15s
-                else:
-                    # 如果超过了，说明可视化超时等待，结束运行
-                    if time.time() - start_wait_time >= 15:
-                        # 清空过程中传入队列的视频帧并关闭队列
-                        for i in range(vis_frame_queue.qsize()):
-                            vis_frame_queue.get()
-                        vis_result_queue.close()
-                        # 为返回视频帧处理结果队列传入结束运行帧，关闭队列，等待发送结束
-                        vis_result_queue.put(False)
-                        vis_result_queue.close()
-                        vis_result_queue.join_thread()
-                        return
+                for i in range(vis_frame_queue.qsize()):
+                    vis_frame_queue.get()
+                cv.destroyWindow(Window_name)
+                return
 
     def load_network_video_device(self, video_sourse: Union[int, str] = 0,
                                   flag_visibility: bool = True,
@@ -650,6 +990,7 @@ class Video_Processor(object):
                                   video_detect_type: int = 1,
                                   video_detect_sensitivity: int = 0,
                                   video_protocol_type: str = "RTSP",
+                                  detect_frame_queue: Frame_Ring_Buffer = None
                                   ) -> int:
         """
         从网络视频设备利用opencv库加载视频流，根据传入的url、ip或者已存储url的索引值来捕捉视频信息
@@ -670,6 +1011,9 @@ class Video_Processor(object):
             控制视频流在监测时的敏感度，0为低敏感度，1为高敏感度
         video_protocol_type : str
             读取视频流时网络视频设备使用的传输协议，默认为RSTP
+        detect_frame_queue : Frame_Ring_Buffer
+            多个视频设备共用的识别进程中该设备的视频帧环形缓冲区，默认为None，即创建自己的识别进程
+            不为None时只向其中放入视频帧，识别结果由load_multi_video_device统一处理
 
         Returns
         --------
@@ -677,11 +1021,11 @@ class Video_Processor(object):
             返回一个整型，每个值对应一个错误类型或者正确类型
             0则说明读取、展示和保存成功
             -1则说明打开摄像头失败
-            -2则说明读取摄像头下一帧失败或者摄像头意外关闭
+            -2则说明读取摄像头下一帧失败或者摄像头意外关闭，且在最长重连时间内无法重连
             -3则说明指定保存视频文件时，创建目录或打开视频文件失败
             1则说明网络视频设备为空
             2则说明网络设备视频传输协议不支持
-            3则说明无法从url处获得视频流，即VideoCapture超时，与打开摄像头失败不同
+            3则说明url的主机端口不可达，无法从url处获得视频流，与打开摄像头失败不同
         """
 
         # 如果加载的网络视频设备为空，则必须是url或者ip，不能对空字典做索引
@@ -744,81 +1088,26 @@ class Video_Processor(object):
                 type_flag = 4
 
         # 根据视频源创建一个VideoCapture对象，用于从视频源中读取帧
-        # 由于ffmpeg对http和rtsp的url等待时间较长，使用另外一个线程进行处理，以便于缩减等待时间
-
-        # 创建队列读取另一个进程的信息
-        video_stream_queue = multiprocessing.Queue()
-        # 创建进程，url使用video_sourse即可，队列使用创建的队列
-        capture_process = Video_Capture_Process(video_sourse, video_stream_queue)
-        # 运行进程
-        capture_process.start()
-        # 等待进程运行指定的超时时间
-        capture_process.join(self.url_capture_time_out)
-        # 超时时间后，查看进程情况，如果依旧运行，说明url错误，无法获得视频流，进行日志记录并返回错误
-        if capture_process.is_alive():
-            capture_process.terminate()
-            capture_process.join()
-            self.logger.log_write(f"Fail to load the network video device, the url "
-                                  f"{video_sourse} caputure is timing out.",
-                                  Log_Processor.ERROR)
-            self.ui_value.value = 3
-            return 3
-        # 否则进程运行完成，获得队列结果
-        # 非空时获得结果
-        if not video_stream_queue.empty():
-            video_stream_flag = video_stream_queue.get()
-        else:
+        # 先检查url的主机端口是否可达，不可达时立即返回错误，可达时只建立一次连接，并直接用于后续的读取
+        video_stream = open_network_video_stream(video_sourse, self.url_capture_time_out)
+        if video_stream is None:
+            self.nvd_health_prober.update_health(video_sourse, False)
             self.logger.log_write(f"Fail to load the network video device, the url "
-                                  f"{video_sourse} caputure is timing out.",
+                                  f"{video_sourse} is unreachable.",
                                   Log_Processor.ERROR)
             self.ui_value.value = 3
             return 3
 
-        # 如果结果是True，说明打开成功
-        if video_stream_flag:
-
-            video_stream = cv.VideoCapture(video_sourse, apiPreference=cv.CAP_FFMPEG)
+        # 如果打开成功
+        if video_stream.isOpened():
             # 更新共享变量以说明进程启动成功
             self.ui_value.value = -9
-            # 获得视频流参数，包括宽度、高度和帧率，转为整型
-            real_width = int(video_stream.get(cv.CAP_PROP_FRAME_WIDTH))
-            real_height = int(video_stream.get(cv.CAP_PROP_FRAME_HEIGHT))
-            real_fps = int(video_stream.get(cv.CAP_PROP_FPS))
-
-            # 如果超过了要求大小，限制其大小为720p
-            # 需要注意的是，此处的限制只能对能够修改对应效果的摄像头进行处理，否则是无效的
-            flag_resize = False
-            # 横屏限制
-            if real_width > real_height:
-                if real_width > self._video_resolution[0] or real_height > self._video_resolution[1]:
-                    video_stream.set(cv.CAP_PROP_FRAME_WIDTH, self._video_resolution[0])
-                    video_stream.set(cv.CAP_PROP_FRAME_HEIGHT, self._video_resolution[1])
-                    width = video_stream.get(cv.CAP_PROP_FRAME_WIDTH)
-                    height = video_stream.get(cv.CAP_PROP_FRAME_HEIGHT)
-                else:
-                    width, height = real_width, real_height
-                if width > self._video_resolution[0] or height > self._video_resolution[1]:
-                    flag_resize = True
-            # 竖屏限制
-            else:
-                if real_width > self._video_resolution[1] or real_height > self._video_resolution[0]:
-                    video_stream.set(cv.CAP_PROP_FRAME_WIDTH, self._video_resolution[1])
-                    video_stream.set(cv.CAP_PROP_FRAME_HEIGHT, self._video_resolution[0])
-                    width = video_stream.get(cv.CAP_PROP_FRAME_WIDTH)
-                    height = video_stream.get(cv.CAP_PROP_FRAME_HEIGHT)
-                else:
-                    width, height = real_width, real_height
-                if width > self._video_resolution[1] or height > self._video_resolution[0]:
-                    flag_resize = True
-            # 帧率限制
-            # fps为90000表示时钟频率，不做处理
-            if real_fps != 90000 and real_fps > 30:
-                video_stream.set(cv.CAP_PROP_FPS, 30)
-                fps = video_stream.get(cv.CAP_PROP_FPS)
-            elif real_fps == 90000:
-                fps = 30
-            else:
-                fps = real_fps
+            # 获得视频流参数并限制分辨率和帧率
+            real_width, real_height, real_fps, width, height, fps = \
+                self._apply_network_video_setting(video_stream)
+            # 将实际打开的结果记录到健康状态缓存中
+            self.nvd_health_prober.update_health(video_sourse, True, width=real_width,
+                                                 height=real_height, fps=real_fps)
 
             # 日志输出
             self.logger.log_write(f"Load the network video device " +
@@ -839,16 +1128,28 @@ class Video_Processor(object):
                                       Log_Processor.INFO)
 
             # 如果需要识别视频，创建保存帧的读取队列和结果队列
-            frame_queue = None
+            # 使用共用的识别进程时，只使用其分配的缓冲区，不创建结果队列和识别进程
+            frame_queue = detect_frame_queue
             result_queue = None
-            if flag_detect:
-                frame_queue = multiprocessing.Queue()
+            frame_scheduler = None
+            video_detect_process = None
+            # 有常驻识别服务时优先连接到识别服务，不需要重新加载模型
+            if flag_detect and frame_queue is None:
+                frame_queue, result_queue = self._attach_detector_service(
+                    video_detect_type, video_detect_sensitivity, self.nvd_processor.get_roi(video_sourse))
+            if flag_detect and frame_queue is None:
+                frame_queue = Frame_Ring_Buffer(self.frame_buffer_size,
+                                                (self._video_resolution[1], self._video_resolution[0], 3),
+                                                self.frame_buffer_policy)
                 result_queue = multiprocessing.Queue()
+                ready_event = multiprocessing.Event()
                 # 创建进程，传入参数并运行
                 video_detect_process = multiprocessing.Process(
-                    target=self.video_detector.detect,
-                    args=(frame_queue, result_queue, video_detect_type),
-                    kwargs={"sensitivity": video_detect_sensitivity})
+                    target=run_video_detector,
+                    args=(self.video_detector.to_spec(), "detect", frame_queue, result_queue, video_detect_type),
+                    kwargs={"sensitivity": video_detect_sensitivity,
+                            "roi_list": self.nvd_processor.get_roi(video_sourse),
+                            "ready_event": ready_event})
                 video_detect_process.start()
                 self.logger.log_write("Start running video detect process",
                                       Log_Processor.INFO)
@@ -869,134 +1170,164 @@ class Video_Processor(object):
             # 如果需要保存视频，在指定目录处创建视频文件，用于写入视频帧
             video_out = None
             if flag_save:
-                # 根据当前时间生成文件路径并更新历史视频处理器中的hv_dict(在函数中完成)
-                try:
-                    save_path = self.hs_processor.generate_video_file(
-                        datetime.datetime.now().strftime(Log_Processor.strftime_all))
-                # 如果目录已存在且再次创建
-                except FileExistsError as e:
-                    self.logger.log_write(f"Fail to create save video dir: " + e.strerror,
-                                          Log_Processor.ERROR)
-                    self.ui_value.value = -3
-                    return -3
-                # 如果路径有错误
-                except OSError as e:
-                    self.logger.log_write(f"Fail to create save video dir: " + e.strerror,
-                                          Log_Processor.ERROR)
+                video_out = self._open_video_segment(fps, width, height)
+                if video_out is None:
+                    if flag_detect:
+                        self._stop_video_detect(frame_queue, video_detect_process)
                     self.ui_value.value = -3
                     return -3
 
-                # 无错误则输入视频流至文件中
-                else:
-                    # 声明编码保存方式
-                    fourcc = cv.VideoWriter.fourcc(*"DIVX")
-                    # 利用VideoWriter保存视频，文件路径为生成路径，帧率和分辨率统一为限制后的视频大小和帧率，彩色模式
-                    video_out = cv.VideoWriter(save_path, fourcc, fps, (width, height), True)
-                    # 如果打开成功，日志记录
-                    if video_out.isOpened():
-                        self.logger.log_write(f"Create save video file: {save_path}",
-                                              Log_Processor.INFO)
-                    # 如果打开失败，删除历史视频处理器中的hv_dict信息
-                    else:
-                        self.hs_processor.delete_new_video_file(save_path)
-                        self.logger.log_write(f"Fail to create save video file: {save_path}",
-                                              Log_Processor.ERROR)
-                        self.ui_value.value = -3
-                        return -3
+            # 等待识别进程完成预热后再开始读取视频帧，识别进程不可用时只进行录像和可视化
+            if video_detect_process is not None and \
+                    not self._wait_video_detect_ready(ready_event, video_detect_process):
+                self._stop_video_detect(frame_queue, video_detect_process)
+                flag_detect = False
+            if flag_detect:
+                # 根据识别进程的处理速度决定送入的视频帧，上限为视频流的帧率
+                # 在识别进程就绪后创建，避免把预热时间计入取出速度
+                frame_scheduler = Frame_Scheduler(frame_queue, fps)
+
+            # 创建并启动读取线程，此后视频捕捉对象只由读取线程持有和访问
+            video_reader = Video_Capture_Reader(video_stream, drop_frames=True)
+            video_reader.start()
 
             # 循环部分，用于读取视频
-            # skip用于跳帧
-            skip = 0
-            while True:
-                # 如果ui界面触发了关闭事件，退出进程
-                if self.ui_event.is_set():
-                    if flag_save:
-                        video_out.release()
-                    if flag_visibility:
-                        vis_frame_queue.put(None)
-                    video_stream.release()
-                    # 由于没有终止视频帧None，手动传输结束识别进程
-                    if flag_detect:
-                        frame_queue.put(None)
-                    break
+            # 上一次记录视频帧环形缓冲区统计信息的时间
+            buffer_log_time = time.time()
+            # 上一次获得视频帧的捕捉时间，用于判断视频流是否停滞
+            last_frame_time = time.time()
+            # 最后一次处理的视频帧，重连期间用于保持可视化窗口
+            last_frame = None
+            # 无论以何种方式退出循环(包括出现异常)，都在finally中结束识别，释放识别服务的槽位或共享内存
+            try:
+                while True:
+                    # 如果ui界面触发了关闭事件，退出进程
+                    if self.ui_event.is_set():
+                        if flag_save:
+                            video_out.release()
+                        if flag_visibility:
+                            vis_frame_queue.put(None)
+                        video_reader.stop(self._capture_stop_time_out)
+                        break
 
-                success = video_stream.grab()
-                # 如果摄像头读取失败，日志记录，结束运行，释放视频捕捉对象，销毁窗口
-                if not success:
-                    self.logger.log_write(f"Fail to read the video of the network video device " +
-                                          f"{video_sourse}. " +
-                                          f"Please check the device.",
-                                          Log_Processor.ERROR)
-                    if flag_save:
-                        video_out.release()
+                    # 从读取线程获得最新的视频帧，等待超时且视频流未停滞时继续检查关闭事件
+                    success, frame, frame_time = video_reader.read(self._capture_read_time_out)
+                    if success:
+                        last_frame_time = frame_time
+                    elif not video_reader.finished and \
+                            time.time() - last_frame_time < self._capture_stall_time_out:
+                        continue
+                    # 如果摄像头读取失败或长时间没有新的视频帧，结束当前录像分段，原地重连
+                    # 重连期间识别进程和可视化进程保持运行，重连成功后录像写入新的分段
+                    if not success:
+                        video_reader.stop(self._capture_stop_time_out)
+                        if flag_save:
+                            video_out.release()
+                        lost_time = datetime.datetime.now()
+                        self.logger.log_write(f"Lost the video of the network video device " +
+                                              f"{video_sourse}, start reconnecting.",
+                                              Log_Processor.WARNING)
+                        video_stream = self._reconnect_network_video_stream(
+                            video_sourse, frame_queue, vis_frame_queue, last_frame)
+                        # 重连成功，记录视频中断的时间段，重新设置分辨率和帧率，重新创建读取线程和录像分段
+                        # 视频帧大小仍使用第一次打开时的结果，重连后大小不同的视频帧在下方缩放
+                        if video_stream is not None:
+                            self._apply_network_video_setting(video_stream)
+                            reconnect_time = datetime.datetime.now()
+                            self.logger.log_write(f"Reconnected to the network video device {video_sourse}. " +
+                                                  f"The video gap is from " +
+                                                  f"{lost_time.strftime(Log_Processor.strftime_all)} to " +
+                                                  f"{reconnect_time.strftime(Log_Processor.strftime_all)}, " +
+                                                  f"lasting {(reconnect_time - lost_time).total_seconds():.3f}s.",
+                                                  Log_Processor.WARNING)
+                            video_reader = Video_Capture_Reader(video_stream, drop_frames=True)
+                            video_reader.start()
+                            last_frame_time = time.time()
+                            # 重新测量识别进程的取出速度，避免把中断时间计入取出速度
+                            if flag_detect:
+                                frame_scheduler.reset()
+                            if flag_save:
+                                video_out = self._open_video_segment(fps, width, height)
+                                # 新的分段创建失败时，停止保存但继续运行
+                                if video_out is None:
+                                    flag_save = False
+                                    self.logger.log_write(f"Stop saving the video of the network video device " +
+                                                          f"{video_sourse}.",
+                                                          Log_Processor.ERROR)
+                            continue
+                        # ui界面触发了关闭事件，回到循环开头正常退出
+                        if self.ui_event.is_set():
+                            continue
+                        # 超过最长重连时间，日志记录，结束运行，销毁窗口
+                        self.logger.log_write(f"Fail to read the video of the network video device " +
+                                              f"{video_sourse} after reconnecting for " +
+                                              f"{self._reconnect_max_time}s. " +
+                                              f"Please check the device.",
+                                              Log_Processor.ERROR)
+                        if flag_save:
+                            video_out.release()
 
-                    if flag_visibility:
-                        vis_frame_queue.put(None)
-                    video_stream.release()
+                        if flag_visibility:
+                            vis_frame_queue.put(None)
+                        video_reader.stop(self._capture_stop_time_out)
 
-                    # 由于没有终止视频帧None，手动传输结束识别进程
-                    if flag_detect:
-                        frame_queue.put(None)
-                    self.ui_value.value = -2
-                    return -2
-
-                # 跳帧或者视频解码
-                # 跳帧或者视频解码
-                skip += 1
-                skip %= 4
-                if 15 <= fps < 60 and skip % 2 == 1:
-                    continue
-                elif fps >= 60 and skip >= 1:
-                    continue
-                else:
-                    _, frame = video_stream.retrieve()
-                # 如果视频帧分辨率大于阈值，重整为阈值
-                if flag_resize == 1:
-                    frame = cv.resize(frame, (self._video_resolution[0], self._video_resolution[1]),
-                                      interpolation=cv.INTER_LINEAR)
-                elif flag_resize == 2:
-                    frame = cv.resize(frame, (self._video_resolution[1], self._video_resolution[0]),
-                                      interpolation=cv.INTER_LINEAR)
-
-                # 识别视频流的操作，放入帧并检查结果
-                if flag_detect:
-                    frame_queue.put(frame)
-                    # 如果结果队列非空，说明出现了错误
-                    if not result_queue.empty():
-                        # 错误类型是一个列表，第一个元素是错误编码，第二个是各错误的置信度
-                        warning_info = result_queue.get()
-                        now_time = datetime.datetime.now().strftime(Log_Processor.strftime_all)
-                        # 创建线程，并用报警器进行处理
-                        Warning_thread = threading.Thread(target=self.warning_processor.warning_process,
-                                                          args=(warning_info[0], now_time, warning_info[1],
-                                                                video_detect_sensitivity))
-                        Warning_thread.start()
-                        self.logger.log_write(f"{now_time} have exception", Log_Processor.WARNING)
+                        self.ui_value.value = -2
+                        return -2
 
-                # 可见窗口时的操作
-                if flag_visibility:
-                    # 放入视频帧
-                    vis_frame_queue.put(frame)
-                    # 如果非空，说明有结果返回，说明对方终止了运行，此处也需要终止
-                    if not vis_result_queue.empty():
-                        # 如果返回False，说明是超时
-                        if not vis_result_queue.get():
-                            self.logger.log_write("video visibility process timing out.", Log_Processor.ERROR)
-                        if flag_save:
-                            video_out.release()
-                        video_stream.release()
-                        # 由于没有终止视频帧None，手动传输结束识别进程
-                        if flag_detect:
-                            frame_queue.put(None)
-                        break
+                    # 如果视频帧大小与设置的大小不同(摄像头不支持修改分辨率或重连后恢复为原始分辨率)，重整为设置的大小
+                    if frame.shape[1] != width or frame.shape[0] != height:
+                        frame = cv.resize(frame, (width, height), interpolation=cv.INTER_LINEAR)
+                    last_frame = frame
 
-                # 保存文件时的操作
-                if flag_save:
-                    # 注意要重写图像大小，否则分辨率不一致时会报错
-                    video_out.write(frame)
+                    # 识别视频流的操作，放入帧并检查结果
+                    # 录像和可视化使用全部视频帧，只有调度器选中的视频帧送入识别进程
+                    if flag_detect:
+                        # 放入视频帧，缓冲区已满时按处理策略丢弃视频帧并计数
+                        if frame_scheduler.should_send():
+                            frame_queue.put(frame, timeout=self._frame_buffer_timeout, timestamp=frame_time)
+                        # 定期记录缓冲区和调度器的统计信息
+                        if time.time() - buffer_log_time >= self._frame_buffer_log_interval:
+                            buffer_log_time = time.time()
+                            self._log_frame_buffer_stats(frame_queue, frame_scheduler)
+                        # 如果结果队列非空，说明出现了错误
+                        if result_queue is not None and not result_queue.empty():
+                            # 错误类型是一个列表，第一个元素是错误编码，第二个是各错误的置信度
+                            warning_info = result_queue.get()
+                            now_time = datetime.datetime.now().strftime(Log_Processor.strftime_all)
+                            # 创建线程，并用报警器进行处理
+                            Warning_thread = threading.Thread(target=self.warning_processor.warning_process,
+                                                              args=(warning_info[0], now_time, warning_info[1],
+                                                                    video_detect_sensitivity))
+                            Warning_thread.start()
+                            self.logger.log_write(f"{now_time} have exception", Log_Processor.WARNING)
+
+                    # 可见窗口时的操作
+                    if flag_visibility:
+                        # 放入视频帧
+                        vis_frame_queue.put(frame)
+                        # 如果非空，说明有结果返回，说明对方终止了运行，此处也需要终止
+                        if not vis_result_queue.empty():
+                            # 如果返回False，说明是超时
+                            if not vis_result_queue.get():
+                                self.logger.log_write("video visibility process timing out.", Log_Processor.ERROR)
+                            if flag_save:
+                                video_out.release()
+                            video_reader.stop(self._capture_stop_time_out)
+                            break
+
+                    # 保存文件时的操作
+                    if flag_save:
+                        # 注意要重写图像大小，否则分辨率不一致时会报错
+                        video_out.write(frame)
+            finally:
+                # 由于没有终止视频帧None，手动传输结束识别进程
+                if flag_detect:
+                    self._stop_video_detect(frame_queue, video_detect_process)
 
         # 打开失败则输出错误错误到日志文件中
         else:
+            video_stream.release()
+            self.nvd_health_prober.update_health(video_sourse, False)
             self.logger.log_write(f"Fail to load the network video device, use url is: " +
                                   f"{video_sourse}. The url parameter is {type_flag_dict[type_flag]}." +
                                   f" Please check the url or the config file of config "
@@ -1012,6 +1343,210 @@ class Video_Processor(object):
         self.ui_value.value = 0
         return 0
 
+    def load_multi_video_device(self, video_sourse_list: List[Tuple[int, Union[int, str]]],
+                                flag_visibility: bool = True,
+                                flag_save: bool = True,
+                                flag_detect: bool = True,
+                                video_detect_type: int = 1,
+                                video_detect_sensitivity: int = 0,
+                                video_protocol_type: str = "RTSP"
+                                ) -> List[int]:
+        """
+        同时从多个本地视频设备和网络视频设备加载视频流，所有视频设备共用一个识别进程
+
+        Parameters
+        ----------
+        video_sourse_list : List[Tuple[int, Union[int, str]]]
+            要同时监控的视频设备列表，每个元素为一个元组，第一个元素为视频类型，第二个元素为视频源
+            视频类型为1对应本地视频设备，视频源为本地视频设备的索引号
+            视频类型为2对应网络视频设备，视频源为ip或者url字符串，或者是已存储url的索引值
+        flag_visibility : bool
+            控制opencv在读取视频流时是否展示，每个视频设备使用一个窗口
+        flag_save : bool
+            控制opencv在读取视频流时是否保存，每个视频设备保存为独立的历史视频
+        flag_detect : bool
+            控制视频流是否需要进行监测，默认为True
+        video_detect_type : int
+            控制视频流监测的类型，所有视频设备相同，含义与load_local_video_device相同
+        video_detect_sensitivity : int
+            控制视频流在监测时的敏感度，所有视频设备相同，0为低敏感度，1为高敏感度
+        video_protocol_type : str
+            读取视频流时网络视频设备使用的传输协议，默认为RSTP
+
+        Returns
+        --------
+        res_list : List[int]
+            每个视频设备的返回值，与video_sourse_list一一对应，含义与load_local_video_device和
+            load_network_video_device的返回值相同，视频类型无法识别时为-1
+            ui_value最终记录第一个不为0的返回值，全部成功时为0
+
+        Notes
+        -----
+        每个视频设备在该进程的一个线程中读取、展示和保存，各自使用独立的视频帧环形缓冲区
+        opencv的窗口函数不是线程安全的，因此每个视频设备都在独立的可视化进程中展示
+        所有缓冲区使用同一个条件变量，只创建一个识别进程，模型只加载一次，内存占用不随视频设备数量增加
+        识别进程返回的错误码和置信度带有视频设备的编号，由该函数统一交给异常警报处理器并标明视频设备
+        """
+
+        # 每个视频设备的名称，用于警报和日志中区分视频设备
+        # 以及每个视频设备的感兴趣区域，只有已保存的网络视频设备可以设置感兴趣区域
+        source_name_list = []
+        roi_list_list = []
+        for video_type, video_sourse in video_sourse_list:
+            if video_type == 1 and isinstance(video_sourse, int) and \
+                    0 <= video_sourse < len(self.local_video_device_list):
+                source_name_list.append(f"{self.local_video_device_list[video_sourse][1]}")
+            else:
+                source_name_list.append(f"{video_sourse}")
+            roi_list = None
+            if video_type == 2:
+                url = video_sourse
+                if isinstance(video_sourse, int):
+                    for i in self.nvd_processor.nvd_config_data:
+                        if i["index"] == video_sourse:
+                            url = i["url"]
+                elif self.nvd_processor.vaild_ip(video_sourse):
+                    url = self.nvd_processor.from_ip_find_url(video_sourse)
+                roi_list = self.nvd_processor.get_roi(url)
+            roi_list_list.append(roi_list)
+
+        # 如果需要识别视频，为每个视频设备创建缓冲区，并创建共用的识别进程和结果队列
+        frame_queue_list = [None] * len(video_sourse_list)
+        result_queue = None
+        video_detect_process = None
+        if flag_detect:
+            condition = multiprocessing.Condition()
+            frame_queue_list = [Frame_Ring_Buffer(self.frame_buffer_size,
+                                                  (self._video_resolution[1], self._video_resolution[0], 3),
+                                                  self.frame_buffer_policy, condition)
+                                for _ in video_sourse_list]
+            result_queue = multiprocessing.Queue()
+            ready_event = multiprocessing.Event()
+            # 创建进程，传入参数并运行
+            video_detect_process = multiprocessing.Process(
+                target=run_video_detector,
+                args=(self.video_detector.to_spec(), "detect_multi", frame_queue_list, result_queue,
+                      video_detect_type),
+                kwargs={"sensitivity": video_detect_sensitivity, "roi_list_list": roi_list_list,
+                        "ready_event": ready_event})
+            video_detect_process.start()
+            self.logger.log_write(f"Start running video detect process for "
+                                  f"{len(video_sourse_list)} video devices",
+                                  Log_Processor.INFO)
+            # 等待识别进程完成预热后再启动各视频设备，识别进程不可用时各视频设备的视频帧不会被识别
+            self._wait_video_detect_ready(ready_event, video_detect_process)
+
+        # 每个视频设备的返回值
+        res_list = [0] * len(video_sourse_list)
+
+        def run_video_device(index: int, processor: Video_Processor):
+            """在线程中加载单个视频设备，结束时关闭其缓冲区，使识别进程不再等待该视频设备"""
+            video_type, video_sourse = video_sourse_list[index]
+            try:
+                if video_type == 1:
+                    res_list[index] = processor.load_local_video_device(
+                        video_sourse, flag_visibility, flag_save, flag_detect,
+                        video_detect_type, video_detect_sensitivity,
+                        detect_frame_queue=frame_queue_list[index])
+                elif video_type == 2:
+                    res_list[index] = processor.load_network_video_device(
+                        video_sourse, flag_visibility, flag_save, flag_detect,
+                        video_detect_type, video_detect_sensitivity, video_protocol_type,
+                        detect_frame_queue=frame_queue_list[index])
+                else:
+                    self.logger.log_write(f"The video type {video_type} of {video_sourse} "
+                                          f"is not supported.", Log_Processor.ERROR)
+                    res_list[index] = -1
+            finally:
+                if frame_queue_list[index] is not None:
+                    frame_queue_list[index].shutdown()
+
+        # 每个线程使用该对象的浅拷贝，共享视频源、日志和处理器，但使用独立的共享变量记录返回值
+        thread_list = []
+        for index in range(len(video_sourse_list)):
+            processor = copy.copy(self)
+            processor.ui_value = multiprocessing.Value("i", 0)
+            thread = threading.Thread(target=run_video_device, args=(index, processor), daemon=True)
+            thread.start()
+            thread_list.append(thread)
+        # 更新共享变量以说明进程启动成功
+        self.ui_value.value = -9
+
+        # 主循环，将识别进程返回的错误交给异常警报处理器，直到所有视频设备结束
+        while any(thread.is_alive() for thread in thread_list):
+            if result_queue is None:
+                for thread in thread_list:
+                    thread.join()
+                break
+            try:
+                # 错误类型是一个列表，第一个元素是视频设备编号，第二个是错误编码，第三个是各错误的置信度
+                source_id, warning_code, warning_conf = \
+                    result_queue.get(timeout=self._capture_read_time_out)
+            except queue.Empty:
+                continue
+            now_time = datetime.datetime.now().strftime(Log_Processor.strftime_all)
+            # 创建线程，并用报警器进行处理
+            Warning_thread = threading.Thread(target=self.warning_processor.warning_process,
+                                              args=(warning_code, now_time, warning_conf,
+                                                    video_detect_sensitivity,
+                                                    source_name_list[source_id]))
+            Warning_thread.start()
+            self.logger.log_write(f"{now_time} have exception in {source_name_list[source_id]}",
+                                  Log_Processor.WARNING)
+
+        # 所有视频设备结束后，等待识别进程结束，再释放共享内存
+        if flag_detect:
+            video_detect_process.join()
+            for frame_queue in frame_queue_list:
+                self._log_frame_buffer_stats(frame_queue)
+                frame_queue.close()
+                frame_queue.unlink()
+            self.logger.log_write("Stop running video detect process", Log_Processor.INFO)
+
+        # 日志记录每个视频设备的返回值
+        self.logger.log_write(f"Stop using the video devices " +
+                              f"{dict(zip(source_name_list, res_list))}",
+                              Log_Processor.INFO)
+        self.ui_value.value = next((res for res in res_list if res != 0), 0)
+        return res_list
+
+    def quantize_detect_model(self, mode_list: List[int] = None, method: str = "static",
+                              frame_count: int = 100) -> Dict[int, Optional[Dict[str, float]]]:
+        """
+        使用历史视频作为校准集，生成识别模型的INT8量化版本，并记录量化模型相对FP32模型的精度变化
+        生成后需要将对应模式加入predict_config.json的int8_modes中，下次创建视频检测器时生效
+
+        Parameters
+        ----------
+        mode_list : List[int]
+            要量化的模型模式列表，默认为[1, 2, 3]，即全部三个模型
+        method : str
+            量化方式，可选"dynamic"和"static"，默认为"static"
+        frame_count : int
+            从历史视频中抽取的校准视频帧数量，默认为100
+
+        Returns
+        -------
+        report_dict : Dict[int, Optional[Dict[str, float]]]
+            每个模式的精度评估结果，量化失败时为None，具体含义见Video_Detector.quantize_model
+        """
+        if mode_list is None:
+            mode_list = [1, 2, 3]
+        # 收集全部历史视频文件
+        video_list = []
+        for video_date in self.hs_processor.hv_dict:
+            video_file_dict, _ = self.hs_processor.get_date_video_file(video_date)
+            video_list.extend(video_file for video_file in video_file_dict.values()
+                              if os.path.exists(video_file))
+        if not video_list:
+            self.logger.log_write("There is no history video for INT8 model calibration.",
+                                  Log_Processor.WARNING)
+
+        report_dict = {}
+        for mode in mode_list:
+            report_dict[mode] = self.video_detector.quantize_model(mode, method, video_list, frame_count)
+        return report_dict
+
     def load_history_video(self, video_strat_save_date: str,
                            video_index: int = 1,
                            flag_visibility: bool = True,
@@ -1153,8 +1688,8 @@ class Video_Processor(object):
             video_detect_process = None
             if flag_re_detect:
                 video_detect_process = multiprocessing.Process(
-                    target=self.video_detector.re_detect,
-                    args=(video_file, self.ui_event, video_detect_type),
+                    target=run_video_detector,
+                    args=(self.video_detector.to_spec(), "re_detect", video_file, self.ui_event, video_detect_type),
                     kwargs={"sensitivity": video_detect_sensitivity})
                 # 确保进程不是守护进程
                 video_detect_process.daemon = False
@@ -1179,6 +1714,10 @@ class Video_Processor(object):
                 else:
                     cv.resizeWindow(Window_name, 720, 720)
 
+            # 创建并启动读取线程，此后视频捕捉对象只由读取线程持有和访问
+            video_reader = Video_Capture_Reader(video_stream, drop_frames=False)
+            video_reader.start()
+
             # 循环部分，用于读取视频
             # 视频已读帧数记录，用于判断视频是否读取完毕
             frame_count = 0
@@ -1187,13 +1726,18 @@ class Video_Processor(object):
                 if self.ui_event.is_set():
                     if flag_visibility:
                         cv.destroyWindow(Window_name)
-                    video_stream.release()
-                    # 由于没有终止视频帧，直接关闭进程
+                    video_reader.stop(self._capture_stop_time_out)
+                    # 重新识别进程同样监听关闭事件，等待其保存检查点后退出，超时后强制终止
                     if flag_re_detect:
-                        video_detect_process.terminate()
+                        video_detect_process.join(self._re_detect_stop_time_out)
+                        if video_detect_process.is_alive():
+                            self.logger.log_write(f"The re-detect process does not exit after "
+                                                  f"{self._re_detect_stop_time_out}s, terminate it.",
+                                                  Log_Processor.WARNING)
+                            video_detect_process.terminate()
                     break
 
-                success, frame = video_stream.read()
+                success, frame, _ = video_reader.read()
                 # 如果视频读取失败，判断是是否读取完毕
                 if not success:
                     # 如果读取完毕，日志记录，正常退出
@@ -1203,7 +1747,7 @@ class Video_Processor(object):
                                               Log_Processor.INFO)
                         if flag_visibility:
                             cv.destroyWindow(Window_name)
-                        video_stream.release()
+                        video_reader.stop(self._capture_stop_time_out)
                         break
                     # 如果未完成，结束运行，日志记录，释放视频捕捉对象，销毁窗口
                     else:
@@ -1213,7 +1757,7 @@ class Video_Processor(object):
                                               Log_Processor.ERROR)
                         if flag_visibility:
                             cv.destroyWindow(Window_name)
-                        video_stream.release()
+                        video_reader.stop(self._capture_stop_time_out)
                         if flag_re_detect:
                             video_detect_process.terminate()
                         self.ui_value.value = -2
@@ -1233,7 +1777,7 @@ class Video_Processor(object):
                     cv2key = cv.waitKey(int(500 / fps))
                     if cv2key & 0xFF == ord('q') or cv2key & 0xFF == 27:
                         cv.destroyWindow(Window_name)
-                        video_stream.release()
+                        video_reader.stop(self._capture_stop_time_out)
                         break
 
                     # # 如果s键按下，则进行图片保存
@@ -1245,7 +1789,7 @@ class Video_Processor(object):
 
                     # 点击"x"关闭之后退出
                     if cv.getWindowProperty(Window_name, cv.WND_PROP_VISIBLE) < 1:
-                        video_stream.release()
+                        video_reader.stop(self._capture_stop_time_out)
                         break
 
         # 打开失败则输出错误错误到日志文件中